@@ -16,6 +16,12 @@ import requests
 import threading
 from dotenv import load_dotenv
 
+try:
+    # orjson-backed when orjson is installed (mcp-devdiag with jsoncodec)
+    from mcp_devdiag.jsoncodec import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_dumps, json_loads = json.dumps, json.loads
+
 load_dotenv()  # load .env if present (dev/local)
 
 # --------------------------------------------------------------------------------------
@@ -92,16 +98,16 @@ def run_devdiag_cli(url: str, preset: str, suppress: Optional[list[str]], extra_
     try:
         out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True, timeout=CLI_TIMEOUT)
         try:
-            return json.loads(out)
-        except json.JSONDecodeError:
+            return json_loads(out)
+        except ValueError:
             # If CLI emitted pretty logs + JSON, try last JSON block
             last_brace = out.rfind("{")
-            return json.loads(out[last_brace:])
+            return json_loads(out[last_brace:])
     except subprocess.CalledProcessError as e:
         raise HTTPException(status_code=500, detail=f"DevDiag error: {e.output.strip() or str(e)}")
     except subprocess.TimeoutExpired:
         raise HTTPException(status_code=504, detail="DevDiag timed out")
-    except json.JSONDecodeError:
+    except ValueError:
         raise HTTPException(status_code=502, detail=f"Non-JSON output from DevDiag: {out[:4000]}")
     finally:
         _sem.release()
@@ -240,10 +246,17 @@ def _is_private_ip(url: str) -> bool:
 # --------------------------------------------------------------------------------------
 # App
 # --------------------------------------------------------------------------------------
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 app = FastAPI(
     title="DevDiag HTTP Wrapper",
     description="Server-side security wrapper for diagnostic CLI",
     version=SERVICE_VERSION,
+    default_response_class=DefaultResponse,
 )
 
 # Custom OpenAPI schema with security scheme
@@ -277,7 +290,7 @@ async def access_log(request: Request, call_next):
         HTTP_ERRS.labels(request.url.path, e.status_code).inc()
         if REQUEST_LOG_JSON:
             print(
-                json.dumps(
+                json_dumps(
                     {
                         "event": "http_error",
                         "rid": rid,
@@ -296,7 +309,7 @@ async def access_log(request: Request, call_next):
     HTTP_LAT.labels(request.url.path, request.method).observe(dur)
     if REQUEST_LOG_JSON:
         print(
-            json.dumps(
+            json_dumps(
                 {
                     "event": "http_access",
                     "rid": rid,
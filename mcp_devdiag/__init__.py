@@ -18,4 +18,16 @@ __all__ = [
     "limits",
     "incident",
     "config",
+    "sketch",
+    "netrollup",
+    "netcolumns",
+    "jsoncodec",
+    "paths",
+    "timeparse",
+    "logmine",
+    "rules",
+    "search",
+    "segments",
+    "sources",
+    "timeindex",
 ]
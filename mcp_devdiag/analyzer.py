@@ -1,11 +1,21 @@
 """Log analysis and diagnostic heuristics."""
 
 from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import glob
 import json
-import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from . import jsoncodec
+from .rules import RuleSet, build_ruleset
 from .schema import Problem, StatusResponse, Context
+from .segments import iter_rotated_lines_reverse
+from .sources import LogSource, merge_sources
+from .tail import tail_lines
 
 LOG_DIR = Path(".tasteos_logs")
 BACKEND_LOG = LOG_DIR / "backend.log"
@@ -13,22 +23,194 @@ FRONTEND_LOG = LOG_DIR / "frontend.log"
 ENV_JSON = LOG_DIR / "env.json"
 NETWORK_LOG = LOG_DIR / "network.jsonl"
 
-_FAILED_FETCH = re.compile(r"TypeError: Failed to fetch", re.I)
-_HTTP_ERR = re.compile(r"\b(401|403|500|502|503|504)\b")
-_CORS_ERR = re.compile(r"CORS|Access-Control-Allow-Origin", re.I)
+# Log lines (per log) scanned by the log rules
+RULE_SCAN_LINES = 400
 
+# Recent network events considered by the heuristics (env.json: devdiag_network_window)
+DEFAULT_NETWORK_WINDOW = 300
 
-def load_env() -> Dict[str, Any]:
-    """Load environment snapshot from env.json."""
-    if ENV_JSON.exists():
+# Log lines (per log) fed to build_status
+STATUS_TAIL_LINES = 600
+
+# Appends larger than this are re-tailed instead of read incrementally
+INCREMENTAL_MAX_BYTES = 1024 * 1024
+
+# Threads tailing and scanning log sources for build_status
+STATUS_WORKERS = 8
+
+
+def _read_env(path: Path) -> Dict[str, Any]:
+    """Parse env.json, {} if missing or invalid."""
+    if path.exists():
         try:
-            return json.loads(ENV_JSON.read_text())
+            return json.loads(path.read_text())
         except Exception:
             return {}
     return {}
 
 
-def detect_problems(env: Dict[str, Any], be_lines: List[str], fe_lines: List[str]) -> List[Problem]:
+def load_env() -> Dict[str, Any]:
+    """Load environment snapshot from env.json (memoized on file stat)."""
+    return dict(STATUS_CACHE.env(ENV_JSON))
+
+
+def network_window(env: Dict[str, Any]) -> int:
+    """
+    Number of recent network.jsonl events the heuristics look at.
+
+    Configurable via `devdiag_network_window` in env.json (default 300).
+    """
+    try:
+        return max(1, int(env.get("devdiag_network_window", DEFAULT_NETWORK_WINDOW)))
+    except (TypeError, ValueError):
+        return DEFAULT_NETWORK_WINDOW
+
+
+_RULES: Optional[RuleSet] = None
+
+
+def get_rules() -> RuleSet:
+    """Built-in log rules plus `diag.log_rules` from devdiag.yaml, compiled once."""
+    global _RULES
+    if _RULES is None:
+        from .config import load_config
+
+        _RULES = build_ruleset(load_config().log_rules)
+    return _RULES
+
+
+_SOURCES_CONFIG: Optional[List[Dict[str, Any]]] = None
+
+
+def get_log_sources() -> List[LogSource]:
+    """
+    Built-in frontend/backend sources plus `diag.log_sources` from devdiag.yaml.
+
+    A configured source with the name "frontend" or "backend" replaces the
+    built-in one. Relative globs resolve against LOG_DIR.
+    """
+    global _SOURCES_CONFIG
+    if _SOURCES_CONFIG is None:
+        from .config import load_config
+
+        _SOURCES_CONFIG = list(load_config().log_sources)
+    # Absolute, so the default (relative) log paths are not joined onto LOG_DIR twice
+    defaults = [
+        LogSource("frontend", glob.escape(str(FRONTEND_LOG.absolute())), kind="frontend"),
+        LogSource("backend", glob.escape(str(BACKEND_LOG.absolute())), kind="backend"),
+    ]
+    return merge_sources(defaults, _SOURCES_CONFIG)
+
+
+def source_files(sources: List[LogSource]) -> List[Tuple[LogSource, str, Path]]:
+    """
+    (source, label, path) for every file the sources currently match.
+
+    The label is the source name, or "name:file" when a glob matches
+    several files, and becomes Problem.source.
+    """
+    files = []
+    for src in sources:
+        paths = src.paths(LOG_DIR)
+        for path in paths:
+            files.append((src, src.name if len(paths) == 1 else f"{src.name}:{path.name}", path))
+    return files
+
+
+def _rule_problems(
+    rules: RuleSet,
+    source: str,
+    lines: List[str],
+    kind: Optional[str] = None,
+    label: Optional[str] = None,
+) -> List[Problem]:
+    """Problems for the log rules matching the last RULE_SCAN_LINES of a log."""
+    window = lines[-RULE_SCAN_LINES:]
+    hits = rules.scan(source, window, kind)
+    base = len(lines) - len(window)
+    return [
+        Problem(
+            severity=rule.severity,
+            code=rule.id,
+            message=rule.message,
+            fix=list(rule.fix),
+            lines=[base + i for i in hits[rule.id]],
+            source=label or source,
+        )
+        for rule in rules.for_source(source, kind)
+        if rule.id in hits
+    ]
+
+
+def network_problems(env: Dict[str, Any]) -> List[Problem]:
+    """
+    Heuristics over the most recent network.jsonl events (5xx/4xx bursts, slow requests).
+
+    Args:
+        env: Environment snapshot (for devdiag_network_window)
+
+    Returns:
+        Detected problems, empty if there is no network log
+    """
+    problems: List[Problem] = []
+    try:
+        if NETWORK_LOG.exists():
+            cnt_4xx = cnt_5xx = 0
+            slow_urls = []
+            for ln in islice(iter_rotated_lines_reverse(NETWORK_LOG), network_window(env)):
+                try:
+                    ev = jsoncodec.loads(ln)
+                except Exception:
+                    continue
+                st = int(ev.get("status") or 0)
+                dur = int(ev.get("dur_ms") or 0)
+                if 400 <= st < 500:
+                    cnt_4xx += 1
+                elif 500 <= st < 600:
+                    cnt_5xx += 1
+                if dur >= 2000:
+                    slow_urls.append(ev.get("url"))
+            if cnt_5xx >= 3:
+                problems.append(
+                    Problem(
+                        severity="error",
+                        code="MANY_5XX",
+                        message=f"{cnt_5xx} recent 5xx responses.",
+                        fix=["Check server errors and tracebacks"],
+                    )
+                )
+            if cnt_4xx >= 5:
+                problems.append(
+                    Problem(
+                        severity="warn",
+                        code="MANY_4XX",
+                        message=f"{cnt_4xx} recent 4xx responses.",
+                        fix=["Check auth/permissions and request payloads"],
+                    )
+                )
+            if slow_urls:
+                problems.append(
+                    Problem(
+                        severity="warn",
+                        code="SLOW_ENDPOINTS",
+                        message=f"Slow requests ≥2s: {len(slow_urls)}",
+                        fix=["Profile endpoints; check N+1 queries, cold starts"],
+                    )
+                )
+    except Exception:
+        pass
+    return problems
+
+
+def detect_problems(
+    env: Dict[str, Any],
+    be_lines: List[str],
+    fe_lines: List[str],
+    network: Optional[List[Problem]] = None,
+    services: Optional[List[Problem]] = None,
+    frontend: Optional[List[Problem]] = None,
+    backend: Optional[List[Problem]] = None,
+) -> List[Problem]:
     """
     Analyze logs and environment to detect common development issues.
 
@@ -36,11 +218,17 @@ def detect_problems(env: Dict[str, Any], be_lines: List[str], fe_lines: List[str
         env: Environment snapshot from env.json
         be_lines: Backend log lines
         fe_lines: Frontend log lines
+        network: Precomputed network_problems(env) (default: scan network.jsonl)
+        services: Rule problems of additional log sources (see get_log_sources),
+            reported after the backend log rules
+        frontend: Precomputed frontend rule problems (default: scan fe_lines)
+        backend: Precomputed backend rule problems (default: scan be_lines)
 
     Returns:
         List of detected problems with suggested fixes
     """
     problems: List[Problem] = []
+    rules = get_rules()
 
     frontend_origin = env.get("frontend_origin")
     backend_origin = env.get("backend_origin")
@@ -79,37 +267,19 @@ def detect_problems(env: Dict[str, Any], be_lines: List[str], fe_lines: List[str
                 )
             )
 
-    # Failed to fetch → likely CORS/network/cookie
-    fe_text = "\n".join(fe_lines[-400:])
-    if _FAILED_FETCH.search(fe_text) or (last_error and "Failed to fetch" in last_error):
-        problems.append(
-            Problem(
-                severity="error",
-                code="FAILED_TO_FETCH",
-                message="Frontend reports 'TypeError: Failed to fetch'.",
-                fix=[
-                    "Confirm backend is up and reachable",
-                    "Add exact frontend origin to CORS",
-                    "Enable allow_credentials=True if using cookies",
-                    "Use same host form (localhost vs 127.0.0.1)",
-                ],
-            )
-        )
-
-    # CORS specifically
-    if _CORS_ERR.search(fe_text):
-        problems.append(
-            Problem(
-                severity="error",
-                code="CORS_BLOCK",
-                message="CORS appears to be blocking requests.",
-                fix=[
-                    "Set CORSMiddleware allow_origins=[frontend_origin]",
-                    "Set allow_credentials=True when using cookies",
-                    "Expose/allow headers as needed",
-                ],
+    # Frontend log rules (failed fetches, CORS, ...): one pass over the recent lines
+    problems.extend(_rule_problems(rules, "frontend", fe_lines) if frontend is None else frontend)
+    failed = rules.get("FAILED_TO_FETCH")
+    if failed and last_error and "Failed to fetch" in last_error:
+        if not any(p.code == failed.id for p in problems):
+            problems.append(
+                Problem(
+                    severity=failed.severity,
+                    code=failed.id,
+                    message=failed.message,
+                    fix=list(failed.fix),
+                )
             )
-        )
 
     # Cookie domain / SameSite problems
     # NOTE: Previously gated on 'cookie is not None'. Now evaluate if we have ANY cookie-related hints.
@@ -167,78 +337,12 @@ def detect_problems(env: Dict[str, Any], be_lines: List[str], fe_lines: List[str
             )
         )
 
-    # Backend errors
-    be_text = "\n".join(be_lines[-400:])
-    if _HTTP_ERR.search(be_text):
-        problems.append(
-            Problem(
-                severity="warn",
-                code="BACKEND_HTTP_ERRORS",
-                message="Backend logs include 4xx/5xx responses.",
-                fix=["Check specific endpoints and recent tracebacks"],
-            )
-        )
-
-    if "alembic" in be_text or "migration" in be_text or "column" in be_text:
-        problems.append(
-            Problem(
-                severity="warn",
-                code="DB_DRIFT",
-                message="Backend logs hint at DB migration issues.",
-                fix=["Run alembic upgrade head or reset dev DB"],
-            )
-        )
+    # Backend log rules (HTTP errors, DB drift, ...)
+    problems.extend(_rule_problems(rules, "backend", be_lines) if backend is None else backend)
+    problems.extend(services or [])
 
     # Network JSONL heuristics (optional)
-    try:
-        if NETWORK_LOG.exists():
-            import json as _json
-
-            lines = NETWORK_LOG.read_text(encoding="utf-8").splitlines()[-300:]
-            cnt_4xx = cnt_5xx = 0
-            slow_urls = []
-            for ln in lines:
-                try:
-                    ev = _json.loads(ln)
-                except Exception:
-                    continue
-                st = int(ev.get("status") or 0)
-                dur = int(ev.get("dur_ms") or 0)
-                if 400 <= st < 500:
-                    cnt_4xx += 1
-                elif 500 <= st < 600:
-                    cnt_5xx += 1
-                if dur >= 2000:
-                    slow_urls.append(ev.get("url"))
-            if cnt_5xx >= 3:
-                problems.append(
-                    Problem(
-                        severity="error",
-                        code="MANY_5XX",
-                        message=f"{cnt_5xx} recent 5xx responses.",
-                        fix=["Check server errors and tracebacks"],
-                    )
-                )
-            if cnt_4xx >= 5:
-                problems.append(
-                    Problem(
-                        severity="warn",
-                        code="MANY_4XX",
-                        message=f"{cnt_4xx} recent 4xx responses.",
-                        fix=["Check auth/permissions and request payloads"],
-                    )
-                )
-            if slow_urls:
-                problems.append(
-                    Problem(
-                        severity="warn",
-                        code="SLOW_ENDPOINTS",
-                        message=f"Slow requests ≥2s: {len(slow_urls)}",
-                        fix=["Profile endpoints; check N+1 queries, cold starts"],
-                    )
-                )
-    except Exception:
-        pass
+    problems.extend(network_problems(env) if network is None else network)
 
     # If network capture is enabled but no file/events, hint at CORS/preflight blocks
     v = (env or {}).get("VITE_DEVLOG_NETWORK") or (env or {}).get("vite_devlog_network")
@@ -264,20 +368,239 @@ def detect_problems(env: Dict[str, Any], be_lines: List[str], fe_lines: List[str
     return problems
 
 
-def build_status() -> StatusResponse:
+def file_key(path: Path) -> Optional[tuple]:
+    """Change-detection key for a file: (inode, size, mtime_ns), None if missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@dataclass
+class _TailMemo:
+    key: Optional[tuple]
+    lines: deque
+    complete: bool  # file ended with a newline when last read
+
+
+class StatusCache:
     """
-    Build comprehensive diagnostic status from logs and environment.
+    Stat-keyed memo of build_status inputs and result.
 
-    Returns:
-        StatusResponse with detected problems and context
+    env.json, the log source tails and the network heuristics are each
+    keyed by their file's (inode, size, mtime_ns). When no key changed the
+    last StatusResponse is returned as is. Otherwise only the changed inputs
+    are reloaded: a log that grew by appending is extended with just the new
+    bytes, anything else (rotation, truncation, rewrite) is re-tailed. Tails
+    of different files can be read concurrently (each file has its own lock).
+    """
+
+    def __init__(self, tail_n: int = STATUS_TAIL_LINES):
+        """
+        Initialize cache.
+
+        Args:
+            tail_n: Lines kept per log
+        """
+        self.tail_n = tail_n
+        self._lock = threading.RLock()
+        self._env: Optional[tuple] = None  # (path, key, env)
+        self._tails: Dict[Path, _TailMemo] = {}
+        self._tail_locks: Dict[Path, threading.Lock] = {}
+        self._scans: Dict[Path, tuple] = {}  # path -> (stamp, (rule lines, problems))
+        self._counter_lock = threading.Lock()
+        self._network: Optional[tuple] = None  # (inputs, problems)
+        self._status: Optional[tuple] = None  # (inputs, StatusResponse)
+        self.counters = dict.fromkeys(
+            [
+                "hits",
+                "misses",
+                "env_loads",
+                "tail_full",
+                "tail_incremental",
+                "network_scans",
+                "source_scans",
+            ],
+            0,
+        )
+
+    def env(self, path: Path) -> Dict[str, Any]:
+        """Parsed env.json, re-read only when its stat changed."""
+        key = file_key(path)
+        with self._lock:
+            if self._env is None or self._env[:2] != (path, key):
+                self._env = (path, key, _read_env(path))
+                self.counters["env_loads"] += 1
+            return self._env[2]
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def _tail_lock(self, path: Path) -> threading.Lock:
+        with self._counter_lock:
+            return self._tail_locks.setdefault(path, threading.Lock())
+
+    def tail(self, path: Path) -> List[str]:
+        """Last tail_n lines of a log, extended incrementally on append."""
+        with self._tail_lock(path):
+            return list(self._tail_locked(path).lines)
+
+    def scan(
+        self, rules: RuleSet, src: LogSource, label: str, path: Path
+    ) -> Tuple[List[str], List[Problem]]:
+        """
+        Rule lines and rule problems of one source file.
+
+        Memoized on the file's tail, so sources that did not change cost a
+        stat call; only changed files are re-scanned.
+        """
+        with self._tail_lock(path):
+            memo = self._tail_locked(path)
+            stamp = (memo.key, src, label, id(rules))
+            hit = self._scans.get(path)
+            if hit is not None and hit[0] == stamp:
+                lines, problems = hit[1]
+            else:
+                lines = src.rule_lines(list(memo.lines))
+                problems = _rule_problems(rules, src.name, lines, kind=src.kind, label=label)
+                self._scans[path] = (stamp, (lines, problems))
+                self._count("source_scans")
+            return list(lines), [p.model_copy() for p in problems]
+
+    def _tail_locked(self, path: Path) -> _TailMemo:
+        """tail() body; the caller holds the path's lock."""
+        key = file_key(path)
+        memo = self._tails.get(path)
+        if memo is not None and memo.key == key:
+            return memo
+        if (
+            memo is not None
+            and memo.key is not None
+            and key is not None
+            and memo.complete
+            and key[0] == memo.key[0]
+            and 0 < key[1] - memo.key[1] <= INCREMENTAL_MAX_BYTES
+        ):
+            with path.open("rb") as f:
+                f.seek(memo.key[1])
+                data = f.read(key[1] - memo.key[1])
+            complete = data.endswith(b"\n")
+            parts = (data[:-1] if complete else data).split(b"\n")
+            memo.lines.extend(p.decode("utf-8", errors="replace").rstrip("\r") for p in parts)
+            memo.key, memo.complete = key, complete
+            self._count("tail_incremental")
+        else:
+            lines = tail_lines(path, n=self.tail_n, rotated=True)
+            # A write racing the tail makes the key stale: force a full re-tail next time
+            complete = _ends_with_newline(path) and file_key(path) == key
+            memo = self._tails[path] = _TailMemo(
+                key=key, lines=deque(lines, maxlen=self.tail_n), complete=complete
+            )
+            self._count("tail_full")
+        return memo
+
+    def network(self, env: Dict[str, Any]) -> List[Problem]:
+        """network_problems(env), recomputed only when network.jsonl or the window changed."""
+        inputs = (NETWORK_LOG, file_key(NETWORK_LOG), network_window(env))
+        with self._lock:
+            if self._network is None or self._network[0] != inputs:
+                self._network = (inputs, network_problems(env))
+                self.counters["network_scans"] += 1
+            return [p.model_copy() for p in self._network[1]]
+
+    def status(self) -> StatusResponse:
+        """Memoized build_status result; recomputes changed inputs only."""
+        files = source_files(get_log_sources())
+        paths = [ENV_JSON, NETWORK_LOG] + [path for _, _, path in files]
+        inputs = tuple((path, file_key(path)) for path in paths)
+        with self._lock:
+            if self._status is not None and self._status[0] == inputs:
+                self._count("hits")
+                return self._status[1].model_copy(deep=True)
+            self._count("misses")
+            status = _compute_status(self, files)
+            self._status = (inputs, status)
+            return status.model_copy(deep=True)
+
+    def clear(self) -> None:
+        """Drop all memoized inputs and results."""
+        with self._lock:
+            self._env = self._network = self._status = None
+            self._tails.clear()
+            self._tail_locks.clear()
+            self._scans.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and reload counters."""
+        with self._lock:
+            total = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / total, 3) if total else 0.0,
+                "tails": len(self._tails),
+            }
+
+
+def _ends_with_newline(path: Path) -> bool:
+    """Whether a file's last byte is a newline (True for missing/empty files)."""
+    try:
+        with path.open("rb") as f:
+            f.seek(0, 2)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, 2)
+            return f.read(1) == b"\n"
+    except OSError:
+        return True
+
+
+STATUS_CACHE = StatusCache()
+
+
+_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _status_pool() -> ThreadPoolExecutor:
+    """Shared thread pool for reading log sources."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=STATUS_WORKERS, thread_name_prefix="devdiag-status")
+    return _POOL
+
+
+def _compute_status(
+    cache: StatusCache, files: Optional[List[Tuple[LogSource, str, Path]]] = None
+) -> StatusResponse:
     """
-    from .tail import tail_lines
+    Build a StatusResponse from (memoized) inputs.
 
-    env = load_env()
-    fe = tail_lines(FRONTEND_LOG, n=600)
-    be = tail_lines(BACKEND_LOG, n=600)
+    Source files are tailed and rule-scanned concurrently on a thread pool,
+    so status latency tracks the slowest source rather than their sum. Each
+    file is scanned on its own (also when the frontend/backend globs match
+    several files), so every file's recent lines are looked at.
+    """
+    env = dict(cache.env(ENV_JSON))
+    rules = get_rules()
+    if files is None:
+        files = source_files(get_log_sources())
+
+    futures = [_status_pool().submit(cache.scan, rules, *item) for item in files]
+    found: Dict[str, List[Problem]] = {"frontend": [], "backend": [], "services": []}
+    for (src, _, _), fut in zip(files, futures):
+        _, problems = fut.result()
+        found[src.name if src.name in ("frontend", "backend") else "services"].extend(problems)
 
-    problems = detect_problems(env, be, fe)
+    problems = detect_problems(
+        env,
+        [],
+        [],
+        network=cache.network(env),
+        services=found["services"],
+        frontend=found["frontend"],
+        backend=found["backend"],
+    )
     ok = not any(p.severity == "error" for p in problems)
 
     ctx = Context(
@@ -288,3 +611,16 @@ def build_status() -> StatusResponse:
         env=env,
     )
     return StatusResponse(ok=ok, problems=problems, context=ctx)
+
+
+def build_status() -> StatusResponse:
+    """
+    Build comprehensive diagnostic status from logs and environment.
+
+    Served from STATUS_CACHE when env.json, the logs and network.jsonl are
+    unchanged since the previous call.
+
+    Returns:
+        StatusResponse with detected problems and context
+    """
+    return STATUS_CACHE.status()
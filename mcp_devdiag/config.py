@@ -60,6 +60,9 @@ class DevDiagConfig:
         self.browser_enabled = diag.get("browser_enabled", False)
         self.suppress = diag.get("suppress", [])
         self.presets = diag.get("presets", ["chat", "embed", "app", "full"])
+        self.log_rules = diag.get("log_rules", [])
+        self.log_sources = diag.get("log_sources", [])
+        self.network_columns = diag.get("network_columns", False)
 
         # Export settings
         exp = d.get("export", {})
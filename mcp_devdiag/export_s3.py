@@ -1,10 +1,11 @@
 """S3 export functionality for redacted diagnostic bundles."""
 
 from typing import Any
-import json
 import time
 import logging
 
+from mcp_devdiag import jsoncodec
+
 logger = logging.getLogger(__name__)
 
 # Safe keys allowed in exported bundles (no sensitive data)
@@ -72,8 +73,8 @@ async def export_snapshot(payload: dict, tenant: str, export_config: dict) -> di
 
     # Redact payload to remove sensitive data
     bundle = _redact(payload)
-    bundle_json = json.dumps(bundle, indent=2)
-    bundle_size = len(bundle_json.encode("utf-8"))
+    bundle_json = jsoncodec.dumpb(bundle, indent=True)
+    bundle_size = len(bundle_json)
 
     # Enforce size cap (default 256 KB)
     max_bytes = export_config.get("max_bytes", 262144)
@@ -97,7 +98,7 @@ async def export_snapshot(payload: dict, tenant: str, export_config: dict) -> di
         s3.put_object(
             Bucket=export_config["s3_bucket"],
             Key=key,
-            Body=bundle_json.encode("utf-8"),
+            Body=bundle_json,
             ContentType="application/json",
             ServerSideEncryption="AES256",
         )
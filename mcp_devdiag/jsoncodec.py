@@ -0,0 +1,82 @@
+"""JSON codec: orjson when installed, stdlib json otherwise."""
+
+from __future__ import annotations
+import json
+import math
+from typing import Any, Callable, Optional, Union
+
+
+def _orjson():
+    """orjson module if installed, else None."""
+    try:
+        import orjson
+
+        return orjson
+    except ImportError:
+        return None
+
+
+_ORJSON = _orjson()
+
+# Name of the active backend ("orjson" or "json"), reported by benchmarks
+BACKEND = "orjson" if _ORJSON is not None else "json"
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+# Parse one JSON document from bytes or str; raises ValueError on invalid input
+# (orjson.JSONDecodeError subclasses json.JSONDecodeError). Bound directly to the
+# backend's function since JSONL readers call it once per line.
+loads: Callable[[Union[bytes, str]], Any] = _ORJSON.loads if _ORJSON is not None else _json_loads
+
+
+def _has_nonfinite(obj: Any) -> bool:
+    """Whether a float NaN/Infinity occurs anywhere in obj (orjson writes them as null)."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_nonfinite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_nonfinite(v) for v in obj)
+    return False
+
+
+def dumpb(obj: Any, indent: bool = False, default: Optional[Callable] = None) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print with two-space indentation
+        default: Called for objects the codec cannot serialize
+
+    Returns:
+        Encoded document (non-ASCII characters are not escaped; NaN and
+        Infinity are written as the stdlib does)
+
+    Raises:
+        TypeError: If the value is not serializable
+    """
+    if _ORJSON is not None:
+        option = _ORJSON.OPT_NON_STR_KEYS | (_ORJSON.OPT_INDENT_2 if indent else 0)
+        try:
+            out = _ORJSON.dumps(obj, default=default, option=option)
+            # Only a document with nulls can hide a NaN, so most skip the walk
+            if b"null" not in out or not _has_nonfinite(obj):
+                return out
+        except _ORJSON.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits: stdlib handles them
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+        default=default,
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False, default: Optional[Callable] = None) -> str:
+    """dumpb() decoded to str."""
+    return dumpb(obj, indent=indent, default=default).decode("utf-8")
@@ -8,6 +8,7 @@ import math
 from dataclasses import dataclass
 from typing import Any
 
+from .. import jsoncodec
 from .db import connect, insert, update_support
 
 
@@ -148,8 +149,8 @@ class Learner:
             tenant=row.tenant,
             target_hash=row.target_hash,
             env_fp=row.env_fp,
-            problems=json.dumps(row.problems),
-            evidence=json.dumps(row.evidence),
+            problems=jsoncodec.dumps(row.problems),
+            evidence=jsoncodec.dumps(row.evidence),
             preset=row.preset,
         )
 
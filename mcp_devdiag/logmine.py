@@ -0,0 +1,315 @@
+"""Online log template mining for error signature bucketing."""
+
+from __future__ import annotations
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp_devdiag.tail import encode_cursor, read_since
+from mcp_devdiag.timeparse import line_time, parse_window
+
+WILDCARD = "<*>"
+
+# Lines considered errors (level names, exceptions, JS runtime errors)
+ERROR_LINE = re.compile(
+    r"\b(error|exception|fatal|critical|traceback|panic|uncaught)\b|\w+(Error|Exception):",
+    re.I,
+)
+
+# Variable fragments replaced before tokenizing, in order
+_MASKS = [
+    (re.compile(r"^\[?\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}\S*\]?\s*"), ""),
+    (re.compile(r"\b[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}\b", re.I), WILDCARD),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), WILDCARD),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.I), WILDCARD),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?:ms|s|kb|mb|b)?\b", re.I), WILDCARD),
+]
+
+# Tokens beyond this are ignored for matching (bounds work per pathological line)
+MAX_TOKENS = 64
+
+# Bytes of history mined the first time a file is seen
+DEFAULT_BACKFILL_BYTES = 8 * 1024 * 1024
+
+# Bytes consumed per incremental read
+CHUNK_BYTES = 1024 * 1024
+
+
+def tokenize(line: str) -> List[str]:
+    """Mask variable fragments (timestamps, IDs, numbers) and split into tokens."""
+    for rx, repl in _MASKS:
+        line = rx.sub(repl, line)
+    return line.split()[:MAX_TOKENS]
+
+
+@dataclass(eq=False)
+class LogCluster:
+    """One mined template with occurrence statistics."""
+
+    id: int
+    tokens: List[str]
+    example: str
+    first_seen: float
+    last_seen: float
+    count: int = 0
+    minutes: Dict[int, int] = field(default_factory=dict)
+    sources: set = field(default_factory=set)
+    leaf: Optional[list] = None
+
+    @property
+    def template(self) -> str:
+        """Template text with wildcards for variable tokens."""
+        return " ".join(self.tokens)
+
+    def count_since(self, since: float) -> int:
+        """Occurrences in minutes starting at or after `since`."""
+        first = int(since // 60)
+        return sum(n for minute, n in self.minutes.items() if minute >= first)
+
+
+class DrainMiner:
+    """
+    Drain-style online template miner.
+
+    Lines are routed through a fixed-depth prefix tree (token count, then
+    the first `depth` tokens) to a small list of candidate clusters; the
+    most similar candidate absorbs the line, turning differing positions
+    into wildcards, or a new cluster is created. Work per line is bounded
+    by the tree depth and leaf size. At most `max_leaf_clusters` clusters
+    per leaf and `max_clusters` overall are kept; the least recently seen
+    are evicted.
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        sim_threshold: float = 0.5,
+        max_children: int = 100,
+        max_clusters: int = 1000,
+        retention_s: float = 86400,
+        max_leaf_clusters: int = 32,
+    ):
+        """
+        Initialize miner.
+
+        Args:
+            depth: Prefix tokens used to route a line to its leaf
+            sim_threshold: Fraction of equal tokens required to join a cluster
+            max_children: Fan-out per tree node before tokens collapse to a wildcard
+            max_clusters: Maximum clusters kept in memory
+            retention_s: Age after which per-minute counts are dropped
+            max_leaf_clusters: Maximum clusters per leaf (bounds the candidates per line)
+        """
+        self.depth = depth
+        self.sim_threshold = sim_threshold
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.retention_s = retention_s
+        self.max_leaf_clusters = max_leaf_clusters
+        self.root: Dict[int, dict] = {}
+        self.clusters: "OrderedDict[int, LogCluster]" = OrderedDict()
+        self._next_id = 1
+        self.evicted = 0
+
+    def _leaf(self, tokens: List[str]) -> list:
+        """Descend (creating nodes as needed) to the cluster ids for `tokens`, oldest first."""
+        node = self.root.setdefault(len(tokens), {})
+        for token in tokens[: self.depth]:
+            key = WILDCARD if any(c.isdigit() for c in token) else token
+            if key not in node:
+                key = key if len(node) < self.max_children else WILDCARD
+            node = node.setdefault(key, {})
+        return node.setdefault(None, [])
+
+    def _similarity(self, template: List[str], tokens: List[str]) -> tuple[float, int]:
+        """(fraction of equal non-wildcard tokens, wildcard count) for ranking."""
+        same = sum(1 for a, b in zip(template, tokens) if a == b and a != WILDCARD)
+        params = template.count(WILDCARD)
+        if params >= len(tokens):
+            return 1.0, params
+        return same / (len(tokens) - params), params
+
+    def add(self, line: str, ts: float, source: str = "") -> LogCluster:
+        """
+        Assign a line to a cluster, creating or generalizing templates.
+
+        Args:
+            line: Raw log line
+            ts: Event time (epoch seconds)
+            source: Label of the log the line came from
+
+        Returns:
+            The cluster the line was assigned to
+        """
+        tokens = tokenize(line)
+        leaf = self._leaf(tokens)
+
+        best: Optional[LogCluster] = None
+        best_score = (-1.0, -1)
+        for cid in leaf:
+            cluster = self.clusters[cid]
+            score = self._similarity(cluster.tokens, tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is None or best_score[0] < self.sim_threshold:
+            best = LogCluster(
+                id=self._next_id, tokens=tokens, example=line[:500], first_seen=ts, last_seen=ts
+            )
+            self._next_id += 1
+            best.leaf = leaf
+            leaf.append(best.id)
+            self.clusters[best.id] = best
+            if len(leaf) > self.max_leaf_clusters:
+                self._drop(leaf[0])
+            if len(self.clusters) > self.max_clusters:
+                self._drop(next(iter(self.clusters)))
+        else:
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+            self.clusters.move_to_end(best.id)
+            leaf.remove(best.id)
+            leaf.append(best.id)
+
+        best.count += 1
+        best.first_seen = min(best.first_seen, ts)
+        best.last_seen = max(best.last_seen, ts)
+        minute = int(ts // 60)
+        best.minutes[minute] = best.minutes.get(minute, 0) + 1
+        if source:
+            best.sources.add(source)
+        if len(best.minutes) > self.retention_s // 60:
+            cutoff = int((time.time() - self.retention_s) // 60)
+            best.minutes = {m: n for m, n in best.minutes.items() if m >= cutoff}
+        return best
+
+    def _drop(self, cid: int) -> None:
+        """Evict a cluster from the LRU order and its leaf."""
+        cluster = self.clusters.pop(cid)
+        if cluster.leaf is not None:
+            cluster.leaf.remove(cluster.id)
+        self.evicted += 1
+
+
+class ErrorBuckets:
+    """
+    Incremental error-signature bucketing over a set of log files.
+
+    Each update() reads only bytes appended since the previous call (one
+    cursor per file, see mcp_devdiag.tail) and feeds error lines to a
+    DrainMiner. The first time a file is seen only its last
+    `backfill_bytes` are mined. Lines are timestamped from a leading
+    timestamp when present, otherwise with the time they were read.
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, Path],
+        miner: Optional[DrainMiner] = None,
+        backfill_bytes: int = DEFAULT_BACKFILL_BYTES,
+    ):
+        """
+        Initialize bucketing.
+
+        Args:
+            sources: Label -> log path (e.g. {"backend": BACKEND_LOG})
+            miner: Template miner (default: DrainMiner())
+            backfill_bytes: History mined on first sight of a file
+        """
+        self.sources = sources
+        self.miner = miner or DrainMiner()
+        self.backfill_bytes = backfill_bytes
+        self.cursors: Dict[str, str] = {}
+        self.lines_seen = 0
+        self._lock = threading.Lock()
+
+    def _start_cursor(self, path: Path) -> tuple[str, bool]:
+        """Cursor for a file seen for the first time; True if it starts mid-line."""
+        st = path.stat()
+        start = max(0, st.st_size - self.backfill_bytes)
+        return encode_cursor(st.st_ino, start), start > 0
+
+    def update(self) -> int:
+        """
+        Mine lines appended since the last update.
+
+        Returns:
+            Number of error lines added
+        """
+        added = 0
+        with self._lock:
+            for label, path in self.sources.items():
+                if not path.exists():
+                    continue
+                cursor = self.cursors.get(label)
+                skip_first = False
+                if cursor is None:
+                    cursor, skip_first = self._start_cursor(path)
+                while True:
+                    # Lines are at least a byte each: the chunk size caps them
+                    res = read_since(path, cursor, n=CHUNK_BYTES, max_bytes=CHUNK_BYTES)
+                    now = time.time()
+                    lines = res.lines
+                    if skip_first and lines and not res.reset:
+                        lines, skip_first = lines[1:], False  # partial line at backfill start
+                    for line in lines:
+                        self.lines_seen += 1
+                        if ERROR_LINE.search(line):
+                            self.miner.add(line, line_time(line) or now, label)
+                            added += 1
+                    if res.cursor == cursor and not res.reset:
+                        break
+                    cursor = res.cursor
+                self.cursors[label] = cursor
+        return added
+
+    def buckets(
+        self, window: str = "15m", limit: int = 50, now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Error buckets with occurrences inside `window`, most frequent first.
+
+        Args:
+            window: Time window (e.g. "15m", "1h", "24h")
+            limit: Maximum buckets returned
+            now: Reference time (default: current time)
+
+        Returns:
+            Dict with window, buckets and miner statistics
+
+        Raises:
+            ValueError: If the window is malformed
+        """
+        since = (time.time() if now is None else now) - parse_window(window)
+        self.update()
+        with self._lock:
+            rows = []
+            for cluster in self.miner.clusters.values():
+                if cluster.last_seen < since:
+                    continue
+                count = cluster.count_since(since)
+                if count:
+                    rows.append((count, cluster))
+            rows.sort(key=lambda r: (r[0], r[1].last_seen), reverse=True)
+            return {
+                "window": window,
+                "buckets": [
+                    {
+                        "id": cluster.id,
+                        "template": cluster.template,
+                        "count": count,
+                        "total": cluster.count,
+                        "first_seen": int(cluster.first_seen),
+                        "last_seen": int(cluster.last_seen),
+                        "sources": sorted(cluster.sources),
+                        "example": cluster.example,
+                    }
+                    for count, cluster in rows[:limit]
+                ],
+                "clusters": len(self.miner.clusters),
+                "evicted": self.miner.evicted,
+                "lines_seen": self.lines_seen,
+            }
@@ -0,0 +1,705 @@
+"""Columnar sidecar of network.jsonl events for fast summaries and queries."""
+
+from __future__ import annotations
+import bisect
+import fnmatch
+import heapq
+import math
+import os
+import re
+import threading
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_devdiag import jsoncodec
+from mcp_devdiag.paths import url_template
+from mcp_devdiag.sketch import LatencySketch
+from mcp_devdiag.tail import decode_cursor, encode_cursor
+from mcp_devdiag.timeparse import event_time
+
+COLUMNS_VERSION = 2
+
+# Bytes parsed per update step (bounds memory while catching up on a large file)
+UPDATE_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Column name -> array typecode (native byte order; NumPy reads the same layout)
+COLUMNS = {"offset": "Q", "ts": "d", "status": "H", "dur": "i", "url": "I"}
+
+# Status classes with a posting list (row ids per class)
+CLASSES = ("2xx", "3xx", "4xx", "5xx", "other")
+
+# Time bucket width of the row index used for `since`
+BUCKET_S = 60
+
+# dur value for events without a dur_ms field
+NO_DURATION = -1
+
+# Requests at least this slow are listed in summaries (same as the JSON path)
+SLOW_MS = 1000
+
+
+# Rows filtered per step of a query (bounds work when `limit` is reached early)
+QUERY_BLOCK_ROWS = 64 * 1024
+
+# Distinct URL templates interned in meta.json; later ones share OTHER_URL
+MAX_URLS = 10_000
+OTHER_URL = "(other)"
+
+# Time bucket entries kept in meta.json; past this every other one is dropped
+MAX_BUCKETS = 4096
+
+_STATUS_RANGE = re.compile(r"^\s*(?:([1-5])xx|(\d{3})(?:\s*-\s*(\d{3}))?)\s*$", re.I)
+
+
+def _status_class(status: int) -> str:
+    """Summary bucket of a status code ("2xx" .. "5xx", else "other")."""
+    return f"{status // 100}xx" if 200 <= status < 600 else "other"
+
+
+def parse_status_range(spec: str) -> Tuple[int, int]:
+    """
+    Parse a status filter: a class ("5xx"), a range ("500-504") or a code ("404").
+
+    Returns:
+        Inclusive (low, high) status bounds
+
+    Raises:
+        ValueError: If the filter is not in one of those forms
+    """
+    m = _STATUS_RANGE.match(spec or "")
+    if not m:
+        raise ValueError(f"Invalid status range: {spec!r} (expected e.g. '5xx', '500-504', '404')")
+    if m.group(1):
+        return int(m.group(1)) * 100, int(m.group(1)) * 100 + 99
+    lo = int(m.group(2))
+    hi = int(m.group(3)) if m.group(3) else lo
+    if hi < lo:
+        raise ValueError(f"Invalid status range: {spec!r} (low bound above high bound)")
+    return lo, hi
+
+
+def _classes_for(lo: int, hi: int) -> List[str]:
+    """Status classes with at least one code in [lo, hi]."""
+    out = [f"{k}xx" for k in range(2, 6) if lo <= k * 100 + 99 and hi >= k * 100]
+    if lo < 200 or hi >= 600:
+        out.append("other")
+    return out
+
+
+def _numpy():
+    """NumPy module if installed, else None."""
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        return None
+
+
+class NetworkColumns:
+    """
+    Fixed-width columns of network.jsonl events in `<log stem>.cols/`.
+
+    One binary file per column (ts as float64 epoch seconds, status as
+    uint16, dur_ms as int32 with -1 for "absent", and the URL template as a
+    uint32 id into an interned list, plus each line's byte offset) and
+    `meta.json` with the byte offset and inode already ingested. Two indexes
+    serve query(): a posting list of row ids per status class
+    (`class_5xx.bin`, ...) and the first row of each new BUCKET_S time
+    bucket. update() parses only appended lines and appends their rows,
+    so each JSON line is decoded once over the life of the file. Queries
+    then read the columns instead of JSON text: with NumPy installed as
+    memory-mapped arrays and vectorized operations, otherwise as `array`
+    module arrays with plain loops.
+
+    The sidecar mirrors the current file: rotation (new inode) or
+    truncation rebuilds it from the new file. Columns are appended before
+    meta.json is replaced, so a crash mid-update only leaves extra rows
+    that are cut off on the next load.
+    """
+
+    def __init__(
+        self, log_path: Path, store_dir: Optional[Path] = None, use_numpy: Optional[bool] = None
+    ):
+        """
+        Initialize columns.
+
+        Args:
+            log_path: Path to network.jsonl
+            store_dir: Sidecar directory (default: <log stem>.cols next to the log)
+            use_numpy: Force (True) or disable (False) NumPy; default: use it if installed
+        """
+        self.log_path = log_path
+        self.store_dir = store_dir or log_path.with_name(log_path.stem + ".cols")
+        self.np = _numpy() if use_numpy is not False else None
+        if use_numpy and self.np is None:
+            raise ImportError("NumPy is not installed (pip install numpy)")
+        self._lock = threading.Lock()
+        self._meta: Optional[Dict[str, Any]] = None
+        self._url_ids: Dict[str, int] = {}
+
+    def _column_path(self, name: str) -> Path:
+        return self.store_dir / f"{name}.bin"
+
+    def _files(self, meta: Dict[str, Any]) -> Dict[str, Tuple[str, int]]:
+        """Every binary file of the sidecar: name -> (typecode, committed items)."""
+        files = {name: (code, meta.get("rows", 0)) for name, code in COLUMNS.items()}
+        for klass in CLASSES:
+            files[f"class_{klass}"] = ("I", meta.get("classes", {}).get(klass, 0))
+        return files
+
+    def _load(self) -> Dict[str, Any]:
+        """Load meta.json once; drop rows past the committed count."""
+        if self._meta is not None:
+            return self._meta
+        meta: Dict[str, Any] = {}
+        try:
+            meta = jsoncodec.loads((self.store_dir / "meta.json").read_bytes())
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get("version") != COLUMNS_VERSION or not self._trim(meta):
+            meta = self._reset()
+        self._meta = meta
+        self._url_ids = {url: i for i, url in enumerate(meta["urls"])}
+        return meta
+
+    def _trim(self, meta: Dict[str, Any]) -> bool:
+        """Cut every file to its committed length; False if one is shorter (corrupt)."""
+        for name, (code, count) in self._files(meta).items():
+            path = self._column_path(name)
+            size = count * array(code).itemsize
+            try:
+                if path.stat().st_size < size:
+                    return False
+                if path.stat().st_size > size:
+                    os.truncate(path, size)
+            except OSError:
+                if count:
+                    return False
+        return True
+
+    def _reset(self) -> Dict[str, Any]:
+        """Empty columns and meta (file replaced or sidecar unusable)."""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "version": COLUMNS_VERSION,
+            "inode": 0,
+            "offset": 0,
+            "rows": 0,
+            "classes": dict.fromkeys(CLASSES, 0),
+            "buckets": [],  # [bucket, first row] each time a later time bucket starts
+            "urls": [],
+        }
+        for name in self._files(meta):
+            # Replace rather than truncate: readers may still have the old file mapped
+            path = self._column_path(name)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(b"")
+            os.replace(tmp, path)
+        self._url_ids = {}
+        return meta
+
+    def _save_meta(self, meta: Dict[str, Any]) -> None:
+        path = self.store_dir / "meta.json"
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(jsoncodec.dumpb(meta))
+        os.replace(tmp, path)
+
+    def _intern(self, meta: Dict[str, Any], url: str) -> int:
+        uid = self._url_ids.get(url)
+        if uid is None:
+            if len(meta["urls"]) >= MAX_URLS and url != OTHER_URL:
+                return self._intern(meta, OTHER_URL)
+            uid = self._url_ids[url] = len(meta["urls"])
+            meta["urls"].append(url)
+        return uid
+
+    def update(self) -> Dict[str, int]:
+        """
+        Append rows for lines added to the log since the last update.
+
+        Returns:
+            Counters for this run: rows appended, bytes consumed, reset (0/1)
+        """
+        with self._lock:
+            meta = self._load()
+            if not self.log_path.exists():
+                return {"rows": 0, "bytes": 0, "reset": 0}
+
+            st = self.log_path.stat()
+            reset = st.st_ino != meta["inode"] or st.st_size < meta["offset"]
+            if reset and (meta["rows"] or meta["offset"]):
+                meta = self._meta = self._reset()
+            offset = start = meta["offset"]
+            appended = 0
+            with self.log_path.open("rb") as f:
+                f.seek(offset)
+                while offset < st.st_size:
+                    data = f.read(min(UPDATE_CHUNK_BYTES, st.st_size - offset))
+                    end = data.rfind(b"\n") + 1
+                    if end == 0:
+                        if len(data) < UPDATE_CHUNK_BYTES:
+                            break  # partial line at EOF: wait for the writer
+                        end = len(data)  # oversized line: skip it
+                    appended += self._append(meta, data[:end], offset)
+                    offset += end
+                    f.seek(offset)
+
+            meta["inode"] = st.st_ino
+            meta["offset"] = offset
+            if offset != start or reset:
+                self._save_meta(meta)
+            return {"rows": appended, "bytes": offset - start, "reset": int(reset)}
+
+    def _append(self, meta: Dict[str, Any], data: bytes, base: int) -> int:
+        """Parse complete lines (starting at file offset `base`) and append their rows."""
+        # Typecodes differ per column (ts is array("d"), the others integer)
+        cols: Dict[str, "array[Any]"] = {name: array(code) for name, code in COLUMNS.items()}
+        postings = {klass: array("I") for klass in CLASSES}
+        buckets = meta["buckets"]
+        row = meta["rows"]
+        pos = 0
+        while pos < len(data):
+            nl = data.find(b"\n", pos)
+            end = len(data) if nl < 0 else nl
+            line, line_start, pos = data[pos:end], base + pos, end + 1
+            if not line.strip():
+                continue
+            try:
+                ev = jsoncodec.loads(line)
+            except Exception:
+                continue
+            if not isinstance(ev, dict):
+                continue
+            ts = event_time(ev)
+            try:
+                status = int(ev.get("status") or 0)
+                dur = int(ev.get("dur_ms") or 0) if "dur_ms" in ev else NO_DURATION
+            except (TypeError, ValueError):
+                continue
+            # Buckets follow the running maximum ts: every row before a bucket's
+            # first row is stamped earlier, also when events arrive out of order
+            if ts is not None and (not buckets or ts // BUCKET_S > buckets[-1][0]):
+                buckets.append([int(ts // BUCKET_S), row])
+            cols["offset"].append(line_start)
+            cols["ts"].append(math.nan if ts is None else ts)
+            status = min(max(status, 0), 0xFFFF)
+            cols["status"].append(status)
+            cols["dur"].append(min(max(dur, NO_DURATION), 0x7FFFFFFF))
+            cols["url"].append(self._intern(meta, url_template(str(ev.get("url") or ""))))
+            postings[_status_class(status)].append(row)
+            row += 1
+        while len(buckets) > MAX_BUCKETS:
+            # Coarser index, same guarantee (the newest entry holds the maximum)
+            buckets[:] = buckets[-1::-2][::-1]
+        for name, col in cols.items():
+            with self._column_path(name).open("ab") as f:
+                col.tofile(f)
+        for klass, rows in postings.items():
+            with self._column_path(f"class_{klass}").open("ab") as f:
+                rows.tofile(f)
+            meta["classes"][klass] += len(rows)
+        appended = row - meta["rows"]
+        meta["rows"] = row
+        return appended
+
+    def _read(self, name: str, code: str, first: int, count: int) -> Any:
+        """Items [first, first + count) of one file as a memmap or array."""
+        path = self._column_path(name)
+        itemsize = array(code).itemsize
+        if self.np is not None:
+            if count <= 0:
+                return self.np.empty(0, dtype=code)
+            return self.np.memmap(
+                path, dtype=code, mode="r", offset=first * itemsize, shape=(count,)
+            )
+        col = array(code)
+        if count > 0:
+            with path.open("rb") as f:
+                f.seek(first * itemsize)
+                col.fromfile(f, count)
+        return col
+
+    def columns(self, n: int = 0) -> Dict[str, Any]:
+        """
+        The last n rows of every column (all rows when n <= 0).
+
+        Returns:
+            Column name -> NumPy memmap (read-only) or array.array; plus
+            "urls", the template for each url id
+        """
+        with self._lock:
+            meta = self._load()
+            rows, urls = meta["rows"], list(meta["urls"])
+        first = max(0, rows - n) if n > 0 else 0
+        out: Dict[str, Any] = {"urls": urls}
+        for name, code in COLUMNS.items():
+            out[name] = self._read(name, code, first, rows - first)
+        return out
+
+    def summary(self, n: int = 500) -> Dict[str, Any]:
+        """
+        Summary of the last n events (n <= 0: all), same shape as the JSON path.
+
+        Events are visited in the JSON path's order (newest first for n > 0,
+        file order otherwise) so that ties in top-N lists come out the same.
+
+        Returns:
+            Dict with total, buckets, top_fails, slow, latency and latency_by_url
+        """
+        self.update()
+        cols = self.columns(n)
+        if self.np is not None:
+            return self._summary_numpy(self.np, cols, newest_first=n > 0)
+        return self._summary_python(cols, newest_first=n > 0)
+
+    def _summary_numpy(self, np: Any, cols: Dict[str, Any], newest_first: bool) -> Dict[str, Any]:
+        status, dur, url, urls = cols["status"], cols["dur"], cols["url"], cols["urls"]
+        if newest_first:
+            status, dur, url = status[::-1], dur[::-1], url[::-1]
+        klass = np.where((status >= 200) & (status < 600), status // 100, 0)
+        counts = np.bincount(klass, minlength=6)
+        buckets = {f"{k}xx": int(counts[k]) for k in range(2, 6)}
+        buckets["other"] = int(counts[0] + counts[1])
+
+        failing = url[(status >= 400) & (status < 600)]
+        fail_ids = _top_ids(
+            np.bincount(failing, minlength=len(urls)), 10, _first_seen(np, failing, len(urls))
+        )
+
+        # Slowest first; equal durations: later in visiting order first
+        slow_idx = np.nonzero(dur >= SLOW_MS)[0]
+        order = slow_idx[np.lexsort((slow_idx, dur[slow_idx]))[::-1][:10]]
+
+        timed = dur >= 0
+        timed_url, timed_dur = url[timed], dur[timed]
+        overall = LatencySketch()
+        overall.add_many(np.asarray(timed_dur))
+        latency_by_url = {}
+        top_timed = _top_ids(
+            np.bincount(timed_url, minlength=len(urls)), 20, _first_seen(np, timed_url, len(urls))
+        )
+        for uid, _ in top_timed:
+            sk = LatencySketch()
+            sk.add_many(np.asarray(timed_dur[timed_url == uid]))
+            latency_by_url[urls[uid]] = sk.summary()
+        return {
+            "total": int(len(status)),
+            "buckets": buckets,
+            "top_fails": [(urls[uid], c) for uid, c in fail_ids],
+            "slow": [
+                {"url": urls[int(url[i])], "dur_ms": int(dur[i]), "status": int(status[i])}
+                for i in order
+            ],
+            "latency": overall.summary(),
+            "latency_by_url": latency_by_url,
+        }
+
+    def _summary_python(self, cols: Dict[str, Any], newest_first: bool) -> Dict[str, Any]:
+        status, dur, url, urls = cols["status"], cols["dur"], cols["url"], cols["urls"]
+        buckets = {"2xx": 0, "3xx": 0, "4xx": 0, "5xx": 0, "other": 0}
+        fails: Dict[int, int] = {}
+        slow: List[tuple] = []
+        overall = LatencySketch()
+        sketches: Dict[int, LatencySketch] = {}
+        rows = range(len(status) - 1, -1, -1) if newest_first else range(len(status))
+        for seq, i in enumerate(rows):
+            st, d, uid = status[i], dur[i], url[i]
+            if 200 <= st < 600:
+                buckets[f"{st // 100}xx"] += 1
+                if st >= 400:
+                    fails[uid] = fails.get(uid, 0) + 1
+            else:
+                buckets["other"] += 1
+            if d >= SLOW_MS:
+                slow.append((d, seq, i))
+            if d >= 0:
+                overall.add(d)
+                sk = sketches.get(uid)
+                if sk is None:
+                    sk = sketches[uid] = LatencySketch()
+                sk.add(d)
+        slow.sort(reverse=True)
+        top_fails = sorted(fails.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        by_count = sorted(sketches.items(), key=lambda kv: kv[1].count, reverse=True)[:20]
+        return {
+            "total": len(status),
+            "buckets": buckets,
+            "top_fails": [(urls[uid], c) for uid, c in top_fails],
+            "slow": [
+                {"url": urls[url[i]], "dur_ms": d, "status": status[i]} for d, _, i in slow[:10]
+            ],
+            "latency": overall.summary(),
+            "latency_by_url": {urls[uid]: sk.summary() for uid, sk in by_count},
+        }
+
+    def query(
+        self,
+        status_range: Optional[str] = None,
+        url_glob: Optional[str] = None,
+        min_dur_ms: int = 0,
+        since: Optional[float] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Events matching all given filters, newest first, with keyset paging.
+
+        Candidate rows come from the status-class posting lists (only the
+        classes the status range touches) cut to the rows at/after the
+        first time bucket of `since`, so selective queries read neither the
+        whole log nor whole columns. Remaining filters run on the columns;
+        only the returned events are read back from the log.
+
+        Args:
+            status_range: "5xx", "500-504" or "404" (see parse_status_range)
+            url_glob: fnmatch pattern on URL route templates, e.g. "/api/users/*"
+            min_dur_ms: Only events with a dur_ms of at least this
+            since: Only events stamped at/after this epoch time
+            limit: Maximum events returned
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Dict with events, next_cursor (None on the last page) and
+            scanned (candidate rows examined); with more than MAX_URLS URL
+            templates a page may hold fewer than `limit` events
+
+        Raises:
+            ValueError: If the status range or cursor is invalid, or the
+                cursor belongs to a log that has since been rotated
+        """
+        bounds = parse_status_range(status_range) if status_range else None
+        self.update()
+        with self._lock:
+            meta = self._load()
+            rows, inode, urls = meta["rows"], meta["inode"], list(meta["urls"])
+            classes, buckets = dict(meta["classes"]), [b[:] for b in meta["buckets"]]
+
+        hi = rows
+        if cursor:
+            cur_inode, hi = decode_cursor(cursor)
+            if cur_inode != inode:
+                raise ValueError("Cursor is from a rotated network log; query again without it")
+            hi = min(hi, rows)
+        lo = 0
+        if since is not None:
+            # Last bucket starting at/before since: earlier rows are all older
+            i = bisect.bisect_right([b[0] for b in buckets], math.floor(since / BUCKET_S)) - 1
+            lo = buckets[i][1] if i >= 0 else 0
+        url_ids = None
+        other = None
+        if url_glob:
+            url_ids = [uid for uid, u in enumerate(urls) if fnmatch.fnmatchcase(u, url_glob)]
+            if OTHER_URL in urls:
+                # Templates past MAX_URLS are matched on the event itself below
+                other = urls.index(OTHER_URL)
+                url_ids.append(other)
+
+        out: Dict[str, Any] = {"events": [], "next_cursor": None, "scanned": 0}
+        if limit <= 0 or lo >= hi or url_ids == []:
+            return out
+        wanted = _classes_for(*bounds) if bounds else list(CLASSES)
+        postings = None
+        if len(wanted) < len(CLASSES):
+            postings = [self._read(f"class_{klass}", "I", 0, classes[klass]) for klass in wanted]
+        cols = {name: self._read(name, code, 0, rows) for name, code in COLUMNS.items()}
+        cols["urls"] = urls
+        filters = (bounds, url_ids, min_dur_ms, since)
+        if self.np is not None:
+            hits = self._query_numpy(self.np, cols, postings, lo, hi, filters, limit, out)
+        else:
+            hits = self._query_python(cols, postings, lo, hi, filters, limit, out)
+
+        with self.log_path.open("rb") as f:
+            for row in hits:
+                f.seek(int(cols["offset"][row]))
+                try:
+                    ev = jsoncodec.loads(f.readline())
+                except ValueError:
+                    continue
+                if other is not None and int(cols["url"][row]) == other:
+                    if not _matches(ev, None, url_glob, 0, None):
+                        continue
+                out["events"].append(ev)
+        if len(hits) >= limit:
+            out["next_cursor"] = encode_cursor(inode, int(hits[-1]))
+        return out
+
+    def _query_numpy(self, np, cols, postings, lo, hi, filters, limit, out) -> List[int]:
+        bounds, url_ids, min_dur_ms, since = filters
+        if postings is not None:
+            parts = [p[np.searchsorted(p, lo) : np.searchsorted(p, hi)] for p in postings]
+            candidates = np.sort(np.concatenate(parts))[::-1]
+        else:
+            candidates = np.arange(hi - 1, lo - 1, -1)
+        id_mask = None
+        if url_ids is not None:
+            id_mask = np.zeros(len(cols["urls"]), dtype=bool)
+            id_mask[url_ids] = True
+        hits: List[int] = []
+        for start in range(0, len(candidates), QUERY_BLOCK_ROWS):
+            block = candidates[start : start + QUERY_BLOCK_ROWS]
+            out["scanned"] += len(block)
+            keep = np.ones(len(block), dtype=bool)
+            if bounds is not None:
+                status = cols["status"][block]
+                keep &= (status >= bounds[0]) & (status <= bounds[1])
+            if min_dur_ms > 0:
+                keep &= cols["dur"][block] >= min_dur_ms
+            if since is not None:
+                keep &= cols["ts"][block] >= since  # NaN (no timestamp) compares False
+            if id_mask is not None:
+                keep &= id_mask[cols["url"][block]]
+            hits.extend(block[keep][: limit - len(hits)].tolist())
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def _query_python(self, cols, postings, lo, hi, filters, limit, out) -> List[int]:
+        bounds, url_ids, min_dur_ms, since = filters
+        if postings is not None:
+            parts = [
+                reversed(p[bisect.bisect_left(p, lo) : bisect.bisect_left(p, hi)]) for p in postings
+            ]
+            candidates: Any = heapq.merge(*parts, reverse=True)
+        else:
+            candidates = range(hi - 1, lo - 1, -1)
+        ids = set(url_ids) if url_ids is not None else None
+        status, dur, ts, url = cols["status"], cols["dur"], cols["ts"], cols["url"]
+        hits: List[int] = []
+        for row in candidates:
+            out["scanned"] += 1
+            if bounds is not None and not bounds[0] <= status[row] <= bounds[1]:
+                continue
+            if min_dur_ms > 0 and dur[row] < min_dur_ms:
+                continue
+            if since is not None and not ts[row] >= since:
+                continue
+            if ids is not None and url[row] not in ids:
+                continue
+            hits.append(row)
+            if len(hits) >= limit:
+                break
+        return hits
+
+
+def _matches(
+    ev: Any,
+    bounds: Optional[Tuple[int, int]],
+    url_glob: Optional[str],
+    min_dur_ms: int,
+    since: Optional[float],
+) -> bool:
+    """Whether a parsed event passes the query filters."""
+    if not isinstance(ev, dict):
+        return False
+    try:
+        status = int(ev.get("status") or 0)
+        dur = int(ev.get("dur_ms") or 0) if "dur_ms" in ev else NO_DURATION
+    except (TypeError, ValueError):
+        return False
+    if bounds is not None and not bounds[0] <= status <= bounds[1]:
+        return False
+    if min_dur_ms > 0 and dur < min_dur_ms:
+        return False
+    if since is not None:
+        ts = event_time(ev)
+        if ts is None or ts < since:
+            return False
+    if url_glob and not fnmatch.fnmatchcase(url_template(str(ev.get("url") or "")), url_glob):
+        return False
+    return True
+
+
+def scan_query(
+    log_path: Path,
+    status_range: Optional[str] = None,
+    url_glob: Optional[str] = None,
+    min_dur_ms: int = 0,
+    since: Optional[float] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    NetworkColumns.query() answered by reading the log front to back.
+
+    Used when `diag.network_columns` is off. Cursors hold a byte offset
+    instead of a row id, so they only page results of this function.
+
+    Returns:
+        Dict with events, next_cursor (None on the last page) and
+        scanned (lines examined)
+
+    Raises:
+        ValueError: If the status range or cursor is invalid, or the
+            cursor belongs to a log that has since been rotated
+    """
+    bounds = parse_status_range(status_range) if status_range else None
+    out: Dict[str, Any] = {"events": [], "next_cursor": None, "scanned": 0}
+    if limit <= 0 or not log_path.exists():
+        return out
+    inode = log_path.stat().st_ino
+    hi = None
+    if cursor:
+        cur_inode, hi = decode_cursor(cursor)
+        if cur_inode != inode:
+            raise ValueError("Cursor is from a rotated network log; query again without it")
+    hits: "deque[Tuple[int, Any]]" = deque(maxlen=limit)  # newest matches seen so far
+    offset = 0
+    with log_path.open("rb") as f:
+        for line in f:
+            start, offset = offset, offset + len(line)
+            if hi is not None and start >= hi:
+                break
+            out["scanned"] += 1
+            try:
+                ev = jsoncodec.loads(line)
+            except ValueError:
+                continue
+            if _matches(ev, bounds, url_glob, min_dur_ms, since):
+                hits.append((start, ev))
+    out["events"] = [ev for _, ev in reversed(hits)]
+    if len(hits) >= limit:
+        out["next_cursor"] = encode_cursor(inode, hits[0][0])
+    return out
+
+
+def _first_seen(np: Any, ids: Any, size: int) -> Any:
+    """Index of each id's first occurrence in `ids` (len(ids) if absent)."""
+    first = np.full(size, len(ids), dtype=np.int64)
+    if len(ids):
+        uniq, idx = np.unique(ids, return_index=True)
+        first[uniq] = idx
+    return first
+
+
+def _top_ids(counts: Any, k: int, first: Any) -> List[tuple]:
+    """(url id, count) pairs with the k highest non-zero counts, ties by first occurrence."""
+    pairs = [(uid, int(c)) for uid, c in enumerate(counts.tolist()) if c]
+    return sorted(pairs, key=lambda kv: (-kv[1], first[kv[0]]))[:k]
+
+
+_COLUMNS: Dict[Path, NetworkColumns] = {}
+_COLUMNS_LOCK = threading.Lock()
+_ENABLED: Optional[bool] = None
+
+
+def columns_enabled() -> bool:
+    """Whether `diag.network_columns` is set in devdiag.yaml (default: off)."""
+    global _ENABLED
+    if _ENABLED is None:
+        from mcp_devdiag.config import load_config
+
+        _ENABLED = bool(load_config().network_columns)
+    return _ENABLED
+
+
+def get_network_columns(path: Path) -> NetworkColumns:
+    """Process-wide NetworkColumns for a network log path."""
+    with _COLUMNS_LOCK:
+        cols = _COLUMNS.get(path)
+        if cols is None:
+            cols = _COLUMNS[path] = NetworkColumns(path)
+        return cols
@@ -0,0 +1,317 @@
+"""Persistent per-minute rollups of network.jsonl."""
+
+from __future__ import annotations
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from mcp_devdiag import jsoncodec
+from mcp_devdiag.paths import url_template
+from mcp_devdiag.sketch import LatencySketch
+from mcp_devdiag.timeparse import event_time, parse_window
+
+ROLLUP_VERSION = 3
+
+# Minutes kept in the sidecar; older rollups are pruned on compaction
+DEFAULT_RETENTION_S = 7 * 86400
+
+# The journal is compacted once appended records exceed this many bytes and
+# COMPACT_FACTOR times the size of its last snapshot
+COMPACT_MIN_BYTES = 1024 * 1024
+COMPACT_FACTOR = 2
+
+# Bytes parsed per update step (bounds memory while catching up on a large file)
+UPDATE_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Per-minute cardinality caps for failing URLs and latency templates
+MAX_KEYS_PER_MINUTE = 200
+
+_BUCKETS = ("2xx", "3xx", "4xx", "5xx", "other")
+
+
+def _bucket(status: int) -> str:
+    """Status class of an HTTP status code."""
+    if 200 <= status < 600:
+        return f"{status // 100}xx"
+    return "other"
+
+
+def _new_minute() -> Dict[str, Any]:
+    return {"total": 0, "buckets": dict.fromkeys(_BUCKETS, 0), "fails": {}, "lat": {}}
+
+
+class NetworkRollup:
+    """
+    Incremental aggregator over network.jsonl with a JSON-lines journal store.
+
+    Each update() parses only the bytes appended since the last run (the
+    offset and inode are kept in the sidecar) and folds every event into a
+    per-minute rollup: status buckets, failure counts and latency sketches
+    per URL template. Window queries merge the minute rollups, so
+    their cost depends on the window length, not on the size of the log.
+
+    The sidecar is a journal: each update appends one record holding the new
+    offset and only the minutes it changed, so write cost follows the new
+    data rather than the retention. Loading replays the records (later
+    minutes replace earlier ones). compact() rewrites the journal as a
+    single snapshot without expired minutes; update() runs it once the
+    appended records outgrow the last snapshot.
+
+    Events are assigned to minutes by their `ts`/`timestamp` field, falling
+    back to the time they were ingested. Rotation (new inode) or truncation
+    restarts reading at the top of the new file; rollups already recorded
+    are kept.
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        store_path: Optional[Path] = None,
+        retention_s: float = DEFAULT_RETENTION_S,
+    ):
+        """
+        Initialize rollup.
+
+        Args:
+            log_path: Path to network.jsonl
+            store_path: Sidecar journal (default: <log>.rollup.jsonl next to the log)
+            retention_s: Age after which minute rollups are dropped
+        """
+        self.log_path = log_path
+        self.store_path = store_path or log_path.with_name(log_path.stem + ".rollup.jsonl")
+        self.retention_s = retention_s
+        self._lock = threading.Lock()
+        self._state: Optional[Dict[str, Any]] = None
+        self._snapshot_bytes = 0  # size of the journal's first (snapshot) record
+        self._journal_bytes = 0  # bytes appended after it
+
+    def _load(self) -> Dict[str, Any]:
+        """Replay the journal (once), starting fresh if missing or incompatible."""
+        if self._state is not None:
+            return self._state
+        state: Dict[str, Any] = {"inode": 0, "offset": 0, "minutes": {}}
+        data = b""
+        try:
+            data = self.store_path.read_bytes()
+        except OSError:
+            pass
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # Torn last record (crash mid-append): drop it so appends start on a new line
+            os.truncate(self.store_path, end)
+        self._snapshot_bytes, self._journal_bytes = 0, 0
+        for line in data[:end].splitlines(keepends=True):
+            try:
+                record = jsoncodec.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict) or record.get("v") != ROLLUP_VERSION:
+                # Unreadable or old format: start over; the next save rewrites the file
+                state = {"inode": 0, "offset": 0, "minutes": {}}
+                self._snapshot_bytes, self._journal_bytes = 0, COMPACT_MIN_BYTES
+                break
+            state["inode"], state["offset"] = record["inode"], record["offset"]
+            state["minutes"].update(record["minutes"])
+            if self._snapshot_bytes == 0:
+                self._snapshot_bytes = len(line)
+            else:
+                self._journal_bytes += len(line)
+        self._state = state
+        return state
+
+    def _record(self, state: Dict[str, Any], minutes: Dict[str, Any]) -> bytes:
+        return (
+            jsoncodec.dumpb(
+                {
+                    "v": ROLLUP_VERSION,
+                    "inode": state["inode"],
+                    "offset": state["offset"],
+                    "minutes": minutes,
+                }
+            )
+            + b"\n"
+        )
+
+    def _save(self, state: Dict[str, Any], dirty: Set[str]) -> None:
+        """Append a record with the new offset and the minutes changed by this update."""
+        if self._journal_bytes >= max(COMPACT_MIN_BYTES, COMPACT_FACTOR * self._snapshot_bytes):
+            self._compact(state)
+            return
+        record = self._record(state, {m: state["minutes"][m] for m in dirty})
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.store_path.open("ab") as f:
+            f.write(record)
+        if self._snapshot_bytes == 0:
+            self._snapshot_bytes = len(record)
+        else:
+            self._journal_bytes += len(record)
+
+    def _compact(self, state: Dict[str, Any]) -> None:
+        """Drop expired minutes and rewrite the journal as one snapshot record."""
+        cutoff = int((time.time() - self.retention_s) // 60)
+        state["minutes"] = {m: r for m, r in state["minutes"].items() if int(m) >= cutoff}
+        record = self._record(state, state["minutes"])
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.store_path.with_name(self.store_path.name + ".tmp")
+        tmp.write_bytes(record)
+        os.replace(tmp, self.store_path)
+        self._snapshot_bytes, self._journal_bytes = len(record), 0
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Rewrite the sidecar as a single snapshot without expired minutes.
+
+        Returns:
+            Minutes kept and sidecar size in bytes
+        """
+        with self._lock:
+            state = self._load()
+            self._compact(state)
+            return {"minutes": len(state["minutes"]), "bytes": self._snapshot_bytes}
+
+    def _fold(
+        self,
+        state: Dict[str, Any],
+        sketches: Dict[tuple, LatencySketch],
+        ev: Dict[str, Any],
+        now: float,
+        dirty: Set[str],
+    ) -> None:
+        """Add one event to its minute rollup (latency goes to live sketches)."""
+        ts = event_time(ev)
+        minute = str(int((ts if ts is not None else now) // 60))
+        dirty.add(minute)
+        roll = state["minutes"].get(minute)
+        if roll is None:
+            roll = state["minutes"][minute] = _new_minute()
+
+        st = int(ev.get("status") or 0)
+        url = url_template(str(ev.get("url") or ""))
+        bucket = _bucket(st)
+        roll["total"] += 1
+        roll["buckets"][bucket] += 1
+        if bucket in ("4xx", "5xx"):
+            fails = roll["fails"]
+            if url in fails or len(fails) < MAX_KEYS_PER_MINUTE:
+                fails[url] = fails.get(url, 0) + 1
+        if "dur_ms" in ev:
+            key = (minute, url)
+            sk = sketches.get(key)
+            if sk is None:
+                lat = roll["lat"]
+                if url in lat:
+                    sk = LatencySketch.from_dict(lat[url])
+                elif len(lat) < MAX_KEYS_PER_MINUTE:
+                    sk = LatencySketch()
+                    lat[url] = None  # reserve the slot; filled in after the run
+                else:
+                    return
+                sketches[key] = sk
+            sk.add(int(ev.get("dur_ms") or 0))
+
+    def update(self) -> Dict[str, int]:
+        """
+        Fold lines appended since the last update into the rollups.
+
+        Returns:
+            Counters for this run: lines parsed, bytes consumed, reset (0/1)
+        """
+        with self._lock:
+            state = self._load()
+            if not self.log_path.exists():
+                return {"lines": 0, "bytes": 0, "reset": 0}
+
+            st = self.log_path.stat()
+            offset = state["offset"]
+            reset = st.st_ino != state["inode"] or st.st_size < offset
+            if reset:
+                offset = 0
+
+            now = time.time()
+            parsed = 0
+            start = offset
+            sketches: Dict[tuple, LatencySketch] = {}
+            dirty: Set[str] = set()
+            with self.log_path.open("rb") as f:
+                f.seek(offset)
+                while offset < st.st_size:
+                    data = f.read(min(UPDATE_CHUNK_BYTES, st.st_size - offset))
+                    end = data.rfind(b"\n") + 1
+                    if end == 0:
+                        if len(data) < UPDATE_CHUNK_BYTES:
+                            break  # partial line at EOF: wait for the writer
+                        end = len(data)  # oversized line: skip it
+                    for line in data[:end].splitlines():
+                        if not line.strip():
+                            continue
+                        try:
+                            ev = jsoncodec.loads(line)
+                        except Exception:
+                            continue
+                        if isinstance(ev, dict):
+                            self._fold(state, sketches, ev, now, dirty)
+                            parsed += 1
+                    offset += end
+                    f.seek(offset)
+
+            for (minute, template), sk in sketches.items():
+                state["minutes"][minute]["lat"][template] = sk.to_dict()
+
+            state["inode"] = st.st_ino
+            state["offset"] = offset
+            if offset != start or reset:
+                self._save(state, dirty)
+            return {"lines": parsed, "bytes": offset - start, "reset": int(reset)}
+
+    def summary(self, window: str = "15m", now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Merge the minute rollups covering the last `window`.
+
+        Args:
+            window: Window such as "15m", "1h" or "24h"
+            now: Reference time (default: current time)
+
+        Returns:
+            Dict with window, total, buckets, top_fails, latency and latency_by_url
+        """
+        seconds = parse_window(window)
+        self.update()
+        now = time.time() if now is None else now
+        first = int((now - seconds) // 60) + 1
+        last = int(now // 60)
+
+        total = 0
+        buckets = dict.fromkeys(_BUCKETS, 0)
+        fails: Dict[str, int] = {}
+        overall = LatencySketch()
+        sketches: Dict[str, LatencySketch] = {}
+        with self._lock:
+            minutes = self._load()["minutes"]
+            for minute, roll in minutes.items():
+                if not first <= int(minute) <= last:
+                    continue
+                total += roll["total"]
+                for bucket, count in roll["buckets"].items():
+                    buckets[bucket] = buckets.get(bucket, 0) + count
+                for url, count in roll["fails"].items():
+                    fails[url] = fails.get(url, 0) + count
+                for template, data in roll["lat"].items():
+                    sk = LatencySketch.from_dict(data)
+                    overall.merge(sk)
+                    if template in sketches:
+                        sketches[template].merge(sk)
+                    else:
+                        sketches[template] = sk
+
+        top_fails = sorted(fails.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        by_count = sorted(sketches.items(), key=lambda kv: kv[1].count, reverse=True)[:20]
+        return {
+            "window": window,
+            "total": total,
+            "buckets": buckets,
+            "top_fails": top_fails,
+            "latency": overall.summary(),
+            "latency_by_url": {template: sk.summary() for template, sk in by_count},
+        }
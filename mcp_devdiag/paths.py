@@ -0,0 +1,126 @@
+"""URL path templating for network analysis."""
+
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+# Segment heuristics, checked in order
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+_NUMBER = re.compile(r"^\d+$")
+_HEX = re.compile(r"^[0-9a-f]{16,}$", re.I)
+_TOKEN = re.compile(r"^[A-Za-z0-9_\-]{24,}$")
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _segment_template(seg: str) -> str:
+    """Placeholder for an ID-like path segment, or the segment unchanged."""
+    if _NUMBER.match(seg):
+        return "{id}"
+    if _UUID.match(seg):
+        return "{uuid}"
+    if _HEX.match(seg) or (_TOKEN.match(seg) and any(c.isdigit() for c in seg)):
+        return "{hash}"
+    return seg
+
+
+class PathNormalizer:
+    """
+    Map request URLs to route templates (`/users/123?x=1` -> `/users/{id}`).
+
+    Configured patterns (`redaction.path_params_regex`) are matched against
+    the URL path first. Named groups are replaced by `{name}`; without
+    groups, the last segment of the match becomes a placeholder (`{id}`,
+    `{uuid}`, `{hash}`, or `{param}` if no heuristic applies). Remaining
+    segments fall back to UUID, number and hash heuristics. Query string
+    and fragment are dropped, scheme and host are kept. Results are memoized
+    in an LRU cache since network logs repeat the same URLs heavily.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize normalizer.
+
+        Args:
+            patterns: Regexes matched against the URL path
+            cache_size: Maximum memoized URLs
+
+        Raises:
+            ValueError: If a pattern is not a valid regex
+        """
+        self.patterns = []
+        for pattern in patterns:
+            try:
+                self.patterns.append(re.compile(pattern))
+            except re.error as e:
+                raise ValueError(f"Invalid path_params_regex {pattern!r}: {e}")
+        self.template = lru_cache(maxsize=cache_size)(self._template)
+
+    def _apply_patterns(self, path: str) -> tuple[str, str]:
+        """Template the prefix matched by a configured pattern; returns (head, rest)."""
+        for rx in self.patterns:
+            m = rx.match(path)
+            if not m:
+                continue
+            head = m.group(0)
+            if rx.groupindex:
+                for name in sorted(rx.groupindex, key=lambda g: m.start(g), reverse=True):
+                    if m.start(name) >= 0:
+                        s, e = m.start(name) - m.start(), m.end(name) - m.start()
+                        head = head[:s] + "{" + name + "}" + head[e:]
+            else:
+                seg_end = len(head.rstrip("/"))
+                cut = head.rfind("/", 0, seg_end) + 1
+                seg = _segment_template(head[cut:seg_end])
+                head = head[:cut] + (seg if seg.startswith("{") else "{param}") + head[seg_end:]
+            return head, path[m.end() :]
+        return "", path
+
+    def _template(self, url: str) -> str:
+        """Uncached URL -> template conversion."""
+        parts = urlsplit(url)
+        head, rest = self._apply_patterns(parts.path)
+        rest = "/".join(_segment_template(seg) if seg else seg for seg in rest.split("/"))
+        prefix = f"{parts.scheme}://{parts.netloc}" if parts.netloc else ""
+        return prefix + head + rest
+
+    def cache_info(self):
+        """LRU statistics of the URL -> template memo."""
+        return self.template.cache_info()
+
+
+_NORMALIZER: Optional[PathNormalizer] = None
+
+
+def get_path_normalizer() -> PathNormalizer:
+    """Get the process-wide normalizer, built from devdiag.yaml on first use."""
+    global _NORMALIZER
+    if _NORMALIZER is None:
+        from mcp_devdiag.config import load_config
+
+        patterns = load_config().redaction.get("path_params_regex") or []
+        _NORMALIZER = PathNormalizer(patterns)
+    return _NORMALIZER
+
+
+def configure_path_normalizer(patterns: Iterable[str] = (), **settings) -> PathNormalizer:
+    """
+    Replace the process-wide normalizer.
+
+    Args:
+        patterns: Regexes matched against the URL path
+        **settings: Other PathNormalizer keyword arguments
+
+    Returns:
+        The new normalizer
+    """
+    global _NORMALIZER
+    _NORMALIZER = PathNormalizer(patterns, **settings)
+    return _NORMALIZER
+
+
+def url_template(url: str) -> str:
+    """Route template for a request URL using the process-wide normalizer."""
+    return get_path_normalizer().template(url)
@@ -9,4 +9,6 @@ __all__ = [
     "framework_versions",
     "csp_inline",
     "bundle",
+    "snapshot",
+    "cache",
 ]
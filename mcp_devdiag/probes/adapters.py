@@ -1,7 +1,12 @@
 # mcp_devdiag/probes/adapters.py
 """Driver abstraction for HTTP-only and browser-based diagnostics."""
 
-from typing import Any, Optional, Protocol
+import asyncio
+import importlib.util
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Protocol
 import httpx
 
 
@@ -31,18 +36,160 @@ class Driver(Protocol):
         ...
 
 
+# Default cap on response body bytes buffered by HttpDriver
+DEFAULT_MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+@dataclass
+class FetchedResponse:
+    """Buffered HTTP response captured by HttpDriver (body possibly capped)."""
+
+    status_code: int
+    headers: httpx.Headers
+    content: bytes = b""
+    truncated: bool = False
+    revalidated: bool = False
+
+    @property
+    def text(self) -> str:
+        """Decoded body (empty for header-only fetches)."""
+        return self.content.decode("utf-8", errors="replace")
+
+
+class ValidatorCache:
+    """
+    LRU of responses carrying ETag/Last-Modified, used for conditional requests.
+
+    Bounded by entry count and by total body bytes; a body larger than
+    `max_bytes` is not cached.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, int], FetchedResponse] = OrderedDict()
+        self._bytes = 0
+        self.revalidated = 0
+
+    def validators(self, key: tuple[str, int]) -> dict[str, str]:
+        """Conditional request headers for a previously seen response."""
+        cached = self._entries.get(key)
+        if cached is None:
+            return {}
+        out = {}
+        if cached.headers.get("etag"):
+            out["If-None-Match"] = cached.headers["etag"]
+        if cached.headers.get("last-modified"):
+            out["If-Modified-Since"] = cached.headers["last-modified"]
+        return out
+
+    def resolve(self, key: tuple[str, int], resp: FetchedResponse) -> FetchedResponse:
+        """
+        Replay the cached response on 304, or remember a fresh cacheable one.
+
+        Args:
+            key: (url, body byte limit) cache key
+            resp: Response received from the server
+
+        Returns:
+            Cached response on a 304 hit, otherwise the response unchanged
+        """
+        cached = self._entries.get(key)
+        if resp.status_code == 304 and cached is not None:
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+            headers = httpx.Headers(cached.headers)
+            headers.update(resp.headers)
+            return FetchedResponse(
+                cached.status_code, headers, cached.content, cached.truncated, revalidated=True
+            )
+        if resp.status_code == 200 and (
+            resp.headers.get("etag") or resp.headers.get("last-modified")
+        ):
+            if cached is not None:
+                self._bytes -= len(self._entries.pop(key).content)
+            if len(resp.content) > self.max_bytes:
+                return resp
+            self._entries[key] = resp
+            self._bytes += len(resp.content)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= len(self._entries.popitem(last=False)[1].content)
+        return resp
+
+
+async def _read_capped(resp: Any, limit: int) -> tuple[bytes, bool]:
+    """
+    Read a streamed body up to `limit` bytes, aborting once the cap is passed.
+
+    Args:
+        resp: Streaming response
+        limit: Maximum bytes to keep
+
+    Returns:
+        Tuple of (body bytes, truncated flag)
+    """
+    buf = bytearray()
+    async for chunk in resp.aiter_bytes():
+        buf += chunk
+        if len(buf) > limit:
+            return bytes(buf[:limit]), True
+    return bytes(buf), False
+
+
 class HttpDriver:
     """HTTP-only driver for prod-safe header/CSP checks."""
 
     name = "http"
 
-    def __init__(self, client: httpx.AsyncClient):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        release: Optional[Callable[[httpx.AsyncClient], None]] = None,
+        validators: Optional[ValidatorCache] = None,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    ):
         self._client = client
-        self._response: Optional[httpx.Response] = None
-
-    async def goto(self, url: str) -> None:
-        """Fetch URL with timeout."""
-        self._response = await self._client.get(url, timeout=5.0, follow_redirects=True)
+        self._release = release
+        self._validators = validators
+        self.max_body_bytes = max_body_bytes
+        self._response: Optional[FetchedResponse] = None
+
+    async def goto(
+        self, url: str, headers_only: bool = False, max_body_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Fetch URL with timeout, streaming at most `max_body_bytes` of the body.
+
+        Args:
+            url: Target URL
+            headers_only: Use HEAD (or a GET closed after the headers) instead
+                of downloading the body
+            max_body_bytes: Body bytes the caller needs (capped at the driver's
+                max_body_bytes; 0 means headers only)
+        """
+        limit = self.max_body_bytes if max_body_bytes is None else max_body_bytes
+        limit = 0 if headers_only else min(limit, self.max_body_bytes)
+        key = (url, limit)
+        conditional = self._validators.validators(key) if self._validators else {}
+        kwargs: dict[str, Any] = {"timeout": 5.0, "follow_redirects": True}
+        if conditional:
+            kwargs["headers"] = conditional
+
+        content, truncated = b"", False
+        if limit == 0:
+            raw = await self._client.head(url, **kwargs)
+            if raw.status_code in (405, 501):
+                # HEAD not supported: stop reading once the headers have arrived
+                async with self._client.stream("GET", url, **kwargs) as raw:
+                    pass
+        else:
+            async with self._client.stream("GET", url, **kwargs) as raw:
+                content, truncated = await _read_capped(raw, limit)
+
+        resp = FetchedResponse(raw.status_code, httpx.Headers(raw.headers), content, truncated)
+        if self._validators is not None:
+            resp = self._validators.resolve(key, resp)
+        self._response = resp
 
     async def eval_js(self, expr: str) -> Any:
         """Not supported in HTTP mode."""
@@ -52,15 +199,178 @@ class HttpDriver:
         """No console in HTTP mode."""
         return []
 
-    async def get_response(self) -> httpx.Response:
+    async def get_response(self) -> FetchedResponse:
         """Get the HTTP response."""
         if self._response is None:
             raise RuntimeError("No response available - call goto() first")
         return self._response
 
     async def dispose(self) -> None:
-        """Close HTTP client."""
-        await self._client.aclose()
+        """Return a leased client to its pool, or close an owned client."""
+        if self._release is not None:
+            self._release(self._client)
+        else:
+            await self._client.aclose()
+
+
+class HttpClientPool:
+    """
+    Process-wide pool of long-lived httpx.AsyncClient instances.
+
+    One client is kept per event loop so connections (and HTTP/2 streams) are
+    reused across tool calls. Drivers lease the client and hand it back on
+    dispose() instead of closing it. Clients of loops that have closed (or
+    been garbage-collected) are dropped and closed best effort on the next
+    lease, so a new loop never inherits a client bound to a dead one.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_s: float = 30.0,
+        http2: bool = True,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    ):
+        """
+        Initialize client pool.
+
+        Args:
+            max_connections: Maximum concurrent connections per client
+            max_keepalive_connections: Maximum idle keep-alive connections
+            keepalive_expiry_s: Seconds an idle connection is kept open
+            http2: Enable HTTP/2 (requires the `h2` package; falls back to HTTP/1.1)
+            max_body_bytes: Response body cap for drivers leasing from this pool
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+        self.http2 = http2 and _h2_available()
+        self.max_body_bytes = max_body_bytes
+        # id(loop) -> (weak ref to the loop, client); the ref guards against id reuse
+        self._clients: dict[int, tuple[Callable[[], Any], httpx.AsyncClient]] = {}
+        self._closing: set[asyncio.Task] = set()
+        self.validators = ValidatorCache()
+        self.leased = 0
+        self.created = 0
+        self.leases_total = 0
+
+    def lease(self) -> httpx.AsyncClient:
+        """Lease the shared client for the running event loop."""
+        loop = _running_loop()
+        key = id(loop) if loop is not None else 0
+        entry = self._clients.get(key)
+        if entry is None or entry[0]() is not loop or entry[1].is_closed:
+            self._drop_stale(loop)
+            client = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+            self._clients[key] = (_loop_ref(loop), client)
+            self.created += 1
+        else:
+            client = entry[1]
+        self.leased += 1
+        self.leases_total += 1
+        return client
+
+    def release(self, client: httpx.AsyncClient) -> None:
+        """Return a leased client to the pool (keeps it open)."""
+        self.leased = max(0, self.leased - 1)
+
+    def _drop_stale(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Forget clients whose loop is gone or closed; close them best effort."""
+        for key, (ref, client) in list(self._clients.items()):
+            owner = ref()
+            if key == 0 or (owner is not None and not owner.is_closed()):
+                continue
+            del self._clients[key]
+            if loop is not None and not client.is_closed:
+                task = loop.create_task(_aclose_quietly(client))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        """Close all pooled clients."""
+        clients = [client for _, client in self._clients.values()]
+        self._clients.clear()
+        for client in clients:
+            await _aclose_quietly(client)
+
+    def stats(self) -> dict[str, Any]:
+        """Get pool counters."""
+        return {
+            "clients": len(self._clients),
+            "leased": self.leased,
+            "created": self.created,
+            "leases_total": self.leases_total,
+            "http2": self.http2,
+            "revalidated": self.validators.revalidated,
+        }
+
+
+def _h2_available() -> bool:
+    """Check whether httpx HTTP/2 support (the `h2` package) is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The running event loop, None when called outside a loop."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _loop_ref(loop: Optional[asyncio.AbstractEventLoop]) -> Callable[[], Any]:
+    """Weak reference to a loop (a constant None for loop-less use)."""
+    return weakref.ref(loop) if loop is not None else lambda: None
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    """Close a client, ignoring errors from transports bound to a dead loop."""
+    try:
+        await client.aclose()
+    except Exception:
+        pass
+
+
+_HTTP_POOL: Optional[HttpClientPool] = None
+
+
+def get_http_pool() -> HttpClientPool:
+    """Get the process-wide HTTP client pool, creating it with defaults if needed."""
+    global _HTTP_POOL
+    if _HTTP_POOL is None:
+        _HTTP_POOL = HttpClientPool()
+    return _HTTP_POOL
+
+
+def configure_http_pool(**settings: Any) -> HttpClientPool:
+    """
+    Replace the process-wide HTTP client pool.
+
+    Args:
+        **settings: HttpClientPool keyword arguments (e.g. from diag.http_pool)
+
+    Returns:
+        The new pool
+    """
+    global _HTTP_POOL
+    _HTTP_POOL = HttpClientPool(**settings)
+    return _HTTP_POOL
+
+
+def _http_driver(http_client_factory) -> HttpDriver:
+    """Build an HttpDriver from a factory, or lease from the shared pool."""
+    if http_client_factory is None:
+        pool = get_http_pool()
+        return HttpDriver(
+            pool.lease(),
+            release=pool.release,
+            validators=pool.validators,
+            max_body_bytes=pool.max_body_bytes,
+        )
+    return HttpDriver(http_client_factory())
 
 
 class PlaywrightDriver:
@@ -98,7 +408,7 @@ class PlaywrightDriver:
 
 async def get_driver(
     kind: Optional[str],
-    http_client_factory,
+    http_client_factory=None,
     playwright_factory=None,
 ) -> Driver:
     """
@@ -106,8 +416,10 @@ async def get_driver(
 
     Args:
         kind: "http", "playwright" or None (auto-detect)
-        http_client_factory: Callable that returns httpx.AsyncClient
-        playwright_factory: Optional callable that returns Playwright page
+        http_client_factory: Callable that returns an owned httpx.AsyncClient,
+            or None to lease from the process-wide HttpClientPool
+        playwright_factory: Optional callable that returns Playwright page;
+            when None, a context is leased from the process-wide BrowserPool
 
     Returns:
         Driver instance (HttpDriver or PlaywrightDriver)
@@ -119,16 +431,19 @@ async def get_driver(
         if playwright_factory is None:
             # Try importing playwright for standalone use
             try:
-                from .adapters_playwright import PlaywrightDriver as StandalonePlaywright
+                from .adapters_playwright import (
+                    PlaywrightDriver as StandalonePlaywright,
+                    get_browser_pool,
+                )
 
-                drv = StandalonePlaywright()
+                drv = StandalonePlaywright(pool=get_browser_pool())
                 await drv.start()
                 return drv
             except (ImportError, RuntimeError):
                 # Graceful degradation to HTTP
-                return HttpDriver(http_client_factory())
+                return _http_driver(http_client_factory)
         page = await playwright_factory()
         return PlaywrightDriver(page)
 
     # Default to HTTP
-    return HttpDriver(http_client_factory())
+    return _http_driver(http_client_factory)
@@ -1,8 +1,237 @@
 """Playwright driver adapter for runtime DOM checks (staging only)."""
 
-from typing import Any, List
+import asyncio
+from dataclasses import dataclass
+from typing import Any, List, Optional
 from .adapters import Driver
 
+# Seconds allowed for closing browsers left behind by a previous event loop
+STALE_CLOSE_TIMEOUT_S = 5.0
+
+
+@dataclass
+class _PooledBrowser:
+    """Warm browser tracked by BrowserPool."""
+
+    browser: Any
+    uses: int = 0
+    active: int = 0
+    retired: bool = False
+
+
+@dataclass
+class BrowserLease:
+    """Isolated BrowserContext leased from a pooled browser."""
+
+    entry: _PooledBrowser
+    context: Any
+
+
+class BrowserPool:
+    """
+    Pool of warm Chromium browsers handing out isolated BrowserContexts.
+
+    Browsers are launched lazily up to `size` and shared between runs; each
+    lease gets its own context so cookies/storage never leak across runs. A
+    browser is recycled after `max_uses` leases, or when Chromium memory
+    (measured with psutil, if installed) crosses `max_rss_mb`.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 50, max_rss_mb: Optional[int] = 1024):
+        """
+        Initialize browser pool.
+
+        Args:
+            size: Number of warm browsers to keep
+            max_uses: Leases served before a browser is recycled
+            max_rss_mb: Chromium RSS threshold in MB that triggers recycling (None to disable)
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self._pw: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._browsers: list[_PooledBrowser] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self.launched = 0
+        self.recycled = 0
+        self.leases_total = 0
+
+    async def _launch(self) -> Any:
+        """Launch a headless Chromium browser."""
+        if self._pw is None:
+            try:
+                from playwright.async_api import async_playwright
+            except ImportError:
+                raise RuntimeError(
+                    "Playwright not installed. Install with: pip install playwright && playwright install chromium"
+                )
+            self._pw = await async_playwright().start()
+        return await self._pw.chromium.launch(headless=True)
+
+    async def _bind_loop(self) -> asyncio.Lock:
+        """
+        Reset pool state when used from a new event loop (Playwright objects are loop-bound).
+
+        Browsers and the Playwright driver of the previous loop are closed
+        best effort first: on their own loop if it is still running in another
+        thread, otherwise from this one (errors from dead transports are ignored).
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._lock is None:
+            old_loop, browsers, pw = self._loop, self._browsers, self._pw
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._browsers = []
+            self._pw = None
+            if browsers or pw is not None:
+                shutdown = _shutdown_quietly([b.browser for b in browsers], pw)
+                if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+                    future = asyncio.run_coroutine_threadsafe(shutdown, old_loop)
+                    try:
+                        await asyncio.wait_for(asyncio.wrap_future(future), STALE_CLOSE_TIMEOUT_S)
+                    except Exception:
+                        pass
+                else:
+                    try:
+                        await asyncio.wait_for(shutdown, STALE_CLOSE_TIMEOUT_S)
+                    except Exception:
+                        pass
+        return self._lock
+
+    async def lease(self) -> BrowserLease:
+        """
+        Lease a fresh BrowserContext from the least-loaded warm browser.
+
+        Returns:
+            BrowserLease holding the context and its browser entry
+
+        Raises:
+            RuntimeError: If Playwright is not installed
+        """
+        lock = await self._bind_loop()
+        async with lock:
+            live = [b for b in self._browsers if not b.retired]
+            if len(live) < self.size:
+                entry = _PooledBrowser(browser=await self._launch())
+                self._browsers.append(entry)
+                self.launched += 1
+            else:
+                entry = min(live, key=lambda b: (b.active, b.uses))
+            entry.uses += 1
+            entry.active += 1
+            self.leases_total += 1
+            if entry.uses >= self.max_uses:
+                entry.retired = True
+
+        try:
+            context = await entry.browser.new_context()
+        except Exception:
+            entry.active -= 1
+            await self._maybe_close(entry)
+            raise
+        return BrowserLease(entry=entry, context=context)
+
+    async def release(self, lease: BrowserLease) -> None:
+        """Close the leased context and recycle its browser if it is worn out."""
+        entry = lease.entry
+        try:
+            await lease.context.close()
+        finally:
+            entry.active -= 1
+            if not entry.retired and self._over_memory():
+                entry.retired = True
+            await self._maybe_close(entry)
+
+    async def _maybe_close(self, entry: _PooledBrowser) -> None:
+        """Close a retired browser once its last context is released."""
+        if entry.retired and entry.active <= 0 and entry in self._browsers:
+            self._browsers.remove(entry)
+            self.recycled += 1
+            await entry.browser.close()
+
+    def _over_memory(self) -> bool:
+        """Check Chromium RSS against max_rss_mb (best-effort; needs psutil)."""
+        if not self.max_rss_mb:
+            return False
+        rss_mb = _chromium_rss_mb()
+        return rss_mb is not None and rss_mb > self.max_rss_mb
+
+    async def aclose(self) -> None:
+        """Close all browsers and stop Playwright."""
+        browsers, self._browsers = self._browsers, []
+        for entry in browsers:
+            await entry.browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get pool counters."""
+        return {
+            "browsers": len(self._browsers),
+            "active_contexts": sum(b.active for b in self._browsers),
+            "launched": self.launched,
+            "recycled": self.recycled,
+            "leases_total": self.leases_total,
+        }
+
+
+async def _shutdown_quietly(browsers: list[Any], pw: Any) -> None:
+    """Close browsers and stop Playwright, ignoring errors."""
+    for browser in browsers:
+        try:
+            await browser.close()
+        except Exception:
+            pass
+    if pw is not None:
+        try:
+            await pw.stop()
+        except Exception:
+            pass
+
+
+def _chromium_rss_mb() -> Optional[float]:
+    """Total RSS in MB of Chromium child processes, or None if psutil is unavailable."""
+    try:
+        import psutil  # type: ignore[import-untyped,unused-ignore]
+    except ImportError:
+        return None
+    total = 0
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            if "chrom" in proc.name().lower():
+                total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+_BROWSER_POOL: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool, creating it with defaults if needed."""
+    global _BROWSER_POOL
+    if _BROWSER_POOL is None:
+        _BROWSER_POOL = BrowserPool()
+    return _BROWSER_POOL
+
+
+def configure_browser_pool(**settings: Any) -> BrowserPool:
+    """
+    Replace the process-wide browser pool.
+
+    Args:
+        **settings: BrowserPool keyword arguments (e.g. from diag.browser_pool)
+
+    Returns:
+        The new pool
+    """
+    global _BROWSER_POOL
+    _BROWSER_POOL = BrowserPool(**settings)
+    return _BROWSER_POOL
+
 
 class PlaywrightDriver(Driver):
     """
@@ -13,32 +242,50 @@ class PlaywrightDriver(Driver):
 
     name = "playwright"
 
-    def __init__(self):
-        self._pw = None
-        self.browser = None
-        self.page = None
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        self._pw: Any = None
+        self._pool = pool
+        self._lease: Optional[BrowserLease] = None
+        self.browser: Optional[Any] = None
+        self.page: Optional[Any] = None
         self._console: List[str] = []
 
-    async def start(self):
-        """Initialize Playwright browser instance."""
-        try:
-            from playwright.async_api import async_playwright
-        except ImportError:
-            raise RuntimeError(
-                "Playwright not installed. Install with: pip install playwright && playwright install chromium"
-            )
-
-        self._pw = await async_playwright().start()
-        self.browser = await self._pw.chromium.launch(headless=True)
-        ctx = await self.browser.new_context()
-        self.page = await ctx.new_page()
-        self.page.on("console", lambda m: self._console.append(m.text()))
+    async def start(self) -> Any:
+        """
+        Initialize page in a pooled context, or launch a dedicated browser.
+
+        Returns:
+            The new page
+        """
+        if self._pool is not None:
+            lease = await self._pool.lease()
+            try:
+                page = await lease.context.new_page()
+            except Exception:
+                await self._pool.release(lease)
+                raise
+            self._lease = lease
+            self.browser = lease.entry.browser
+        else:
+            try:
+                from playwright.async_api import async_playwright
+            except ImportError:
+                raise RuntimeError(
+                    "Playwright not installed. Install with: pip install playwright && playwright install chromium"
+                )
+
+            self._pw = await async_playwright().start()
+            self.browser = await self._pw.chromium.launch(headless=True)
+            ctx = await self.browser.new_context()
+            page = await ctx.new_page()
+        page.on("console", lambda m: self._console.append(m.text()))
+        self.page = page
+        return page
 
     async def goto(self, url: str) -> None:
         """Navigate to URL and wait for network idle."""
-        if self.page is None:
-            await self.start()
-        await self.page.goto(url, wait_until="networkidle", timeout=10000)
+        page = self.page if self.page is not None else await self.start()
+        await page.goto(url, wait_until="networkidle", timeout=10000)
 
     async def eval_js(self, expr: str) -> Any:
         """Evaluate JavaScript expression in page context."""
@@ -51,7 +298,11 @@ class PlaywrightDriver(Driver):
         return list(self._console)
 
     async def dispose(self) -> None:
-        """Clean up browser resources."""
+        """Return the context to the pool, or close a dedicated browser."""
+        if self._lease is not None and self._pool is not None:
+            lease, self._lease = self._lease, None
+            await self._pool.release(lease)
+            return
         if self.browser:
             await self.browser.close()
         if self._pw:
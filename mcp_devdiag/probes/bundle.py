@@ -1,8 +1,10 @@
 # mcp_devdiag/probes/bundle.py
 """Bundle runner that executes multiple diagnostic probes."""
 
+import asyncio
+import time
 from typing import Any, Optional
-from . import dom_overlays, csp_headers, handshake, framework_versions, csp_inline
+from . import dom_overlays, csp_headers, handshake, framework_versions, csp_inline, snapshot
 from .score import score as score_problems
 
 # Probe presets for different use cases
@@ -35,20 +37,86 @@ def _apply_suppressions(problems: list[str], cfg: dict[str, Any]) -> list[str]:
     return [p for p in problems if p not in suppressed_codes]
 
 
+# Probe order and the config section each probe receives
+PROBES: dict[str, tuple[Any, Optional[str]]] = {
+    "dom_overlays": (dom_overlays, None),
+    "csp_headers": (csp_headers, "csp"),
+    "handshake": (handshake, "handshake"),
+    "framework_versions": (framework_versions, "framework"),
+    "csp_inline": (csp_inline, None),
+}
+
+# Default per-probe timeout in seconds (override via diag.probe_timeout_s)
+DEFAULT_PROBE_TIMEOUT_S = 10.0
+
+
+def bundle_ok(result: dict[str, Any]) -> bool:
+    """Whether a bundle result found no problems and every probe ran."""
+    if result.get("problems") or result.get("error"):
+        return False
+    return all(s.get("status") == "ok" for s in result.get("probe_status", {}).values())
+
+
+async def _run_probe(
+    name: str, driver: Any, url: str, diag_cfg: dict[str, Any], timeout_s: float
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Run one probe with a timeout, capturing failures instead of raising.
+
+    Args:
+        name: Probe name (key in PROBES)
+        driver: Driver instance shared by the bundle
+        url: Target URL to probe
+        diag_cfg: Diag config section
+        timeout_s: Seconds before the probe is cancelled
+
+    Returns:
+        Tuple of (probe result, status dict with status/ms/error)
+    """
+    module, section = PROBES[name]
+    probe_cfg = diag_cfg.get(section, {}) if section else diag_cfg
+    t0 = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(module.run(driver, url, probe_cfg), timeout=timeout_s)
+        status: dict[str, Any] = {"status": "ok"}
+    except asyncio.TimeoutError:
+        result = {}
+        status = {"status": "timed_out", "error": f"probe exceeded {timeout_s}s"}
+    except Exception as e:
+        result = {}
+        status = {"status": "error", "error": str(e)}
+    status["ms"] = round((time.perf_counter() - t0) * 1000)
+    return result, status
+
+
 async def run_bundle(
-    driver: Any, url: str, cfg: dict[str, Any], preset: Optional[str] = None
+    driver: Any,
+    url: str,
+    cfg: dict[str, Any],
+    preset: Optional[str] = None,
+    concurrent: bool = True,
 ) -> dict[str, Any]:
     """
     Run a curated set of diagnostic probes.
 
+    Probes run concurrently by default, each under its own timeout. A probe
+    that times out or raises is reported in `probe_status` and the bundle
+    still returns the results of the others. If the shared page capture
+    times out or fails, every selected probe carries that status and the
+    result has an `error`; use bundle_ok() rather than an empty problem list
+    to tell a healthy target.
+
     Args:
         driver: Driver instance (HTTP or browser)
         url: Target URL to probe
         cfg: Full configuration dict with 'diag' section
         preset: Probe preset ("chat", "embed", "app", "full", or None for "full")
+        concurrent: Run probes with asyncio.gather (False runs them in order)
 
     Returns:
-        Dict with aggregated problems, remediation, evidence, and severity score
+        Dict with aggregated problems, remediation, evidence, severity score,
+        per-probe status ("ok", "timed_out" or "error"), and `error` when
+        the page capture failed
     """
     results = []
     diag_cfg = cfg.get("diag", {})
@@ -56,44 +124,54 @@ async def run_bundle(
     # Determine which probes to run
     preset_name = preset or "full"
     probe_names = PRESETS.get(preset_name, PRESETS["full"])
+    selected = [name for name in PROBES if name in probe_names]
 
-    # Run selected probes
-    if "dom_overlays" in probe_names:
-        results.append(
-            {
-                "name": "dom_overlays",
-                "result": await dom_overlays.run(driver, url, diag_cfg),
-            }
-        )
-
-    if "csp_headers" in probe_names:
-        results.append(
-            {
-                "name": "csp_headers",
-                "result": await csp_headers.run(driver, url, diag_cfg.get("csp", {})),
-            }
-        )
-
-    if "handshake" in probe_names:
-        results.append(
-            {
-                "name": "handshake",
-                "result": await handshake.run(driver, url, diag_cfg.get("handshake", {})),
-            }
-        )
-
-    if "framework_versions" in probe_names:
-        results.append(
-            {
-                "name": "framework_versions",
-                "result": await framework_versions.run(driver, url, diag_cfg.get("framework", {})),
-            }
-        )
+    # Per-probe timeouts: diag.probe_timeouts.<name> overrides diag.probe_timeout_s
+    default_timeout = float(diag_cfg.get("probe_timeout_s", DEFAULT_PROBE_TIMEOUT_S))
+    timeouts = {
+        name: float(diag_cfg.get("probe_timeouts", {}).get(name, default_timeout))
+        for name in selected
+    }
 
-    if "csp_inline" in probe_names:
-        results.append(
-            {"name": "csp_inline", "result": await csp_inline.run(driver, url, diag_cfg)}
+    # Navigate once; every probe reads from the same snapshot. Over HTTP only
+    # as much body as the hungriest selected probe needs is streamed. The
+    # navigation gets the longest selected probe timeout; if it fails, every
+    # selected probe is reported with that failure.
+    body_bytes = max((PROBES[name][0].HTTP_BODY_BYTES for name in selected), default=0)
+    capture_timeout = max(timeouts.values(), default=default_timeout)
+    probe_status: dict[str, dict[str, Any]] = {}
+    t0 = time.perf_counter()
+    try:
+        snap = await asyncio.wait_for(
+            snapshot.capture(driver, url, body_bytes=body_bytes), timeout=capture_timeout
         )
+    except asyncio.TimeoutError:
+        failed: Optional[dict[str, Any]] = {
+            "status": "timed_out",
+            "error": f"page capture exceeded {capture_timeout}s",
+        }
+    except Exception as e:
+        failed = {"status": "error", "error": f"page capture failed: {e}"}
+    else:
+        failed = None
+
+    if failed is not None:
+        failed["ms"] = round((time.perf_counter() - t0) * 1000)
+        probe_status = {name: dict(failed) for name in selected}
+    else:
+        driver = snapshot.SnapshotDriver(driver, snap)
+
+        # Run selected probes
+        calls = [_run_probe(name, driver, url, diag_cfg, timeouts[name]) for name in selected]
+        if concurrent:
+            outcomes = await asyncio.gather(*calls)
+        else:
+            outcomes = [await call for call in calls]
+
+        for name, (result, status) in zip(selected, outcomes):
+            probe_status[name] = status
+            if status["status"] == "ok":
+                results.append({"name": name, "result": result})
 
     # Aggregate results
     all_problems: set[str] = set()
@@ -124,11 +202,15 @@ async def run_bundle(
 
     total_score = score_problems(problems)
 
-    return {
+    out = {
         "problems": problems,
         "remediation": sorted(all_remediation),
         "evidence": evidence,
         "score": total_score,
         "preset": preset_name,
         "probes_run": len(results),
+        "probe_status": probe_status,
     }
+    if failed is not None:
+        out["error"] = failed["error"]
+    return out
@@ -0,0 +1,166 @@
+# mcp_devdiag/probes/cache.py
+"""TTL + LRU result cache for probe bundles."""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+
+def config_fingerprint(diag_cfg: dict[str, Any]) -> str:
+    """
+    Stable hash of the diag config section.
+
+    Args:
+        diag_cfg: Diag config section
+
+    Returns:
+        Short SHA256 hex digest of the canonical JSON form
+    """
+    canonical = json.dumps(diag_cfg, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def bundle_key(url: str, preset: Optional[str], driver: Optional[str], diag_cfg: dict) -> str:
+    """Cache key for a bundle run: url + preset + driver + config fingerprint."""
+    return "|".join(
+        [url, preset or "full", (driver or "http").lower(), config_fingerprint(diag_cfg)]
+    )
+
+
+def _degraded(value: dict[str, Any]) -> bool:
+    """Whether any probe of a bundle result timed out or failed."""
+    return any(s.get("status") != "ok" for s in value.get("probe_status", {}).values())
+
+
+class BundleCache:
+    """
+    In-memory TTL cache with LRU eviction and in-flight request coalescing.
+
+    Concurrent callers for the same key share one run, so a burst of
+    identical requests costs a single probe bundle. Degraded results (any
+    probe in `probe_status` not "ok") are kept only for `degraded_ttl_s`,
+    so a transient timeout is not served for the full TTL.
+    """
+
+    def __init__(self, ttl_s: float = 30.0, max_entries: int = 256, degraded_ttl_s: float = 0.0):
+        """
+        Initialize bundle cache.
+
+        Args:
+            ttl_s: Seconds a cached result stays fresh
+            max_entries: Maximum cached results before LRU eviction
+            degraded_ttl_s: Seconds a result with failed probes stays fresh (0: not cached)
+        """
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.degraded_ttl_s = min(degraded_ttl_s, ttl_s)
+        # key -> (stored at, ttl, result)
+        self._entries: OrderedDict[str, tuple[float, float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[tuple[dict, float]]:
+        """
+        Look up a fresh entry.
+
+        Args:
+            key: Cache key
+            max_age: Caller's freshness bound in seconds (capped at ttl_s)
+
+        Returns:
+            Tuple of (result, age in seconds) or None if missing/stale
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, ttl, value = entry
+        age = time.monotonic() - stored_at
+        limit = ttl if max_age is None else min(max_age, ttl)
+        if age > limit:
+            if age > ttl:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value, age
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Store a result, evicting least-recently-used entries over capacity."""
+        ttl = self.degraded_ttl_s if _degraded(value) else self.ttl_s
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic(), ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_run(
+        self,
+        key: str,
+        run: Callable[[], Awaitable[dict[str, Any]]],
+        max_age: Optional[float] = None,
+        force_refresh: bool = False,
+    ) -> tuple[dict[str, Any], bool, float]:
+        """
+        Return a cached result or run (once) to produce it.
+
+        Args:
+            key: Cache key
+            run: Coroutine factory producing the bundle result
+            max_age: Accept cached results at most this many seconds old
+            force_refresh: Skip the cache lookup and always run
+
+        Returns:
+            Tuple of (result, cache hit, age in seconds)
+        """
+        if not force_refresh and max_age != 0:
+            found = self.get(key, max_age)
+            if found is not None:
+                self.hits += 1
+                return found[0], True, round(found[1], 3)
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.hits += 1
+                return await asyncio.shield(pending), True, 0.0
+
+        self.misses += 1
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value = await run()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody is waiting
+            raise
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+        fut.set_result(value)
+        self.put(key, value)
+        return value, False, 0.0
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache counters."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "ttl_s": self.ttl_s,
+            "max_entries": self.max_entries,
+        }
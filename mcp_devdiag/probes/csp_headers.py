@@ -5,6 +5,9 @@ from typing import Any
 from .types import ProbeResult
 from .score import get_severity
 
+# Response body bytes this probe reads in HTTP mode (0 = headers only)
+HTTP_BODY_BYTES = 0
+
 
 def parse_csp_directives(csp: str) -> dict[str, str]:
     """
@@ -42,7 +45,10 @@ async def run(driver: Any, url: str, csp_cfg: dict[str, Any]) -> ProbeResult:
     problems: list[str] = []
     remediation: list[str] = []
 
-    await driver.goto(url)
+    if driver.name == "http":
+        await driver.goto(url, headers_only=True)
+    else:
+        await driver.goto(url)
     resp = await driver.get_response()
 
     # Extract headers
@@ -5,6 +5,9 @@ from typing import Any
 from .types import ProbeResult
 from .score import get_severity
 
+# Response body bytes this probe reads in HTTP mode (0 = headers only)
+HTTP_BODY_BYTES = 0
+
 # JavaScript to detect viewport-covering elements and shadow DOM hosts
 OVERLAY_DETECTION_JS = r"""
 (() => {
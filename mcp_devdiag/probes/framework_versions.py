@@ -6,6 +6,9 @@ from typing import Any
 from .types import ProbeResult
 from .score import get_severity
 
+# Response body bytes this probe reads in HTTP mode (0 = headers only)
+HTTP_BODY_BYTES = 0
+
 
 def sniff_framework_logs(logs: list[str], regex_map: dict[str, str]) -> dict[str, str]:
     """
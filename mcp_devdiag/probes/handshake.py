@@ -4,6 +4,9 @@
 from typing import Any
 from .types import ProbeResult
 
+# Response body bytes this probe reads in HTTP mode (0 = headers only)
+HTTP_BODY_BYTES = 0
+
 
 async def run(driver: Any, url: str, cfg: dict[str, Any]) -> ProbeResult:
     """
@@ -0,0 +1,88 @@
+# mcp_devdiag/probes/snapshot.py
+"""Single-navigation page snapshot shared by bundle probes."""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class PageSnapshot:
+    """Result of one navigation: response, console output and the live driver."""
+
+    url: str
+    response: Any = None
+    console: list[str] = field(default_factory=list)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the captured body was cut at the byte cap."""
+        return bool(getattr(self.response, "truncated", False))
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Response headers (lower-cased keys), empty if unavailable."""
+        hdrs = getattr(self.response, "headers", None)
+        if not hdrs:
+            return {}
+        return {k.lower(): v for k, v in hdrs.items()}
+
+
+async def capture(driver: Any, url: str, body_bytes: Optional[int] = None) -> PageSnapshot:
+    """
+    Navigate once and capture everything probes read from a page.
+
+    Args:
+        driver: Driver instance (HTTP or browser)
+        url: Target URL to load
+        body_bytes: Response body bytes to read over HTTP (0 = headers only,
+            None = driver default cap)
+
+    Returns:
+        PageSnapshot with response and console logs at load time
+    """
+    if driver.name == "http":
+        await driver.goto(url, max_body_bytes=body_bytes)
+    else:
+        await driver.goto(url)
+    response = await driver.get_response() if hasattr(driver, "get_response") else None
+    console = await driver.get_console()
+    return PageSnapshot(url=url, response=response, console=list(console))
+
+
+class SnapshotDriver:
+    """
+    Driver view that serves navigations from a captured PageSnapshot.
+
+    `goto()` for the snapshot URL is a no-op, so every probe in a bundle
+    shares one page load. DOM access (`eval_js`) goes to the live page the
+    snapshot was taken from. Disposal is left to the owner of the wrapped driver.
+    """
+
+    def __init__(self, driver: Any, snapshot: PageSnapshot):
+        self._driver = driver
+        self.snapshot = snapshot
+        self.name = driver.name
+
+    async def goto(
+        self, url: str, headers_only: bool = False, max_body_bytes: Optional[int] = None
+    ) -> None:
+        """Reuse the snapshot; navigate again only for a different URL."""
+        if url != self.snapshot.url:
+            body_bytes = 0 if headers_only else max_body_bytes
+            self.snapshot = await capture(self._driver, url, body_bytes)
+
+    async def eval_js(self, expr: str) -> Any:
+        """Evaluate JavaScript against the live page behind the snapshot."""
+        return await self._driver.eval_js(expr)
+
+    async def get_console(self) -> list[str]:
+        """Console logs captured at navigation time."""
+        return list(self.snapshot.console)
+
+    async def get_response(self) -> Any:
+        """Response captured at navigation time."""
+        return self.snapshot.response
+
+    async def dispose(self) -> None:
+        """No-op; the wrapped driver is disposed by its owner."""
+        return None
@@ -0,0 +1,233 @@
+"""Declarative log rules compiled into a single-pass matcher."""
+
+from __future__ import annotations
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from mcp_devdiag.schema import Severity
+
+SOURCES = ("frontend", "backend", "any")
+
+# A rule may also target one configured log source by name (see mcp_devdiag.sources)
+_SOURCE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+SEVERITIES = ("info", "warn", "error")
+
+# Line offsets reported per rule (the first matches are enough to locate the issue)
+MAX_OFFSETS = 20
+
+
+@dataclass
+class LogRule:
+    """A log pattern that raises a Problem when any line matches."""
+
+    id: str
+    source: str
+    pattern: str
+    message: str
+    severity: Severity = "warn"
+    ignore_case: bool = False
+    fix: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LogRule":
+        """
+        Build a rule from a config mapping.
+
+        Raises:
+            ValueError: If required keys are missing or values are invalid
+        """
+        try:
+            rule = cls(
+                id=str(d["id"]),
+                source=str(d.get("source", "any")),
+                pattern=str(d["pattern"]),
+                message=str(d.get("message") or d["id"]),
+                severity=d.get("severity", "warn"),
+                ignore_case=bool(d.get("ignore_case", False)),
+                fix=[str(f) for f in d.get("fix", [])],
+            )
+        except KeyError as e:
+            raise ValueError(f"Log rule {d!r} is missing {e.args[0]!r}")
+        rule.validate()
+        return rule
+
+    def validate(self) -> None:
+        """
+        Check the source and severity.
+
+        Raises:
+            ValueError: If either is not an accepted value
+        """
+        if self.source not in SOURCES and not _SOURCE_NAME.match(self.source):
+            raise ValueError(
+                f"Log rule {self.id}: source must be one of {SOURCES} or a log source name"
+            )
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Log rule {self.id}: severity must be one of {SEVERITIES}")
+
+
+BUILTIN_RULES = [
+    LogRule(
+        id="FAILED_TO_FETCH",
+        source="frontend",
+        pattern=r"TypeError: Failed to fetch",
+        ignore_case=True,
+        severity="error",
+        message="Frontend reports 'TypeError: Failed to fetch'.",
+        fix=[
+            "Confirm backend is up and reachable",
+            "Add exact frontend origin to CORS",
+            "Enable allow_credentials=True if using cookies",
+            "Use same host form (localhost vs 127.0.0.1)",
+        ],
+    ),
+    LogRule(
+        id="CORS_BLOCK",
+        source="frontend",
+        pattern=r"CORS|Access-Control-Allow-Origin",
+        ignore_case=True,
+        severity="error",
+        message="CORS appears to be blocking requests.",
+        fix=[
+            "Set CORSMiddleware allow_origins=[frontend_origin]",
+            "Set allow_credentials=True when using cookies",
+            "Expose/allow headers as needed",
+        ],
+    ),
+    LogRule(
+        id="BACKEND_HTTP_ERRORS",
+        source="backend",
+        pattern=r"\b(?:401|403|500|502|503|504)\b",
+        severity="warn",
+        message="Backend logs include 4xx/5xx responses.",
+        fix=["Check specific endpoints and recent tracebacks"],
+    ),
+    LogRule(
+        id="DB_DRIFT",
+        source="backend",
+        pattern=r"alembic|migration|column",
+        severity="warn",
+        message="Backend logs hint at DB migration issues.",
+        fix=["Run alembic upgrade head or reset dev DB"],
+    ),
+]
+
+
+class RuleSet:
+    """
+    Log rules compiled into one alternation per source.
+
+    The rules for a source are joined into one regex (compiled on first use
+    per source), so a line is scanned once regardless of how many rules
+    exist. Only lines the combined regex hits are checked against the
+    individual rules, which also catches rules masked by an earlier
+    alternative on the same line. Patterns that cannot be combined (e.g.
+    numbered backreferences) disable the fast path.
+    """
+
+    def __init__(self, rules: Iterable[LogRule]):
+        """
+        Compile rules.
+
+        Args:
+            rules: Rules in reporting order; a later rule with the same id
+                replaces an earlier one in place
+
+        Raises:
+            ValueError: If a rule has an invalid source, severity or pattern
+        """
+        by_id: Dict[str, LogRule] = {}
+        for rule in rules:
+            rule.validate()
+            by_id[rule.id] = rule
+        self.by_id = by_id
+        self.rules = list(by_id.values())
+
+        self._single: Dict[str, re.Pattern] = {}
+        for rule in self.rules:
+            try:
+                self._single[rule.id] = re.compile(
+                    rule.pattern, re.IGNORECASE if rule.ignore_case else 0
+                )
+            except re.error as e:
+                raise ValueError(f"Log rule {rule.id}: invalid pattern: {e}")
+
+        # Combined regex per (source, kind), compiled on first use
+        self._combined: Dict[tuple, Optional[re.Pattern]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, rule_id: str) -> Optional[LogRule]:
+        """Rule by id, if present."""
+        return self.by_id.get(rule_id)
+
+    def for_source(self, source: str, kind: Optional[str] = None) -> List[LogRule]:
+        """
+        Rules that apply to a log source, in reporting order.
+
+        Args:
+            source: Source name ("frontend", "backend" or a configured source)
+            kind: Rule kind of a configured source ("frontend" or "backend");
+                its rules apply as well
+
+        Returns:
+            Rules targeting the source, its kind, or "any"
+        """
+        return [r for r in self.rules if r.source in (source, kind, "any")]
+
+    def _combined_for(self, source: str, kind: Optional[str]) -> Optional[re.Pattern]:
+        key = (source, kind)
+        with self._lock:
+            if key not in self._combined:
+                parts = [
+                    ("(?i:" if rule.ignore_case else "(?:") + rule.pattern + ")"
+                    for rule in self.for_source(source, kind)
+                ]
+                try:
+                    self._combined[key] = re.compile("|".join(parts))
+                except re.error:
+                    self._combined[key] = None
+            return self._combined[key]
+
+    def scan(
+        self, source: str, lines: List[str], kind: Optional[str] = None
+    ) -> Dict[str, List[int]]:
+        """
+        Match every rule for `source` against `lines` in a single pass.
+
+        Args:
+            source: Source name ("frontend", "backend" or a configured source)
+            lines: Log lines
+            kind: Rule kind of a configured source
+
+        Returns:
+            Rule id -> offsets (indices into `lines`) of the first matching lines
+        """
+        rules = self.for_source(source, kind)
+        if not rules:
+            return {}
+        combined = self._combined_for(source, kind)
+        hits: Dict[str, List[int]] = {}
+        for offset, line in enumerate(lines):
+            if combined is not None and combined.search(line) is None:
+                continue
+            for rule in rules:
+                if self._single[rule.id].search(line):
+                    found = hits.setdefault(rule.id, [])
+                    if len(found) < MAX_OFFSETS:
+                        found.append(offset)
+        return hits
+
+
+def build_ruleset(extra: Iterable[Dict[str, Any]] = ()) -> RuleSet:
+    """
+    Built-in rules extended (or overridden by id) with rules from config.
+
+    Args:
+        extra: Rule mappings, e.g. from `diag.log_rules` in devdiag.yaml
+
+    Returns:
+        Compiled RuleSet
+    """
+    return RuleSet(BUILTIN_RULES + [LogRule.from_dict(d) for d in extra])
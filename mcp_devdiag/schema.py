@@ -12,6 +12,8 @@ class Problem(BaseModel):
     code: str
     message: str
     fix: List[str] = Field(default_factory=list)
+    lines: List[int] = Field(default_factory=list)  # matching log line offsets (log rules)
+    source: Optional[str] = None  # log source the rule matched in
 
 
 class Context(BaseModel):
@@ -34,6 +36,8 @@ class TailRequest(BaseModel):
 
 class TailResponse(BaseModel):
     lines: List[str]
+    cursor: Optional[str] = None
+    reset: bool = False
 
 
 class EnvStateResponse(BaseModel):
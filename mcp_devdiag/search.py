@@ -0,0 +1,361 @@
+"""Parallel regex search over large log files."""
+
+from __future__ import annotations
+import mmap
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from mcp_devdiag.segments import LogSegment, list_segments
+from mcp_devdiag.timeindex import HEAD_BYTES, PROBE_BYTES, detect_format, get_time_index
+
+# Bytes per chunk handed to a worker
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Files smaller than this are scanned in-process (pool overhead dominates)
+PARALLEL_MIN_BYTES = 2 * CHUNK_BYTES
+
+# Characters returned per matching line
+MAX_LINE_CHARS = 2000
+
+# Worker processes for large scans
+WORKERS = os.cpu_count() or 2
+
+
+@dataclass
+class SearchResult:
+    """Matches as (byte offset, line) pairs; `truncated` means the limit was reached."""
+
+    matches: List[Tuple[int, str]] = field(default_factory=list)
+    truncated: bool = False
+    scanned_bytes: int = 0
+    start_offset: int = 0
+
+
+@dataclass
+class RotatedSearchResult:
+    """Matches as (segment name, byte offset in the segment, line) triples."""
+
+    matches: List[Tuple[str, int, str]] = field(default_factory=list)
+    truncated: bool = False
+    scanned_bytes: int = 0
+
+
+def compile_pattern(pattern: str, ignore_case: bool = False) -> re.Pattern:
+    """
+    Compile a search pattern for byte-level matching (`^`/`$` anchor at line ends).
+
+    Raises:
+        ValueError: If the pattern is not a valid regex
+    """
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        return re.compile(pattern.encode(), flags)
+    except re.error as e:
+        raise ValueError(f"Invalid search pattern: {e}")
+
+
+def line_chunks(mm: mmap.mmap, start: int, end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into ranges that begin and end on line boundaries."""
+    chunks = []
+    while start < end:
+        stop = min(end, start + chunk_bytes)
+        if stop < end:
+            nl = mm.find(b"\n", stop, end)
+            stop = end if nl < 0 else nl + 1
+        chunks.append((start, stop))
+        start = stop
+    return chunks
+
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b"\r").decode("utf-8", errors="replace")[:MAX_LINE_CHARS]
+
+
+def scan_range(
+    mm: Union[bytes, mmap.mmap], rx: re.Pattern, start: int, end: int, limit: int, reverse: bool
+) -> List[Tuple[int, str]]:
+    """
+    Matching lines in [start, end), one entry per line.
+
+    Forward scans stop after `limit` matches; reverse scans keep the last
+    `limit` (a regex cannot run backwards, so the range is still read once).
+    """
+    found: deque = deque(maxlen=limit if reverse else None)
+    pos = start
+    while pos < end:
+        m = rx.search(mm, pos, end)
+        if m is None:
+            break
+        line_start = max(start, mm.rfind(b"\n", start, m.start()) + 1)
+        line_end = mm.find(b"\n", m.end() if m.end() > m.start() else m.start(), end)
+        line_end = end if line_end < 0 else line_end
+        found.append((line_start, _decode(mm[line_start:line_end])))
+        if not reverse and len(found) >= limit:
+            break
+        pos = line_end + 1
+    if reverse:
+        found.reverse()
+    return list(found)
+
+
+def _scan_chunk(
+    path: str, pattern: bytes, flags: int, start: int, end: int, limit: int, reverse: bool
+) -> List[Tuple[int, str]]:
+    """Process-pool worker: scan one line-aligned chunk of a file."""
+    rx = re.compile(pattern, flags)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return scan_range(mm, rx, start, min(end, len(mm)), limit, reverse)
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared worker pool (spawn context, one worker per core), None if unavailable."""
+    global _POOL
+    if _POOL is None:
+        try:
+            _POOL = ProcessPoolExecutor(
+                max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        except (OSError, NotImplementedError):
+            return None
+    return _POOL
+
+
+def _reset_pool() -> None:
+    """Drop a broken pool; the next parallel search starts a fresh one."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def search_file(
+    path: Path,
+    pattern: str,
+    limit: int = 100,
+    reverse: bool = False,
+    ignore_case: bool = False,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+    parallel: Optional[bool] = None,
+) -> SearchResult:
+    """
+    Regex search over a log file, returning (offset, line) pairs.
+
+    The file is memory-mapped and split into line-aligned chunks. Large
+    files are scanned by a process pool with chunks submitted in scan order
+    (front to back, or back to front when `reverse`); once `limit` matches
+    are collected the remaining chunks are cancelled.
+
+    Args:
+        path: Log file
+        pattern: Regular expression (matched per line)
+        limit: Maximum matches returned
+        reverse: Newest (last) matches first
+        ignore_case: Case-insensitive match
+        since: Only lines stamped at/after this epoch time (see mcp_devdiag.timeindex)
+        until: Only lines stamped before this epoch time
+        chunk_bytes: Chunk size per worker task
+        parallel: Force (True) or disable (False) the process pool; default by file size
+
+    Returns:
+        SearchResult with matches in scan order
+
+    Raises:
+        ValueError: If the pattern is invalid
+    """
+    rx = compile_pattern(pattern, ignore_case)
+    result = SearchResult()
+    if limit <= 0 or not path.exists() or path.stat().st_size == 0:
+        return result
+
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, end = 0, len(mm)
+        if since is not None or until is not None:
+            start, end = get_time_index(path).range(mm, os.fstat(f.fileno()).st_ino, since, until)
+        result.start_offset = start
+        chunks = line_chunks(mm, start, end, chunk_bytes)
+        if reverse:
+            chunks.reverse()
+
+        use_pool = parallel if parallel is not None else end - start >= PARALLEL_MIN_BYTES
+        pool = _get_pool() if use_pool and len(chunks) > 1 else None
+        if pool is not None:
+            try:
+                _search_parallel(pool, str(path), rx, chunks, limit, reverse, result)
+            except BrokenProcessPool:
+                _reset_pool()
+                pool = None
+                result.matches, result.scanned_bytes = [], 0
+        if pool is None:
+            for lo, hi in chunks:
+                need = limit - len(result.matches)
+                result.matches.extend(scan_range(mm, rx, lo, hi, need, reverse))
+                result.scanned_bytes += hi - lo
+                if len(result.matches) >= limit:
+                    break
+
+    result.truncated = len(result.matches) >= limit
+    del result.matches[limit:]
+    return result
+
+
+def _search_parallel(
+    pool: ProcessPoolExecutor,
+    path: str,
+    rx: re.Pattern,
+    chunks: List[Tuple[int, int]],
+    limit: int,
+    reverse: bool,
+    result: SearchResult,
+) -> None:
+    """Scan chunks on the pool, consuming results in order and stopping at limit."""
+    window = WORKERS * 2
+    pending: deque = deque()
+    todo = iter(chunks)
+
+    def submit_next() -> bool:
+        chunk = next(todo, None)
+        if chunk is None:
+            return False
+        fut: Future = pool.submit(_scan_chunk, path, rx.pattern, rx.flags, *chunk, limit, reverse)
+        pending.append((chunk, fut))
+        return True
+
+    for _ in range(window):
+        if not submit_next():
+            break
+    while pending:
+        (lo, hi), fut = pending.popleft()
+        result.matches.extend(fut.result())
+        result.scanned_bytes += hi - lo
+        if len(result.matches) >= limit:
+            for _, other in pending:
+                other.cancel()
+            break
+        submit_next()
+
+
+def _first_time(seg: LogSegment) -> Optional[float]:
+    """Timestamp of a segment's first stamped line (reads only its head)."""
+    lines = seg.head(PROBE_BYTES).split(b"\n")
+    fmt = detect_format(lines)
+    if fmt is None:
+        return None
+    for line in lines:
+        ts = fmt.time(line[:HEAD_BYTES])
+        if ts is not None:
+            return ts
+    return None
+
+
+def search_rotated(
+    path: Path,
+    pattern: str,
+    limit: int = 100,
+    reverse: bool = False,
+    ignore_case: bool = False,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+    parallel: Optional[bool] = None,
+) -> RotatedSearchResult:
+    """
+    search_file() across a log and its rotated generations (see mcp_devdiag.segments).
+
+    Segments are searched oldest to newest (newest to oldest with
+    `reverse`) until `limit` matches are found. Plain segments go through
+    search_file(); gzip segments are inflated block by block. With
+    since/until, segments whose time span lies outside the window are
+    skipped using only their first timestamps (a segment ends where the
+    next newer one starts), so old archives are not decompressed.
+
+    Args:
+        path: Live log file
+        pattern: Regular expression (matched per line)
+        limit: Maximum matches returned
+        reverse: Newest matches first
+        ignore_case: Case-insensitive match
+        since: Only lines stamped at/after this epoch time
+        until: Only lines stamped before this epoch time
+        chunk_bytes: Chunk size per scan task
+        parallel: Passed to search_file() for plain segments
+
+    Returns:
+        RotatedSearchResult in search order
+
+    Raises:
+        ValueError: If the pattern is invalid
+    """
+    rx = compile_pattern(pattern, ignore_case)
+    result = RotatedSearchResult()
+    if limit <= 0:
+        return result
+    segments = list_segments(path)  # newest first
+    starts: List[Optional[float]] = [None] * len(segments)
+    if since is not None or until is not None:
+        starts = [_first_time(seg) for seg in segments]
+
+    order = range(len(segments)) if reverse else range(len(segments) - 1, -1, -1)
+    for i in order:
+        seg = segments[i]
+        start, newer_start = starts[i], starts[i - 1] if i > 0 else None
+        if since is not None and newer_start is not None and newer_start < since:
+            continue  # every line predates the next segment's first line
+        if until is not None and start is not None and start >= until:
+            continue
+        need = limit - len(result.matches)
+        if seg.compressed:
+            part = _search_compressed(seg, rx, need, reverse, since, until, chunk_bytes)
+        else:
+            part = search_file(
+                seg.path, pattern, need, reverse, ignore_case, since, until, chunk_bytes, parallel
+            )
+        result.matches.extend((seg.name, offset, line) for offset, line in part.matches)
+        result.scanned_bytes += part.scanned_bytes
+        if len(result.matches) >= limit:
+            break
+
+    result.truncated = len(result.matches) >= limit
+    del result.matches[limit:]
+    return result
+
+
+def _search_compressed(
+    seg: LogSegment,
+    rx: re.Pattern,
+    limit: int,
+    reverse: bool,
+    since: Optional[float],
+    until: Optional[float],
+    chunk_bytes: int,
+) -> SearchResult:
+    """Serial scan of a gzip segment; stamped matches outside [since, until) are dropped."""
+    result = SearchResult()
+    fmt = detect_format(seg.head(PROBE_BYTES).split(b"\n")) if since or until else None
+    found: deque = deque(maxlen=limit if reverse else None)
+    done = False
+    for base, block in seg.iter_blocks(chunk_bytes):
+        result.scanned_bytes += len(block)
+        # Unbounded per block (at most one match per line); the time filter may drop some
+        for offset, line in scan_range(block, rx, 0, len(block), len(block) + 1, False):
+            ts = fmt.time(line[:HEAD_BYTES].encode()) if fmt else None
+            if ts is not None and until is not None and ts >= until:
+                done = True
+                break
+            if ts is None or since is None or ts >= since:
+                found.append((base + offset, line))
+        if done or (not reverse and len(found) >= limit):
+            break
+    result.matches = list(reversed(found)) if reverse else list(found)[:limit]
+    return result
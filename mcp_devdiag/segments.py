@@ -0,0 +1,379 @@
+"""Rotated and gzip-compressed log segments."""
+
+from __future__ import annotations
+import re
+import threading
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from mcp_devdiag.tail import iter_lines_reverse
+
+# Uncompressed bytes between gzip seek checkpoints
+GZIP_SPAN = 1024 * 1024
+
+# Compressed bytes fed to the decompressor per read
+GZIP_READ_BYTES = 64 * 1024
+
+# Gzip seek checkpoints kept in memory across all cached indexes (each holds
+# a ~40 KB inflate state, so this bounds the cache at ~10 MB)
+GZIP_INDEX_CHECKPOINTS = 256
+
+# Uncompressed bytes at the end of a gzip segment that reverse line reads
+# (tails, status) look at; reaching further back takes a search
+GZIP_TAIL_BYTES = 8 * 1024 * 1024
+
+# Inflated archive tails kept in memory, in bytes (archives don't change, so
+# repeated tails/status calls after a rotation don't re-inflate them)
+GZIP_TAIL_CACHE_BYTES = 32 * 1024 * 1024
+
+# Rotated generations considered per log
+MAX_SEGMENTS = 32
+
+# wbits for zlib: gzip header and trailer
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+@dataclass
+class _Checkpoint:
+    uoffset: int  # uncompressed offset the state resumes at
+    coffset: int  # compressed offset of the next input byte
+    state: Optional["zlib._Decompress"]  # None: start of a gzip member
+
+
+class GzipIndex:
+    """
+    Block-level seek index over a gzip file.
+
+    Built by inflating the file once and snapshotting the decompressor
+    (`decompressobj().copy()`) every `span` uncompressed bytes. A read at any
+    offset then resumes from the nearest checkpoint and inflates at most
+    `span` bytes it does not return. Multi-member files (concatenated gzip
+    streams) are supported. The snapshots live in memory only, so indexes
+    are cached per process, see get_gzip_index().
+    """
+
+    def __init__(self, path: Path, span: int = GZIP_SPAN):
+        """
+        Build the index.
+
+        Args:
+            path: Gzip file
+            span: Uncompressed bytes between checkpoints
+
+        Raises:
+            OSError: If the file cannot be read
+            zlib.error: If the file is not valid gzip
+        """
+        self.path = path
+        self.span = span
+        self.checkpoints: List[_Checkpoint] = [_Checkpoint(0, 0, None)]
+        self.size = 0
+        self._build()
+
+    def _build(self) -> None:
+        next_mark = self.span
+        for data, cpos, d in _inflate(self.path):
+            self.size += len(data)
+            if self.size >= next_mark and not d.eof:
+                self.checkpoints.append(_Checkpoint(self.size, cpos, d.copy()))
+                next_mark = self.size + self.span
+
+    def _resume(self, offset: int) -> _Checkpoint:
+        lo, hi = 0, len(self.checkpoints)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.checkpoints[mid].uoffset <= offset:
+                lo = mid
+            else:
+                hi = mid
+        return self.checkpoints[lo]
+
+    def stream(self, offset: int = 0) -> Iterator[bytes]:
+        """
+        Decompressed bytes from `offset` to the end, in blocks.
+
+        Args:
+            offset: Uncompressed start offset
+
+        Yields:
+            Consecutive decompressed blocks
+        """
+        cp = self._resume(offset)
+        skip = offset - cp.uoffset
+        for data, _, _ in _inflate(self.path, cp.coffset, cp.state):
+            if skip:
+                cut = min(skip, len(data))
+                data, skip = data[cut:], skip - cut
+            if data:
+                yield data
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Up to `size` decompressed bytes starting at `offset`."""
+        parts: List[bytes] = []
+        need = size
+        for block in self.stream(offset):
+            parts.append(block[:need])
+            need -= len(parts[-1])
+            if need <= 0:
+                break
+        return b"".join(parts)
+
+
+_GZ_INDEXES: "OrderedDict[Path, Tuple[tuple, GzipIndex]]" = OrderedDict()
+_GZ_LOCK = threading.Lock()
+
+
+def get_gzip_index(path: Path) -> GzipIndex:
+    """
+    Cached GzipIndex for a file, rebuilt when its (inode, size, mtime) changes.
+
+    Least recently used indexes are evicted once the cache holds more than
+    GZIP_INDEX_CHECKPOINTS checkpoints (the newest index is always kept).
+
+    Raises:
+        OSError: If the file cannot be read
+        zlib.error: If the file is not valid gzip
+    """
+    st = path.stat()
+    key = (st.st_ino, st.st_size, st.st_mtime_ns)
+    with _GZ_LOCK:
+        hit = _GZ_INDEXES.get(path)
+        if hit is not None and hit[0] == key:
+            _GZ_INDEXES.move_to_end(path)
+            return hit[1]
+    index = GzipIndex(path)
+    with _GZ_LOCK:
+        _GZ_INDEXES[path] = (key, index)
+        _GZ_INDEXES.move_to_end(path)
+        total = sum(len(idx.checkpoints) for _, idx in _GZ_INDEXES.values())
+        while total > GZIP_INDEX_CHECKPOINTS and len(_GZ_INDEXES) > 1:
+            total -= len(_GZ_INDEXES.popitem(last=False)[1][1].checkpoints)
+    return index
+
+
+_GZ_TAILS: "OrderedDict[Tuple[Path, int], Tuple[tuple, bytes]]" = OrderedDict()
+
+
+def get_gzip_tail(path: Path, max_bytes: int = GZIP_TAIL_BYTES) -> bytes:
+    """
+    Whole lines within the last `max_bytes` of a gzip file, inflated.
+
+    The file is inflated front to back once (no seek index is built) and
+    the result cached until its (inode, size, mtime) changes; least
+    recently used tails are evicted past GZIP_TAIL_CACHE_BYTES.
+
+    Raises:
+        OSError: If the file cannot be read
+        zlib.error: If the file is not valid gzip
+    """
+    st = path.stat()
+    key = (st.st_ino, st.st_size, st.st_mtime_ns)
+    with _GZ_LOCK:
+        hit = _GZ_TAILS.get((path, max_bytes))
+        if hit is not None and hit[0] == key:
+            _GZ_TAILS.move_to_end((path, max_bytes))
+            return hit[1]
+    blocks: "deque[bytes]" = deque()
+    kept = 0
+    for data in _gzip_blocks(path):
+        blocks.append(data)
+        kept += len(data)
+        while kept - len(blocks[0]) >= max_bytes:
+            kept -= len(blocks.popleft())
+    tail = b"".join(blocks)
+    if len(tail) > max_bytes:
+        cut = tail.find(b"\n", len(tail) - max_bytes)
+        tail = tail[cut + 1 :] if cut >= 0 else b""  # drop the partial first line
+    with _GZ_LOCK:
+        _GZ_TAILS[(path, max_bytes)] = (key, tail)
+        _GZ_TAILS.move_to_end((path, max_bytes))
+        total = sum(len(data) for _, data in _GZ_TAILS.values())
+        while total > GZIP_TAIL_CACHE_BYTES and len(_GZ_TAILS) > 1:
+            total -= len(_GZ_TAILS.popitem(last=False)[1][1])
+    return tail
+
+
+@dataclass(frozen=True)
+class LogSegment:
+    """One file of a rotated log: generation 0 is the live file, higher is older."""
+
+    path: Path
+    generation: int
+    compressed: bool
+
+    @property
+    def name(self) -> str:
+        """File name (identifies the segment in results)."""
+        return self.path.name
+
+    def size(self) -> int:
+        """Uncompressed size in bytes."""
+        if self.compressed:
+            return get_gzip_index(self.path).size
+        return self.path.stat().st_size
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Up to `size` uncompressed bytes starting at `offset`."""
+        if self.compressed:
+            return get_gzip_index(self.path).read(offset, size)
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def head(self, size: int) -> bytes:
+        """First `size` uncompressed bytes (no seek index needed)."""
+        if not self.compressed:
+            return self.read(0, size)
+        parts: List[bytes] = []
+        got = 0
+        for data in _gzip_blocks(self.path):
+            parts.append(data)
+            got += len(data)
+            if got >= size:
+                break
+        return b"".join(parts)[:size]
+
+    def iter_blocks(self, block_bytes: int = GZIP_SPAN) -> Iterator[Tuple[int, bytes]]:
+        """
+        Forward (offset, data) blocks that end on line boundaries.
+
+        Compressed segments are inflated once front to back; no index is
+        needed for a sequential pass.
+        """
+        if self.compressed:
+            source = _gzip_blocks(self.path)
+        else:
+            source = _file_blocks(self.path, block_bytes)
+        offset, carry = 0, b""
+        for data in source:
+            data = carry + data
+            cut = data.rfind(b"\n") + 1
+            if cut == 0 and len(data) < block_bytes:
+                carry = data
+                continue
+            cut = cut or len(data)
+            yield offset, data[:cut]
+            offset, carry = offset + cut, data[cut:]
+        if carry:
+            yield offset, carry
+
+    def iter_lines_reverse(self, max_bytes: int = GZIP_TAIL_BYTES) -> Iterator[bytes]:
+        """
+        Lines newest-first as raw bytes.
+
+        Of gzip segments only the whole lines in their last `max_bytes` are
+        returned, inflated once and cached (see get_gzip_tail()).
+        """
+        if not self.compressed:
+            yield from iter_lines_reverse(self.path)
+            return
+        lines = get_gzip_tail(self.path, max_bytes).split(b"\n")
+        if lines[-1] == b"":
+            lines.pop()
+        for line in reversed(lines):
+            yield line[:-1] if line.endswith(b"\r") else line
+
+
+def _file_blocks(path: Path, block_bytes: int) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        while True:
+            data = f.read(block_bytes)
+            if not data:
+                return
+            yield data
+
+
+def _inflate(
+    path: Path, coffset: int = 0, state: Optional["zlib._Decompress"] = None
+) -> Iterator[Tuple[bytes, int, "zlib._Decompress"]]:
+    """
+    Inflate a (possibly multi-member) gzip file from a checkpoint.
+
+    Yields (data, compressed offset consumed so far, decompressor). The
+    decompressor can be snapshotted whenever it is not at end of stream,
+    since it has then consumed all input up to the yielded offset.
+    """
+    d = state.copy() if state is not None else None
+    with path.open("rb") as f:
+        f.seek(coffset)
+        cpos = coffset
+        while True:
+            buf = f.read(GZIP_READ_BYTES)
+            if not buf:
+                if d is not None:
+                    yield d.flush(), cpos, d
+                return
+            cpos += len(buf)
+            while buf:
+                if d is None:
+                    # Member start: skip NUL padding between/after members
+                    buf = buf.lstrip(b"\x00")
+                    if not buf:
+                        break
+                    d = zlib.decompressobj(_GZIP_WBITS)
+                # Bounded output keeps checkpoints close to `span` apart on compressible logs
+                data = d.decompress(buf, GZIP_READ_BYTES)
+                buf = d.unused_data if d.eof else d.unconsumed_tail
+                yield data, cpos - len(buf), d
+                if d.eof:
+                    d = None
+
+
+def _gzip_blocks(path: Path) -> Iterator[bytes]:
+    """Sequential inflate of a gzip file (no index needed)."""
+    return (data for data, _, _ in _inflate(path) if data)
+
+
+def list_segments(path: Path, max_segments: int = MAX_SEGMENTS) -> List[LogSegment]:
+    """
+    The live log plus its rotated generations, newest first.
+
+    Recognizes logrotate naming: `backend.log.1`, `backend.log.2.gz`, ... and
+    dateext `backend.log-20240501[.gz]`. A missing live file is skipped.
+
+    Args:
+        path: Live log file
+        max_segments: Maximum segments returned
+
+    Returns:
+        Segments ordered newest to oldest
+    """
+    segments: List[LogSegment] = []
+    if path.exists():
+        segments.append(LogSegment(path, 0, False))
+    try:
+        siblings = list(path.parent.iterdir())
+    except OSError:
+        return segments
+    rx = re.compile(re.escape(path.name) + r"(?:\.(\d+)|-(\d{8,14}))(\.gz)?")
+    numbered: List[Tuple[int, Path]] = []
+    dated: List[Tuple[str, Path]] = []
+    for candidate in siblings:
+        m = rx.fullmatch(candidate.name)
+        if not m or not candidate.is_file():
+            continue
+        if m.group(1) is not None:
+            numbered.append((int(m.group(1)), candidate))
+        else:
+            dated.append((m.group(2), candidate))
+    numbered.sort()
+    dated.sort(reverse=True)  # dateext: newest date first
+    ordered = [candidate for _, candidate in numbered] + [candidate for _, candidate in dated]
+    for generation, candidate in enumerate(ordered, start=1):
+        segments.append(LogSegment(candidate, generation, candidate.name.endswith(".gz")))
+    return segments[:max_segments]
+
+
+def iter_rotated_lines_reverse(path: Path) -> Iterator[bytes]:
+    """
+    Lines of a log and its rotated generations, newest first.
+
+    Older segments are only opened once the newer ones are exhausted, so a
+    short tail never touches the archives; of gzip archives only the last
+    GZIP_TAIL_BYTES are read back (see LogSegment.iter_lines_reverse).
+    """
+    return chain.from_iterable(seg.iter_lines_reverse() for seg in list_segments(path))
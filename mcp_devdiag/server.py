@@ -1,123 +1,351 @@
 """MCP server for TasteOS development diagnostics."""
 
 from __future__ import annotations
-import json
-from typing import Any, Dict, List
+import asyncio
+import functools
+import heapq
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-import httpx
 from fastmcp import FastMCP
+from mcp_devdiag import jsoncodec
 from mcp_devdiag.schema import StatusResponse, TailResponse, EnvStateResponse
-from mcp_devdiag.analyzer import build_status, LOG_DIR, BACKEND_LOG, FRONTEND_LOG, ENV_JSON
-from mcp_devdiag.tail import tail_lines
+from mcp_devdiag.analyzer import (
+    build_status,
+    load_env,
+    LOG_DIR,
+    BACKEND_LOG,
+    FRONTEND_LOG,
+    STATUS_CACHE,
+)
+from mcp_devdiag.netcolumns import columns_enabled, get_network_columns, scan_query
+from mcp_devdiag.netrollup import NetworkRollup
+from mcp_devdiag.paths import url_template
+from mcp_devdiag.probes.adapters import get_http_pool
+from mcp_devdiag.search import RotatedSearchResult, SearchResult, search_file, search_rotated
+from mcp_devdiag.sketch import LatencySketch
+from mcp_devdiag.tail import follow_async, iter_lines_reverse
+from mcp_devdiag.timeindex import read_window
+from mcp_devdiag.timeparse import parse_since
 
 NETWORK_LOG = LOG_DIR / "network.jsonl"
+NETWORK_ROLLUP = NetworkRollup(NETWORK_LOG)
+
+# Upper bound on search_logs results per call
+SEARCH_MAX_LIMIT = 1000
 
 # Create FastMCP app
 app = FastMCP("mcp-devdiag")
 
+# Tools are async so concurrent calls overlap on the stdio transport: file work
+# runs in worker threads (asyncio.to_thread), HTTP goes through the shared
+# probe client pool, and a cancelled request cancels its awaiting coroutine.
 
-@app.tool()
-def get_status() -> StatusResponse:
-    """Get comprehensive development diagnostics including backend/frontend log status."""
+
+def _status() -> StatusResponse:
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     return build_status()
 
 
 @app.tool()
-def get_backend_logs(n: int = 300) -> TailResponse:
-    """Tail the last n lines from backend.log."""
-    lines = tail_lines(BACKEND_LOG, n=n)
-    return TailResponse(lines=lines)
+async def get_status() -> StatusResponse:
+    """Get comprehensive development diagnostics including backend/frontend log status."""
+    return await asyncio.to_thread(_status)
 
 
 @app.tool()
-def get_frontend_logs(n: int = 300) -> TailResponse:
-    """Tail the last n lines from frontend.log."""
-    lines = tail_lines(FRONTEND_LOG, n=n)
-    return TailResponse(lines=lines)
+async def get_status_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the stat-keyed get_status cache."""
+    return STATUS_CACHE.stats()
 
 
 @app.tool()
-def get_env_state() -> EnvStateResponse:
+async def get_backend_logs(
+    n: int = 300,
+    cursor: Optional[str] = None,
+    wait_ms: int = 0,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> TailResponse:
+    """
+    Tail the last n lines from backend.log, or up to n lines appended since `cursor`.
+
+    With `since`/`until` ("14:02", "15m", ISO timestamp) returns the first n
+    lines stamped inside that window; pass the returned cursor back with the
+    same window for the next page.
+    """
+    return await _read_log(BACKEND_LOG, n, cursor, wait_ms, since, until)
+
+
+@app.tool()
+async def get_frontend_logs(
+    n: int = 300,
+    cursor: Optional[str] = None,
+    wait_ms: int = 0,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> TailResponse:
+    """
+    Tail the last n lines from frontend.log, or up to n lines appended since `cursor`.
+
+    `since`/`until` select a time window as for get_backend_logs.
+    """
+    return await _read_log(FRONTEND_LOG, n, cursor, wait_ms, since, until)
+
+
+def _window(since: Optional[str], until: Optional[str]) -> tuple[Optional[float], Optional[float]]:
+    """Parse since/until tool arguments to epoch seconds (a time-of-day until follows since)."""
+    since_ts = parse_since(since) if since else None
+    return since_ts, parse_since(until, after=since_ts) if until else None
+
+
+async def _read_log(
+    path: Any,
+    n: int,
+    cursor: Optional[str],
+    wait_ms: int,
+    since: Optional[str],
+    until: Optional[str],
+) -> TailResponse:
+    """Follow a log, or page through a time window of it."""
+    if since or until:
+        start, end = _window(since, until)
+        res = await asyncio.to_thread(read_window, path, start, end, n, cursor)
+    else:
+        res = await follow_async(path, cursor, n=n, wait_ms=wait_ms)
+    return TailResponse(lines=res.lines, cursor=res.cursor, reset=res.reset)
+
+
+@app.tool()
+async def get_env_state() -> EnvStateResponse:
     """Return env.json snapshot."""
-    env = {}
-    if ENV_JSON.exists():
-        try:
-            env = json.loads(ENV_JSON.read_text())
-        except Exception:
-            env = {}
-    return EnvStateResponse(env=env)
+    return EnvStateResponse(env=await asyncio.to_thread(load_env))
 
 
 @app.tool()
-def get_request_diagnostics(
+async def get_request_diagnostics(
     url: str, method: str = "GET", timeout_s: float = 3.0
 ) -> Dict[str, Any]:
     """Actively probe a URL for status/CORS headers."""
+    pool = get_http_pool()
+    client = pool.lease()
     try:
-        with httpx.Client(follow_redirects=False, timeout=timeout_s) as client:
-            resp = client.request(method.upper(), url, headers={"Origin": "http://localhost:5173"})
-            headers = {k.lower(): v for k, v in resp.headers.items()}
-            return {
-                "ok": True,
-                "status": resp.status_code,
-                "reason": resp.reason_phrase,
-                "headers": {
-                    "access-control-allow-origin": headers.get("access-control-allow-origin"),
-                    "access-control-allow-credentials": headers.get(
-                        "access-control-allow-credentials"
-                    ),
-                    "vary": headers.get("vary"),
-                    "content-type": headers.get("content-type"),
-                },
-            }
+        resp = await client.request(
+            method.upper(),
+            url,
+            headers={"Origin": "http://localhost:5173"},
+            timeout=timeout_s,
+            follow_redirects=False,
+        )
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+        return {
+            "ok": True,
+            "status": resp.status_code,
+            "reason": resp.reason_phrase,
+            "headers": {
+                "access-control-allow-origin": headers.get("access-control-allow-origin"),
+                "access-control-allow-credentials": headers.get("access-control-allow-credentials"),
+                "vary": headers.get("vary"),
+                "content-type": headers.get("content-type"),
+            },
+        }
     except Exception as e:
-        return {"ok": False, "error": str(e)}
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    finally:
+        pool.release(client)
 
 
 @app.tool()
-def get_network_log(n: int = 200) -> Dict[str, List[str]]:
-    """Get the last n lines from network.jsonl."""
+async def get_network_log(
+    n: int = 200, since: Optional[str] = None, until: Optional[str] = None
+) -> Dict[str, List[str]]:
+    """Get the last n lines from network.jsonl, or the first n inside a since/until window."""
+    if since or until:
+        start, end = _window(since, until)
+        res = await asyncio.to_thread(read_window, NETWORK_LOG, start, end, n)
+        return {"lines": [line for line in res.lines if line.strip()]}
+    return {"lines": await asyncio.to_thread(_network_log_lines, n)}
+
+
+def _network_log_lines(n: int) -> List[str]:
+    """Last n non-empty network.jsonl lines, oldest first."""
     lines: List[str] = []
-    if NETWORK_LOG.exists():
-        # Simple tail without loading entire file in memory
-        with NETWORK_LOG.open("rb") as f:
-            f.seek(0, 2)
-            size = f.tell()
-            block = 4096
-            data = b""
-            while size > 0 and len(lines) < n:
-                step = min(block, size)
-                size -= step
-                f.seek(size)
-                data = f.read(step) + data
-                parts = data.split(b"\n")
-                lines = [p.decode("utf-8", "ignore") for p in parts if p.strip()]
-                if len(lines) >= n:
-                    break
-            lines = lines[-n:]
-    return {"lines": lines}
+    for raw in iter_lines_reverse(NETWORK_LOG):
+        if raw.strip():
+            lines.append(raw.decode("utf-8", "ignore"))
+            if len(lines) >= n:
+                break
+    lines.reverse()
+    return lines
+
+
+def _log_files() -> Dict[str, Any]:
+    """Searchable logs by name (tools never take raw paths)."""
+    return {"backend": BACKEND_LOG, "frontend": FRONTEND_LOG, "network": NETWORK_LOG}
 
 
 @app.tool()
-def get_network_summary(n: int = 500) -> Dict[str, Any]:
-    """Get summary statistics from the last n network log entries."""
-    log_result = get_network_log(n=n)  # type: ignore[operator]
-    lines = log_result.get("lines", [])
+async def search_logs(
+    pattern: str,
+    file: str = "backend",
+    since: Optional[str] = None,
+    limit: int = 100,
+    reverse: bool = False,
+    ignore_case: bool = False,
+    until: Optional[str] = None,
+    rotated: bool = False,
+) -> Dict[str, Any]:
+    """
+    Regex search over a whole log file ("backend", "frontend" or "network").
+
+    Large files are scanned in parallel line-aligned chunks and the scan
+    stops once `limit` matches are found. Matches are (byte offset, line)
+    pairs, oldest first, or newest first with `reverse`.
+
+    Args:
+        pattern: Regular expression matched against each line
+        file: Log name
+        since: Only lines stamped at/after this time ("15m", "14:02", ISO timestamp, epoch)
+        limit: Maximum matches (capped at SEARCH_MAX_LIMIT)
+        reverse: Return the newest matches first
+        ignore_case: Case-insensitive match
+        until: Only lines stamped before this time
+        rotated: Also search rotated generations (`backend.log.1`, `.2.gz`, ...);
+            matches are then (segment file, byte offset, line) triples
+    """
+    logs = _log_files()
+    if file not in logs:
+        return {"ok": False, "error": f"Unknown log {file!r}; expected one of {list(logs)}"}
+    path = logs[file]
+    try:
+        since_ts, until_ts = _window(since, until)
+        opts: Dict[str, Any] = {
+            "limit": max(0, min(limit, SEARCH_MAX_LIMIT)),
+            "reverse": reverse,
+            "ignore_case": ignore_case,
+            "since": since_ts,
+            "until": until_ts,
+        }
+        res: Union[SearchResult, RotatedSearchResult]
+        if rotated:
+            res = await asyncio.to_thread(search_rotated, path, pattern, **opts)
+        else:
+            res = await asyncio.to_thread(search_file, path, pattern, **opts)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    return {
+        "ok": True,
+        "file": file,
+        "matches": res.matches,
+        "truncated": res.truncated,
+        "scanned_bytes": res.scanned_bytes,
+    }
+
+
+@app.tool()
+async def query_network(
+    status_range: Optional[str] = None,
+    url_glob: Optional[str] = None,
+    min_dur_ms: int = 0,
+    since: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Network events matching filters, newest first, paged with a cursor.
+
+    With `diag.network_columns` enabled this is answered from the
+    incremental network.jsonl index (status-class posting lists and time
+    buckets, see mcp_devdiag.netcolumns), so a selective query does not
+    scan the whole log; otherwise the log is scanned front to back.
+
+    Args:
+        status_range: Status class, range or code ("5xx", "500-504", "404")
+        url_glob: Glob on URL route templates, e.g. "/api/users/*"
+        min_dur_ms: Only requests at least this slow
+        since: Only events at/after this time ("15m", "14:02", ISO timestamp, epoch)
+        limit: Maximum events (capped at SEARCH_MAX_LIMIT)
+        cursor: `next_cursor` from the previous page
+    """
+    try:
+        since_ts, _ = _window(since, None)
+        if columns_enabled():
+            query = get_network_columns(NETWORK_LOG).query
+        else:
+            query = functools.partial(scan_query, NETWORK_LOG)
+        res = await asyncio.to_thread(
+            query,
+            status_range=status_range,
+            url_glob=url_glob,
+            min_dur_ms=min_dur_ms,
+            since=since_ts,
+            limit=max(0, min(limit, SEARCH_MAX_LIMIT)),
+            cursor=cursor,
+        )
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, **res}
+
+
+def _iter_network_lines(n: int) -> Iterator[bytes]:
+    """Last n network.jsonl lines (newest first), or every line when n <= 0."""
+    if n > 0:
+        return islice((ln for ln in iter_lines_reverse(NETWORK_LOG) if ln.strip()), n)
+    if not NETWORK_LOG.exists():
+        return iter(())
+    return _iter_file_lines(NETWORK_LOG)
+
+
+def _iter_file_lines(path) -> Iterator[bytes]:
+    """Stream a file's lines front to back."""
+    with path.open("rb") as f:
+        yield from f
+
+
+@app.tool()
+async def get_network_summary(n: int = 500, window: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get summary statistics from the last n network log entries (n <= 0: whole file).
+
+    Single pass with bounded memory: status buckets, top failing URLs, the
+    slowest requests, and per-URL-template p50/p90/p99 latency from
+    mergeable quantile sketches. URLs are reported as route templates
+    (`/users/{id}`), see mcp_devdiag.paths.
+
+    With `window` (e.g. "15m", "24h") the summary is answered from the
+    persistent per-minute rollups instead, which only parse lines appended
+    since the previous call. Window summaries have no `slow` list.
+    """
+    if window:
+        return await asyncio.to_thread(NETWORK_ROLLUP.summary, window)
+    return await asyncio.to_thread(_summarize_network, n)
+
+
+def _summarize_network(n: int) -> Dict[str, Any]:
+    """
+    Single-pass summary of the last n network.jsonl entries.
+
+    With `diag.network_columns` enabled the summary is computed from the
+    columnar sidecar instead (see mcp_devdiag.netcolumns).
+    """
+    if columns_enabled():
+        return get_network_columns(NETWORK_LOG).summary(n)
     total = 0
     buckets = {"2xx": 0, "3xx": 0, "4xx": 0, "5xx": 0, "other": 0}
     fails: Dict[str, int] = {}
-    slow: List[Dict[str, Any]] = []
+    slow: List[tuple[int, int, Dict[str, Any]]] = []  # min-heap of the 10 slowest
+    overall = LatencySketch()
+    sketches: Dict[str, LatencySketch] = {}
 
-    for line in lines:
+    for line in _iter_network_lines(n):
         try:
-            ev = json.loads(line)
+            ev = jsoncodec.loads(line)
         except Exception:
             continue
         total += 1
         st = int(ev.get("status") or 0)
         dur = int(ev.get("dur_ms") or 0)
-        url = str(ev.get("url") or "")
+        url = url_template(str(ev.get("url") or ""))
         bucket = "other"
         if 200 <= st < 300:
             bucket = "2xx"
@@ -131,12 +359,30 @@ def get_network_summary(n: int = 500) -> Dict[str, Any]:
             fails[url] = fails.get(url, 0) + 1
         buckets[bucket] += 1
         if dur >= 1000:
-            slow.append({"url": url, "dur_ms": dur, "status": st})
+            item = (dur, total, {"url": url, "dur_ms": dur, "status": st})
+            if len(slow) < 10:
+                heapq.heappush(slow, item)
+            elif item > slow[0]:
+                heapq.heapreplace(slow, item)
+        if "dur_ms" in ev:
+            overall.add(dur)
+            sketch = sketches.get(url)
+            if sketch is None:
+                sketch = sketches[url] = LatencySketch()
+            sketch.add(dur)
 
-    slow.sort(key=lambda x: x["dur_ms"], reverse=True)
+    slow_sorted = [item for _, _, item in sorted(slow, reverse=True)]
     top_fails = sorted(fails.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    by_count = sorted(sketches.items(), key=lambda kv: kv[1].count, reverse=True)[:20]
 
-    return {"total": total, "buckets": buckets, "top_fails": top_fails, "slow": slow[:10]}
+    return {
+        "total": total,
+        "buckets": buckets,
+        "top_fails": top_fails,
+        "slow": slow_sorted,
+        "latency": overall.summary(),
+        "latency_by_url": {template: sk.summary() for template, sk in by_count},
+    }
 
 
 def main():
@@ -0,0 +1,157 @@
+"""Mergeable streaming quantile sketch for latency aggregation."""
+
+from __future__ import annotations
+import math
+from typing import Any, Dict, Optional
+
+
+class LatencySketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style) with bounded memory.
+
+    Values are counted in buckets whose width grows geometrically, so any
+    quantile estimate is within `rel_accuracy` of the true value. Two
+    sketches with the same accuracy merge by adding bucket counts, which
+    makes them usable for per-minute rollups and sharded aggregation. When
+    more than `max_buckets` are in use, the lowest buckets are collapsed
+    (sacrificing accuracy only for the fastest requests).
+    """
+
+    def __init__(self, rel_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Initialize sketch.
+
+        Args:
+            rel_accuracy: Relative error bound for quantile estimates
+            max_buckets: Maximum buckets kept before collapsing the lowest ones
+        """
+        self.rel_accuracy = rel_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + rel_accuracy) / (1 - rel_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Record a value (e.g. a duration in ms)."""
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= 0:
+            self.zero_count += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def add_many(self, values: Any) -> None:
+        """
+        Record a batch of values.
+
+        A NumPy array is bucketed with vectorized operations (one log/ceil
+        pass and a unique-count); any other iterable falls back to add().
+        """
+        if not hasattr(values, "dtype"):
+            for value in values:
+                self.add(value)
+            return
+        if len(values) == 0:
+            return
+        import numpy as np
+
+        positive = values[values > 0]
+        self.count += int(len(values))
+        self.zero_count += int(len(values) - len(positive))
+        lo, hi = values.min().item(), values.max().item()
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        if len(positive):
+            keys = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            uniq, counts = np.unique(keys, return_counts=True)
+            for key, cnt in zip(uniq.tolist(), counts.tolist()):
+                self.buckets[key] = self.buckets.get(key, 0) + cnt
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "LatencySketch") -> None:
+        """Fold another sketch (same rel_accuracy) into this one."""
+        if other.rel_accuracy != self.rel_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, cnt in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + cnt
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-quantile (0.0 to 1.0).
+
+        Returns:
+            Estimated value, or None for an empty sketch
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return min(max(value, self.min or value), self.max or value)
+        return self.max
+
+    def _collapse(self) -> None:
+        """Merge the lowest buckets until within max_buckets."""
+        keys = sorted(self.buckets)
+        excess = keys[: len(keys) - self.max_buckets + 1]
+        target = excess[-1]
+        for key in excess[:-1]:
+            self.buckets[target] += self.buckets.pop(key)
+
+    def summary(self) -> Dict[str, Any]:
+        """Count and p50/p90/p99 (rounded ms)."""
+
+        def _r(v: Optional[float]) -> Optional[float]:
+            return None if v is None else round(v, 1)
+
+        return {
+            "count": self.count,
+            "p50": _r(self.quantile(0.50)),
+            "p90": _r(self.quantile(0.90)),
+            "p99": _r(self.quantile(0.99)),
+            "max": _r(self.max),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-safe dict."""
+        return {
+            "a": self.rel_accuracy,
+            "b": {str(k): v for k, v in self.buckets.items()},
+            "z": self.zero_count,
+            "n": self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LatencySketch":
+        """Rebuild a sketch serialized with to_dict()."""
+        sk = cls(rel_accuracy=d.get("a", 0.01))
+        sk.buckets = {int(k): v for k, v in d.get("b", {}).items()}
+        sk.zero_count = d.get("z", 0)
+        sk.count = d.get("n", 0)
+        sk.min = d.get("min")
+        sk.max = d.get("max")
+        return sk
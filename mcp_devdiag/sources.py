@@ -0,0 +1,116 @@
+"""Configurable log sources (one per service) for get_status."""
+
+from __future__ import annotations
+import glob
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from mcp_devdiag import jsoncodec
+
+KINDS = ("frontend", "backend")
+FORMATS = ("text", "jsonl")
+
+# Files a source glob never picks up: index sidecars and rotated generations
+# (rotations are read through the live file, see mcp_devdiag.segments)
+_SKIP = re.compile(r"\.(?:tsidx\.json|rollup\.jsonl?|tmp|gz|\d+)$")
+
+_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+@dataclass
+class LogSource:
+    """A named set of log files (a glob) with the line format and rule kind to apply."""
+
+    name: str
+    glob: str
+    kind: str = "backend"
+    format: str = "text"
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LogSource":
+        """
+        Build a source from a config mapping.
+
+        Raises:
+            ValueError: If required keys are missing or values are invalid
+        """
+        try:
+            source = cls(
+                name=str(d["name"]),
+                glob=str(d["glob"]),
+                kind=str(d.get("kind", "backend")),
+                format=str(d.get("format", "text")),
+            )
+        except KeyError as e:
+            raise ValueError(f"Log source {d!r} is missing {e.args[0]!r}")
+        if not _NAME.match(source.name):
+            raise ValueError(f"Log source {source.name!r}: name must match {_NAME.pattern}")
+        if source.kind not in KINDS:
+            raise ValueError(f"Log source {source.name}: kind must be one of {KINDS}")
+        if source.format not in FORMATS:
+            raise ValueError(f"Log source {source.name}: format must be one of {FORMATS}")
+        return source
+
+    def paths(self, base: Path) -> List[Path]:
+        """
+        Files currently matching the glob, sorted.
+
+        Args:
+            base: Directory relative globs are resolved against
+
+        Returns:
+            Matching regular files (sidecars and rotated generations excluded)
+        """
+        pattern = self.glob if Path(self.glob).is_absolute() else str(base / self.glob)
+        return sorted(
+            p
+            for p in map(Path, glob.glob(pattern, recursive=True))
+            if not _SKIP.search(p.name) and p.is_file()
+        )
+
+    def rule_lines(self, lines: List[str]) -> List[str]:
+        """
+        Lines as log rules see them.
+
+        Text lines are used as is. JSON lines are flattened to their scalar
+        values joined by spaces, so patterns match values without JSON
+        quoting; lines that are not JSON objects pass through unchanged.
+        """
+        if self.format != "jsonl":
+            return lines
+        return [_flatten(line) for line in lines]
+
+
+def _flatten(line: str) -> str:
+    try:
+        obj = jsoncodec.loads(line)
+    except ValueError:
+        return line
+    if not isinstance(obj, dict):
+        return line
+    return " ".join(str(v) for v in obj.values() if isinstance(v, (str, int, float)))
+
+
+def merge_sources(
+    defaults: Iterable[LogSource], extra: Iterable[Dict[str, Any]] = ()
+) -> List[LogSource]:
+    """
+    Default sources extended (or overridden by name) with sources from config.
+
+    Args:
+        defaults: Built-in sources
+        extra: Source mappings, e.g. from `diag.log_sources` in devdiag.yaml
+
+    Returns:
+        Sources in reporting order
+
+    Raises:
+        ValueError: If a configured source is invalid
+    """
+    by_name: Dict[str, LogSource] = {src.name: src for src in defaults}
+    for d in extra:
+        src = LogSource.from_dict(d)
+        by_name[src.name] = src
+    return list(by_name.values())
@@ -1,38 +1,227 @@
 """Efficient log file tailing utilities."""
 
 from __future__ import annotations
+import asyncio
+import base64
+import os
+import time
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional
 
+# Upper bound on bytes returned by one incremental read
+FOLLOW_MAX_BYTES = 1024 * 1024
 
-def tail_lines(path: Path, n: int = 300) -> List[str]:
+# Bytes read per step when scanning a file backwards
+REVERSE_CHUNK_BYTES = 64 * 1024
+
+# Poll interval while long-polling for new lines
+FOLLOW_POLL_S = 0.1
+
+
+def iter_lines_reverse(path: Path, chunk_bytes: int = REVERSE_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Yield the lines of a file newest-first, as raw bytes.
+
+    The file is read backwards in `chunk_bytes` blocks (os.pread) and each
+    block is split with `rfind`, so each byte is visited once regardless of
+    line length and nothing is decoded until the caller asks for it.
+    Stopping the generator early leaves the rest of the file untouched.
+    Plain reads (unlike a memory map) are safe against the file being
+    truncated underneath, e.g. by logrotate's copytruncate: iteration just
+    stops at the first short read.
+
+    Args:
+        path: Path to log file
+        chunk_bytes: Bytes read per step
+
+    Yields:
+        Lines without their trailing newline (a final newline at EOF is ignored)
+    """
+    if not path.exists():
+        return
+
+    with path.open("rb") as f:
+        fd = f.fileno()
+        pos = os.fstat(fd).st_size
+        if pos == 0:
+            return
+        pending: List[bytes] = []  # pieces of the line being assembled, newest first
+        at_eof = True
+        while pos > 0:
+            want = min(chunk_bytes, pos)
+            pos -= want
+            chunk = os.pread(fd, want, pos)
+            if len(chunk) < want:
+                return  # truncated while reading
+            if at_eof and chunk.endswith(b"\n"):
+                chunk = chunk[:-1]
+            at_eof = False
+            end = len(chunk)
+            nl = chunk.rfind(b"\n", 0, end)
+            while nl >= 0:
+                pending.append(chunk[nl + 1 : end])
+                yield _join_line(pending)
+                pending = []
+                end = nl
+                nl = chunk.rfind(b"\n", 0, end)
+            pending.append(chunk[:end])
+        yield _join_line(pending)
+
+
+def _join_line(parts: List[bytes]) -> bytes:
+    line = parts[0] if len(parts) == 1 else b"".join(reversed(parts))
+    return line[:-1] if line.endswith(b"\r") else line
+
+
+def tail_lines(path: Path, n: int = 300, rotated: bool = False) -> List[str]:
     """
     Efficiently read last N lines from a file.
 
     Args:
         path: Path to log file
         n: Number of lines to return from end
+        rotated: Continue into rotated generations (`.1`, `.2.gz`, ...) when
+            the live file has fewer than n lines
 
     Returns:
         List of last N lines
     """
+    if rotated:
+        from mcp_devdiag.segments import iter_rotated_lines_reverse  # imports this module
+
+        source = iter_rotated_lines_reverse(path)
+    else:
+        source = iter_lines_reverse(path)
+    lines = list(islice(source, n))
+    lines.reverse()
+    return [line.decode("utf-8", errors="replace") for line in lines]
+
+
+@dataclass
+class FollowResult:
+    """Lines read incrementally plus the cursor to resume from."""
+
+    lines: List[str]
+    cursor: str
+    reset: bool = False
+
+
+def encode_cursor(inode: int, offset: int) -> str:
+    """Pack (inode, byte offset) into an opaque cursor string."""
+    return base64.urlsafe_b64encode(f"{inode}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Unpack a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        inode, offset = raw.split(":")
+        return int(inode), int(offset)
+    except Exception:
+        raise ValueError(f"Invalid log cursor: {cursor!r}")
+
+
+def read_since(
+    path: Path, cursor: Optional[str], n: int = 300, max_bytes: int = FOLLOW_MAX_BYTES
+) -> FollowResult:
+    """
+    Read lines appended since `cursor`.
+
+    Without a cursor this behaves like tail_lines() (reaching into rotated
+    generations if the live file is short) and returns a cursor at EOF. If
+    the file was rotated (new inode) or truncated (shorter than the cursor
+    offset) reading restarts at the top and `reset` is set. At most `n`
+    lines are returned and the cursor points past the last one, so a
+    backlog is paged through by calling again. Only complete lines are
+    consumed; a partially written last line is left for the next call.
+
+    Args:
+        path: Path to log file
+        cursor: Cursor from a previous call, or None
+        n: Maximum lines to return (the last n on the first call)
+        max_bytes: Maximum bytes consumed per call
+
+    Returns:
+        FollowResult with new lines and the next cursor
+    """
     if not path.exists():
-        return []
+        return FollowResult(lines=[], cursor=cursor or encode_cursor(0, 0))
+
+    st = path.stat()
+    if cursor is None:
+        lines = tail_lines(path, n=n, rotated=True)
+        return FollowResult(lines=lines, cursor=encode_cursor(st.st_ino, st.st_size))
+
+    inode, offset = decode_cursor(cursor)
+    reset = inode != st.st_ino or st.st_size < offset
+    if reset:
+        offset = 0
 
-    # Efficient tail for moderate files
     with path.open("rb") as f:
-        f.seek(0, 2)
-        size = f.tell()
-        block = 4096
-        data = b""
+        f.seek(offset)
+        data = f.read(min(max_bytes, st.st_size - offset))
+
+    end = data.rfind(b"\n") + 1
+    if end == 0 and len(data) >= max_bytes:
+        end = len(data)  # single line longer than max_bytes: return it in pieces
+    chunk = data[: end - 1] if data[:end].endswith(b"\n") else data[:end]
+    raw = chunk.split(b"\n") if end else []
+    if len(raw) > n:
+        raw = raw[: max(0, n)]
+        end = sum(len(line) + 1 for line in raw)
+    lines = [line.decode("utf-8", errors="replace").rstrip("\r") for line in raw]
+    return FollowResult(lines=lines, cursor=encode_cursor(st.st_ino, offset + end), reset=reset)
+
 
-        while size > 0 and data.count(b"\n") <= n:
-            read_size = min(block, size)
-            size -= read_size
-            f.seek(size)
-            data = f.read(read_size) + data
+def follow(path: Path, cursor: Optional[str], n: int = 300, wait_ms: int = 0) -> FollowResult:
+    """
+    Incremental read with optional long-poll.
+
+    Args:
+        path: Path to log file
+        cursor: Cursor from a previous call, or None
+        n: Maximum lines to return (the last n on the first call)
+        wait_ms: With a cursor, wait up to this long for new lines
+
+    Returns:
+        FollowResult with new lines and the next cursor
+    """
+    deadline = time.monotonic() + max(0, wait_ms) / 1000
+    while True:
+        result = read_since(path, cursor, n=n)
+        if result.lines or result.reset or cursor is None or time.monotonic() >= deadline:
+            return result
+        time.sleep(min(FOLLOW_POLL_S, max(0.0, deadline - time.monotonic())))
 
-        text = data.decode(errors="replace")
 
-    lines = text.splitlines()
-    return lines[-n:]
+async def follow_async(
+    path: Path, cursor: Optional[str], n: int = 300, wait_ms: int = 0
+) -> FollowResult:
+    """
+    Non-blocking follow(): reads run in a worker thread and the long-poll
+    sleeps on the event loop, so waiting never holds up other requests and
+    is cancelled with the calling task.
+
+    Args:
+        path: Path to log file
+        cursor: Cursor from a previous call, or None
+        n: Maximum lines to return (the last n on the first call)
+        wait_ms: With a cursor, wait up to this long for new lines
+
+    Returns:
+        FollowResult with new lines and the next cursor
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0, wait_ms) / 1000
+    while True:
+        result = await asyncio.to_thread(read_since, path, cursor, n)
+        if result.lines or result.reset or cursor is None or loop.time() >= deadline:
+            return result
+        await asyncio.sleep(min(FOLLOW_POLL_S, max(0.0, deadline - loop.time())))
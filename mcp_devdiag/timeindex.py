@@ -0,0 +1,357 @@
+"""Timestamp detection and sparse time -> offset index for log files."""
+
+from __future__ import annotations
+import mmap
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mcp_devdiag import jsoncodec
+from mcp_devdiag.tail import FollowResult, decode_cursor, encode_cursor
+from mcp_devdiag.timeparse import to_epoch
+
+# Lines sampled from the top of a file to pick its timestamp format
+DETECT_SAMPLE_LINES = 50
+
+# Bytes read forward from a probe point to find a timestamped line
+PROBE_BYTES = 64 * 1024
+
+# Bytes of a line inspected for a timestamp
+HEAD_BYTES = 160
+
+# Index points kept per file (thinned when exceeded)
+MAX_INDEX_POINTS = 4096
+
+INDEX_VERSION = 1
+
+
+def _parse_clf(raw: str) -> Optional[float]:
+    try:
+        return datetime.strptime(raw, "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    except ValueError:
+        return None
+
+
+def _parse_syslog(raw: str) -> Optional[float]:
+    try:
+        ts = datetime.strptime(f"{datetime.now().year} {raw}", "%Y %b %d %H:%M:%S")
+    except ValueError:
+        return None
+    return ts.timestamp()
+
+
+def _parse_iso(raw: str) -> Optional[float]:
+    return to_epoch(raw.replace(",", "."))
+
+
+def _parse_number(raw: str) -> Optional[float]:
+    return to_epoch(float(raw))
+
+
+@dataclass(frozen=True)
+class TimestampFormat:
+    """A recognizable log timestamp: regex over the line head plus a parser."""
+
+    name: str
+    regex: re.Pattern
+    parse: Callable[[str], Optional[float]]
+
+    def time(self, head: bytes) -> Optional[float]:
+        """Epoch seconds of a line (given its first HEAD_BYTES), if stamped."""
+        m = self.regex.search(head)
+        if not m:
+            return None
+        return self.parse(m.group(m.lastindex or 0).decode("ascii", errors="replace"))
+
+
+FORMATS = [
+    # 2024-05-01 12:00:00,123 / [2024-05-01T12:00:00.5Z] (Python logging, ISO-8601)
+    TimestampFormat(
+        "iso",
+        re.compile(
+            rb"^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)"
+        ),
+        _parse_iso,
+    ),
+    # {"ts": 1714564800123, ...} / {"timestamp": "2024-05-01T12:00:00Z", ...} (JSON lines)
+    TimestampFormat(
+        "json",
+        re.compile(rb'"(?:ts|timestamp|time)"\s*:\s*"?([0-9][0-9T:.+\-Z ]+?)"?\s*[,}]'),
+        lambda raw: to_epoch(raw) if not raw.replace(".", "").isdigit() else _parse_number(raw),
+    ),
+    # 127.0.0.1 - - [01/May/2024:12:00:00 +0000] "GET / ..." (nginx/Apache access logs)
+    TimestampFormat(
+        "clf",
+        re.compile(rb"\[(\d{2}/[A-Z][a-z]{2}/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4})\]"),
+        _parse_clf,
+    ),
+    # May  1 12:00:00 host app[123]: ... (syslog; year assumed current)
+    TimestampFormat(
+        "syslog",
+        re.compile(rb"^([A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2})"),
+        lambda raw: _parse_syslog(raw.replace("  ", " ")),
+    ),
+    # 1714564800.123 ... (epoch seconds or milliseconds)
+    TimestampFormat("epoch", re.compile(rb"^\[?(\d{10}(?:\.\d+)?|\d{13})\b"), _parse_number),
+]
+
+_FORMATS_BY_NAME = {fmt.name: fmt for fmt in FORMATS}
+
+
+def detect_format(lines: List[bytes]) -> Optional[TimestampFormat]:
+    """
+    Pick the timestamp format matching the most sample lines.
+
+    Args:
+        lines: Sample lines (raw bytes)
+
+    Returns:
+        Best format, or None if no line carries a known timestamp
+    """
+    best, best_hits = None, 0
+    for fmt in FORMATS:
+        hits = sum(1 for line in lines if fmt.time(line[:HEAD_BYTES]) is not None)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
+
+
+class TimeIndex:
+    """
+    Sparse, persisted time -> byte offset index for one log file.
+
+    Window boundaries are found by binary search over file offsets (each
+    probe reads the first timestamped line after a byte position), assuming
+    timestamps are non-decreasing. Every probe is remembered as an index
+    point and saved to `<log>.tsidx.json`, so repeat queries start from a
+    narrow bracket and typically need few or no probes. Points stay valid
+    while the file only grows; rotation or truncation discards them.
+    """
+
+    def __init__(self, path: Path, max_points: int = MAX_INDEX_POINTS):
+        """
+        Initialize index.
+
+        Args:
+            path: Log file
+            max_points: Index points kept (thinned evenly when exceeded)
+        """
+        self.path = path
+        self.index_path = path.with_name(path.name + ".tsidx.json")
+        self.max_points = max_points
+        self.fmt: Optional[TimestampFormat] = None
+        self.points: Dict[int, float] = {}
+        self.probes = 0
+        self._key: Optional[Tuple[int, int]] = None  # (inode, size) the points were taken at
+        self._dirty = False
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _sync(self, mm: mmap.mmap, inode: int) -> None:
+        """Load the sidecar once and drop points if the file was rotated or truncated."""
+        if not self._loaded:
+            self._loaded = True
+            try:
+                data = jsoncodec.loads(self.index_path.read_bytes())
+                if data.get("version") == INDEX_VERSION:
+                    self._key = (data["inode"], data["size"])
+                    self.fmt = _FORMATS_BY_NAME.get(data.get("format"))
+                    self.points = {int(k): v for k, v in data["points"]}
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        stale = self._key is None or self._key[0] != inode or len(mm) < self._key[1]
+        if stale or not self._valid(mm):
+            self.points.clear()
+            self.fmt = None
+            self._dirty = True
+        if self.fmt is None:
+            sample = mm[: min(len(mm), PROBE_BYTES)].split(b"\n")[:DETECT_SAMPLE_LINES]
+            self.fmt = detect_format(sample)
+        self._key = (inode, len(mm))
+
+    def _valid(self, mm: mmap.mmap) -> bool:
+        """Spot-check that the newest index point still matches the file content."""
+        if not self.points or self.fmt is None:
+            return True
+        offset = max(self.points)
+        if offset > 0 and mm[offset - 1 : offset] != b"\n":
+            return False
+        nl = mm.find(b"\n", offset)
+        head = mm[offset : min(len(mm) if nl < 0 else nl, offset + HEAD_BYTES)]
+        return self.fmt.time(head) == self.points[offset]
+
+    def _first_stamp(
+        self, mm: mmap.mmap, pos: int, until: Optional[int] = None
+    ) -> Tuple[int, Optional[float]]:
+        """
+        (line start, time) of the first timestamped line starting at or after pos.
+
+        Scans PROBE_BYTES, or up to `until` when given; time is None if no
+        stamped line starts in that span.
+        """
+        if pos > 0:
+            nl = mm.find(b"\n", pos - 1)
+            pos = len(mm) if nl < 0 else nl + 1
+        self.probes += 1
+        limit = min(len(mm), pos + PROBE_BYTES if until is None else until)
+        while pos < limit:
+            nl = mm.find(b"\n", pos)
+            end = len(mm) if nl < 0 else nl
+            ts = self.fmt.time(mm[pos : min(end, pos + HEAD_BYTES)]) if self.fmt else None
+            if ts is not None:
+                if pos not in self.points:
+                    self.points[pos] = ts
+                    self._dirty = True
+                return pos, ts
+            pos = end + 1
+        return pos, None
+
+    def offset_for(self, mm: mmap.mmap, ts: float) -> int:
+        """Offset of the first line stamped at or after `ts` (len(mm) if none)."""
+        lo, hi = 0, len(mm)
+        for offset in sorted(self.points):
+            if self.points[offset] < ts:
+                lo = offset + 1
+            else:
+                hi = offset
+                break
+        if lo > 0:
+            # Lines before lo are known to be earlier; if the next stamped line
+            # is already late enough it is the answer (the repeat-query case).
+            line_start, stamp = self._first_stamp(mm, lo)
+            if stamp is not None and stamp >= ts:
+                return line_start
+        while lo < hi:
+            mid = (lo + hi) // 2
+            # Scan up to hi, past unstamped blocks (tracebacks, dumps) longer
+            # than PROBE_BYTES: only a stamped line tells which half to keep.
+            line_start, stamp = self._first_stamp(mm, mid, hi)
+            if stamp is None or stamp >= ts:
+                hi = mid
+            else:
+                lo = line_start + 1
+        if lo == 0 or lo in self.points:
+            return lo
+        return self._first_stamp(mm, lo, len(mm))[0]
+
+    def range(
+        self, mm: mmap.mmap, inode: int, since: Optional[float], until: Optional[float]
+    ) -> Tuple[int, int]:
+        """
+        Byte range [start, end) of lines stamped in [since, until).
+
+        Args:
+            mm: Memory map of the file
+            inode: Inode of the mapped file (detects rotation)
+            since: Window start (epoch seconds), None for start of file
+            until: Window end (epoch seconds, exclusive), None for end of file
+
+        Returns:
+            (start, end) offsets, both on line boundaries
+        """
+        with self._lock:
+            self._sync(mm, inode)
+            if self.fmt is None:
+                return 0, len(mm)
+            start = self.offset_for(mm, since) if since is not None else 0
+            end = self.offset_for(mm, until) if until is not None else len(mm)
+            self._save()
+            return start, max(start, end)
+
+    def _save(self) -> None:
+        """Persist index points (best effort; the index is only an accelerator)."""
+        if not self._dirty or self._key is None:
+            return
+        if len(self.points) > self.max_points:
+            keep = sorted(self.points)[::2]
+            self.points = {k: self.points[k] for k in keep}
+        data = {
+            "version": INDEX_VERSION,
+            "inode": self._key[0],
+            "size": self._key[1],
+            "format": self.fmt.name if self.fmt else None,
+            "points": sorted(self.points.items()),
+        }
+        try:
+            tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+            tmp.write_bytes(jsoncodec.dumpb(data))
+            os.replace(tmp, self.index_path)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+_INDEXES: Dict[Path, TimeIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_time_index(path: Path) -> TimeIndex:
+    """Process-wide TimeIndex for a log path."""
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(path)
+        if idx is None:
+            idx = _INDEXES[path] = TimeIndex(path)
+        return idx
+
+
+def time_range(path: Path, since: Optional[float], until: Optional[float]) -> Tuple[int, int, int]:
+    """
+    (inode, start, end) byte range of a log's lines stamped in [since, until).
+
+    Returns (0, 0, 0) for a missing or empty file.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return 0, 0, 0
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        inode = os.fstat(f.fileno()).st_ino
+        start, end = get_time_index(path).range(mm, inode, since, until)
+        return inode, start, end
+
+
+def read_window(
+    path: Path,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    n: int = 300,
+    cursor: Optional[str] = None,
+) -> FollowResult:
+    """
+    Lines stamped in [since, until), at most n, oldest first.
+
+    The returned cursor points after the last line returned; passing it
+    back with the same window continues where this call stopped.
+
+    Args:
+        path: Log file
+        since: Window start (epoch seconds) or None
+        until: Window end (epoch seconds, exclusive) or None
+        n: Maximum lines returned
+        cursor: Cursor from a previous read_window call over the same window
+
+    Returns:
+        FollowResult with the lines and the continuation cursor
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return FollowResult(lines=[], cursor=cursor or encode_cursor(0, 0))
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        inode = os.fstat(f.fileno()).st_ino
+        start, end = get_time_index(path).range(mm, inode, since, until)
+        reset = False
+        if cursor is not None:
+            c_inode, c_offset = decode_cursor(cursor)
+            if c_inode == inode and c_offset <= len(mm):
+                start = max(start, c_offset)
+            else:
+                reset = True
+        lines: List[str] = []
+        pos = start
+        while pos < end and len(lines) < n:
+            nl = mm.find(b"\n", pos, end)
+            stop = end if nl < 0 else nl
+            lines.append(mm[pos:stop].rstrip(b"\r").decode("utf-8", errors="replace"))
+            pos = stop + 1
+        return FollowResult(lines=lines, cursor=encode_cursor(inode, min(pos, end)), reset=reset)
@@ -0,0 +1,109 @@
+"""Time window and event timestamp parsing."""
+
+from __future__ import annotations
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+_WINDOW = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*$", re.I)
+_TIME_OF_DAY = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d(:[0-5]\d)?$")
+_UNIT_S = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_window(window: str) -> float:
+    """
+    Parse a window like "15m", "1h", "24h" or "7d" into seconds.
+
+    Raises:
+        ValueError: If the window is not in <number><s|m|h|d|w> form
+    """
+    m = _WINDOW.match(window or "")
+    if not m:
+        raise ValueError(f"Invalid window: {window!r} (expected e.g. '15m', '1h', '7d')")
+    return float(m.group(1)) * _UNIT_S[m.group(2).lower()]
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """
+    Convert a timestamp value to epoch seconds.
+
+    Accepts epoch seconds, epoch milliseconds (values above 1e11) and
+    ISO-8601 strings. Naive ISO strings are taken as local time.
+
+    Returns:
+        Epoch seconds, or None if the value is not a recognizable timestamp
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            try:
+                return to_epoch(float(value))
+            except ValueError:
+                return None
+    return None
+
+
+def event_time(ev: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds of a network event (`ts` or `timestamp` field), if present."""
+    for key in ("ts", "timestamp", "time"):
+        if key in ev:
+            t = to_epoch(ev[key])
+            if t is not None:
+                return t
+    return None
+
+
+# Leading ISO-8601 style timestamp, optionally bracketed: "2024-05-01 12:00:00,123 ..."
+_LINE_TS = re.compile(
+    r"^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)"
+)
+
+
+def line_time(line: str) -> Optional[float]:
+    """Epoch seconds of a log line's leading timestamp, if it has one."""
+    m = _LINE_TS.match(line)
+    if not m:
+        return None
+    return to_epoch(m.group(1).replace(",", "."))
+
+
+def parse_since(value: Any, now: Optional[float] = None, after: Optional[float] = None) -> float:
+    """
+    Resolve a `since` argument to epoch seconds.
+
+    Accepts a relative window ("15m", "2h"), a local time of day ("14:02",
+    the most recent such time, or with `after` the first one at or after
+    it), epoch seconds/milliseconds or an ISO-8601 timestamp.
+
+    Args:
+        value: Time argument
+        now: Reference time (default: current time)
+        after: Resolve a time of day forward from this epoch time instead,
+            e.g. an `until` relative to the resolved `since`
+
+    Raises:
+        ValueError: If the value is not a recognizable time
+    """
+    now = time.time() if now is None else now
+    if isinstance(value, str) and _WINDOW.match(value):
+        return now - parse_window(value)
+    if isinstance(value, str) and _TIME_OF_DAY.match(value.strip()):
+        parts = [int(p) for p in value.strip().split(":")] + [0]
+        ref = datetime.fromtimestamp(now if after is None else after)
+        at = ref.replace(hour=parts[0], minute=parts[1], second=parts[2], microsecond=0)
+        # Shift the local date, not 86400 s, so days with a DST change resolve right
+        if after is None and at > ref:
+            at -= timedelta(days=1)
+        elif after is not None and at < ref:
+            at += timedelta(days=1)
+        return at.timestamp()
+    epoch = to_epoch(value)
+    if epoch is None:
+        raise ValueError(f"Invalid time: {value!r} (expected e.g. '15m' or an ISO timestamp)")
+    return epoch
@@ -1,10 +1,13 @@
 """DevDiag MCP tools - production-safe diagnostic endpoints."""
 
+import asyncio
 import os
 import time
 from typing import Any, Dict
 import httpx
+from mcp_devdiag.analyzer import BACKEND_LOG, FRONTEND_LOG
 from mcp_devdiag.config import load_config
+from mcp_devdiag.logmine import ErrorBuckets
 from mcp_devdiag.security import authorize, AuthorizationError
 from fastmcp import FastMCP
 
@@ -14,6 +17,9 @@ CFG = load_config()
 # Prometheus endpoint from environment
 PROM_URL = os.getenv("PROM_URL", "http://prometheus:9090")
 
+# Error signature miner over the dev logs (state kept across calls)
+ERROR_BUCKETS = ErrorBuckets({"backend": BACKEND_LOG, "frontend": FRONTEND_LOG})
+
 # Create FastMCP app for devdiag tools
 app = FastMCP("mcp-devdiag-tools")
 
@@ -111,12 +117,19 @@ async def get_metrics(window: str = "15m", auth_header: str | None = None) -> Di
 
 
 @app.tool()
-def get_error_buckets(window: str = "15m", auth_header: str | None = None) -> Dict[str, Any]:
+async def get_error_buckets(
+    window: str = "15m", limit: int = 50, auth_header: str | None = None
+) -> Dict[str, Any]:
     """
     Get error signature buckets for the specified time window (requires reader role).
 
+    Error lines from backend.log and frontend.log are clustered into
+    templates (variable parts such as IDs and numbers become `<*>`). Only
+    bytes appended since the previous call are mined, on a worker thread.
+
     Args:
         window: Time window (e.g., "15m", "1h", "24h")
+        limit: Maximum buckets returned
         auth_header: Authorization header (Bearer token)
     """
     try:
@@ -124,8 +137,10 @@ def get_error_buckets(window: str = "15m", auth_header: str | None = None) -> Di
     except AuthorizationError as e:
         return {"ok": False, "error": str(e)}
 
-    # TODO: implement signature bucketing
-    return {"window": window, "buckets": []}
+    try:
+        return await asyncio.to_thread(ERROR_BUCKETS.buckets, window, limit=limit)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
 
 
 @app.tool()
@@ -2,14 +2,15 @@
 """MCP tool handlers for generalized diagnostic probes."""
 
 from typing import Any, Optional, cast
+import asyncio
 import ipaddress
-import httpx
 from urllib.parse import urlparse
 from fastmcp import FastMCP
 
 from .config import load_config
 from .limits import guard
-from .probes.adapters import get_driver
+from .probes.adapters import configure_http_pool, get_driver
+from .probes.adapters_playwright import configure_browser_pool
 from .probes import (
     dom_overlays,
     csp_headers,
@@ -18,6 +19,7 @@ from .probes import (
     csp_inline,
     bundle,
 )
+from .probes.cache import BundleCache, bundle_key
 from .probes.fixes import fixes_for
 
 # Initialize MCP app
@@ -26,6 +28,23 @@ mcp = FastMCP("DevDiag Probes")
 # Load configuration
 CONFIG = load_config()
 
+# Shared HTTP client pool for all probe tools (limits from diag.http_pool)
+configure_http_pool(**CONFIG.__dict__.get("diag", {}).get("http_pool", {}))
+
+# Warm browser pool for Playwright-backed probes (sizing from diag.browser_pool)
+configure_browser_pool(**CONFIG.__dict__.get("diag", {}).get("browser_pool", {}))
+
+# Bundle result cache (ttl_s / max_entries from diag.cache)
+BUNDLE_CACHE = BundleCache(**CONFIG.__dict__.get("diag", {}).get("cache", {}))
+
+# diag_bundle_many caps (overridable under diag.bundle_many)
+BUNDLE_MANY = {
+    "max_urls": 50,
+    "max_concurrency": 16,
+    "max_per_host": 4,
+    **CONFIG.__dict__.get("diag", {}).get("bundle_many", {}),
+}
+
 # Cache for learning: previous runs for success detection
 _LAST_RUNS: dict[str, dict[str, Any]] = {}
 
@@ -42,11 +61,6 @@ PRIVATE_NETWORKS = [
 ]
 
 
-def http_client_factory():
-    """Create HTTP client for driver."""
-    return httpx.AsyncClient()
-
-
 def _deny_private(url: str) -> None:
     """
     Block requests to private/reserved IP ranges (SSRF protection).
@@ -88,8 +102,48 @@ def _assert_allowed(url: str) -> None:
         raise ValueError(f"URL not allow-listed: {url}")
 
 
+async def _cached_bundle(
+    url: str,
+    driver: Optional[str],
+    preset: Optional[str],
+    max_age: Optional[float] = None,
+    force_refresh: bool = False,
+) -> dict[str, Any]:
+    """
+    Run a probe bundle through BUNDLE_CACHE.
+
+    Args:
+        url: Target URL to probe
+        driver: Driver type or None for auto-detect
+        preset: Probe preset
+        max_age: Accept cached results at most this many seconds old
+        force_refresh: Bypass the cache and re-run the bundle
+
+    Returns:
+        Bundle result with a `cache` block ({hit, age_s})
+    """
+    cfg = {"diag": CONFIG.__dict__.get("diag", {})}
+
+    async def _run() -> dict[str, Any]:
+        drv = await get_driver(driver)
+        try:
+            return await bundle.run_bundle(drv, url, cfg, preset)
+        finally:
+            await drv.dispose()
+
+    key = bundle_key(url, preset, driver, cfg["diag"])
+    result, hit, age = await BUNDLE_CACHE.get_or_run(key, _run, max_age, force_refresh)
+    return {**result, "cache": {"hit": hit, "age_s": age}}
+
+
 @mcp.tool()
-async def diag_bundle(url: str, driver: Optional[str] = None, preset: Optional[str] = None) -> dict:
+async def diag_bundle(
+    url: str,
+    driver: Optional[str] = None,
+    preset: Optional[str] = None,
+    max_age: Optional[float] = None,
+    force_refresh: bool = False,
+) -> dict:
     """
     Run curated set of diagnostic probes based on presets.
 
@@ -97,37 +151,116 @@ async def diag_bundle(url: str, driver: Optional[str] = None, preset: Optional[s
         url: Target URL to probe
         driver: Driver type ("http", "playwright", "puppeteer", "selenium") or None for auto-detect
         preset: Probe preset ("chat", "embed", "app", "full", or None for "full")
+        max_age: Accept a cached result at most this many seconds old
+        force_refresh: Bypass the result cache
 
     Returns:
         Aggregated problems, remediation, evidence, and severity score
     """
     _assert_allowed(url)
     guard(CONFIG.tenant, "diag_bundle")
-    drv = await get_driver(driver, http_client_factory)
-    try:
-        return await bundle.run_bundle(drv, url, {"diag": CONFIG.__dict__.get("diag", {})}, preset)
-    finally:
-        await drv.dispose()
+    return await _cached_bundle(url, driver, preset, max_age, force_refresh)
 
 
 @mcp.tool()
-async def diag_quickcheck(url: str) -> dict:
+async def diag_bundle_many(
+    urls: list[str],
+    preset: Optional[str] = None,
+    concurrency: int = 8,
+    per_host: int = 2,
+    driver: Optional[str] = None,
+    max_age: Optional[float] = None,
+    force_refresh: bool = False,
+) -> dict[str, Any]:
+    """
+    Run the probe bundle against many URLs with bounded concurrency.
+
+    The batch is charged once to its own per-tenant rate limit
+    (diag_bundle_many), not once per target. Batch size, concurrency and
+    per_host are capped by diag.bundle_many (max_urls, max_concurrency,
+    max_per_host). Drivers lease from the shared
+    client/browser pools. Targets that fail validation or probing are reported
+    per URL without aborting the batch.
+
+    Args:
+        urls: Target URLs to probe
+        preset: Probe preset ("chat", "embed", "app", "full", or None for "full")
+        concurrency: Maximum bundles in flight overall
+        per_host: Maximum bundles in flight per hostname
+        driver: Driver type or None for auto-detect
+        max_age: Accept cached results at most this many seconds old
+        force_refresh: Bypass the result cache
+
+    Returns:
+        Per-target results plus a summary roll-up of problem counts and scores
+
+    Raises:
+        ValueError: If the batch has more than max_urls targets
+    """
+    if len(urls) > BUNDLE_MANY["max_urls"]:
+        raise ValueError(
+            f"Batch of {len(urls)} URLs exceeds diag.bundle_many.max_urls "
+            f"({BUNDLE_MANY['max_urls']})"
+        )
+    guard(CONFIG.tenant, "diag_bundle_many")
+    overall = asyncio.Semaphore(min(max(1, concurrency), BUNDLE_MANY["max_concurrency"]))
+    per_host = min(max(1, per_host), BUNDLE_MANY["max_per_host"])
+    hosts: dict[str, asyncio.Semaphore] = {}
+
+    async def _one(url: str) -> dict[str, Any]:
+        try:
+            _assert_allowed(url)
+        except ValueError as e:
+            return {"url": url, "ok": False, "error": str(e)}
+        host = urlparse(url).hostname or ""
+        host_sem = hosts.setdefault(host, asyncio.Semaphore(per_host))
+        async with overall, host_sem:
+            try:
+                result = await _cached_bundle(url, driver, preset, max_age, force_refresh)
+            except Exception as e:
+                return {"url": url, "ok": False, "error": str(e)}
+        return {"url": url, "ok": bundle.bundle_ok(result), **result}
+
+    results = await asyncio.gather(*(_one(u) for u in urls))
+
+    problem_counts: dict[str, int] = {}
+    scores = []
+    for item in results:
+        for code in item.get("problems", []):
+            problem_counts[code] = problem_counts.get(code, 0) + 1
+        if "score" in item:
+            scores.append(item["score"])
+
+    summary = {
+        "targets": len(results),
+        "ok": sum(1 for r in results if r["ok"]),
+        "with_problems": sum(1 for r in results if r.get("problems")),
+        "errors": sum(1 for r in results if "error" in r),
+        "problem_counts": dict(sorted(problem_counts.items(), key=lambda kv: kv[1], reverse=True)),
+        "score_max": max(scores, default=0),
+        "score_mean": round(sum(scores) / len(scores), 2) if scores else 0,
+    }
+    return {"preset": preset or "full", "summary": summary, "results": list(results)}
+
+
+@mcp.tool()
+async def diag_quickcheck(
+    url: str, max_age: Optional[float] = None, force_refresh: bool = False
+) -> dict:
     """
     Fast HTTP-only CSP and iframe compatibility check (CI-safe).
 
     Args:
         url: Target URL to probe
+        max_age: Accept a cached result at most this many seconds old
+        force_refresh: Bypass the result cache
 
     Returns:
         Probe results using "chat" preset (CSP headers, handshake)
     """
     _assert_allowed(url)
     guard(CONFIG.tenant, "diag_quickcheck")
-    drv = await get_driver("http", http_client_factory)
-    try:
-        return await bundle.run_bundle(drv, url, {"diag": CONFIG.__dict__.get("diag", {})}, "chat")
-    finally:
-        await drv.dispose()
+    return await _cached_bundle(url, "http", "chat", max_age, force_refresh)
 
 
 @mcp.tool()
@@ -156,7 +289,7 @@ async def diag_probe_dom_overlays(url: str, driver: Optional[str] = None) -> dic
     Returns:
         Problems, evidence, and remediation for overlay issues
     """
-    drv = await get_driver(driver, http_client_factory)
+    drv = await get_driver(driver)
     try:
         return cast(
             dict[str, Any], await dom_overlays.run(drv, url, CONFIG.__dict__.get("diag", {}))
@@ -176,7 +309,7 @@ async def diag_probe_csp_headers(url: str) -> dict[str, Any]:
     Returns:
         Problems, evidence, and remediation for CSP/XFO issues
     """
-    drv = await get_driver("http", http_client_factory)
+    drv = await get_driver("http")
     try:
         csp_cfg = CONFIG.__dict__.get("diag", {}).get("csp", {})
         return cast(dict[str, Any], await csp_headers.run(drv, url, csp_cfg))
@@ -197,7 +330,7 @@ async def diag_probe_chat_handshake(url: str, driver: Optional[str] = None) -> d
         Problems, evidence, and remediation for handshake issues
     """
     _assert_allowed(url)
-    drv = await get_driver(driver, http_client_factory)
+    drv = await get_driver(driver)
     try:
         handshake_cfg = CONFIG.__dict__.get("diag", {}).get("handshake", {})
         return cast(dict[str, Any], await handshake.run(drv, url, handshake_cfg))
@@ -218,7 +351,7 @@ async def diag_probe_framework_versions(url: str, driver: Optional[str] = None)
         Problems, evidence, and remediation for framework version issues
     """
     _assert_allowed(url)
-    drv = await get_driver(driver, http_client_factory)
+    drv = await get_driver(driver)
     try:
         framework_cfg = CONFIG.__dict__.get("diag", {}).get("framework", {})
         return cast(dict[str, Any], await framework_versions.run(drv, url, framework_cfg))
@@ -239,7 +372,7 @@ async def diag_probe_csp_inline(url: str, driver: Optional[str] = None) -> dict[
         Problems, evidence, and remediation for CSP inline issues
     """
     _assert_allowed(url)
-    drv = await get_driver(driver, http_client_factory)
+    drv = await get_driver(driver)
     try:
         return cast(dict[str, Any], await csp_inline.run(drv, url, CONFIG.__dict__.get("diag", {})))
     finally:
@@ -261,7 +394,7 @@ async def diag_probe_iframes(url: str, driver: Optional[str] = None) -> dict:
     _assert_allowed(url)
     # TODO: Implement iframe-specific probe
     # For now, delegate to bundle which includes CSP checks
-    drv = await get_driver(driver, http_client_factory)
+    drv = await get_driver(driver)
     try:
         return {
             "problems": [],
@@ -285,7 +418,7 @@ async def diag_probe_portal_root(url: str, driver: Optional[str] = None) -> dict
         Problems, evidence, and remediation for portal root issues
     """
     _assert_allowed(url)
-    drv = await get_driver(driver, http_client_factory)
+    drv = await get_driver(driver)
     try:
         if drv.name == "http":
             return {
@@ -342,7 +475,11 @@ def get_probe_result_schema() -> dict[str, Any]:
 
 @mcp.tool()
 async def diag_status_plus(
-    base_url: str, preset: str = "app", driver: Optional[str] = None
+    base_url: str,
+    preset: str = "app",
+    driver: Optional[str] = None,
+    max_age: Optional[float] = None,
+    force_refresh: bool = False,
 ) -> dict[str, Any]:
     """
     Admin-grade status endpoint with scoring and fix recommendations.
@@ -351,6 +488,8 @@ async def diag_status_plus(
         base_url: Target base URL to diagnose
         preset: Probe preset ("chat", "embed", "app", "full")
         driver: Driver type or None for auto-detect
+        max_age: Accept a cached bundle result at most this many seconds old
+        force_refresh: Bypass the result cache
 
     Returns:
         Status with ok flag, score, problems, fixes, and evidence
@@ -358,56 +497,66 @@ async def diag_status_plus(
     _assert_allowed(base_url)
     guard(CONFIG.tenant, "diag_status_plus")
 
-    drv = await get_driver(driver, http_client_factory)
+    result = await _cached_bundle(base_url, driver, preset, max_age, force_refresh)
+
+    # Build response payload
+    response = {
+        "ok": bundle.bundle_ok(result),
+        "score": result.get("score", 0),
+        "severity": result.get("severity", "info"),
+        "problems": result.get("problems", []),
+        "fixes": fixes_for(result.get("problems", [])),
+        "evidence": result.get("evidence", {}),
+        "probe_status": result.get("probe_status", {}),
+        **({"error": result["error"]} if result.get("error") else {}),
+        "base_url": base_url,
+        "preset": preset,
+        "cache": result["cache"],
+    }
+
+    # Closed-loop learning: record run + detect successes (fresh runs only)
     try:
-        result = await bundle.run_bundle(
-            drv, base_url, {"diag": CONFIG.__dict__.get("diag", {})}, preset
-        )
+        if CONFIG.learn.enabled and not result["cache"]["hit"]:
+            from .tools_learn import learn_record_run
+            from .learning.core import Learner
 
-        # Build response payload
-        response = {
-            "ok": not result.get("problems", []),
-            "score": result.get("score", 0),
-            "severity": result.get("severity", "info"),
-            "problems": result.get("problems", []),
-            "fixes": fixes_for(result.get("problems", [])),
-            "evidence": result.get("evidence", {}),
-            "base_url": base_url,
-            "preset": preset,
-        }
+            # Record this run
+            await learn_record_run(response, tenant=CONFIG.tenant)
 
-        # Closed-loop learning: record run + detect successes
-        try:
-            if CONFIG.learn.enabled:
-                from .tools_learn import learn_record_run
-                from .learning.core import Learner
-
-                # Record this run
-                await learn_record_run(response, tenant=CONFIG.tenant)
-
-                # Check for disappeared problems (success detection)
-                key = f"{CONFIG.tenant}:{base_url if not CONFIG.learn.privacy.hash_targets else 'hashed'}"
-                prev = _LAST_RUNS.get(key)
-                _LAST_RUNS[key] = response
-
-                if prev and set(prev["problems"]) - set(response["problems"]):
-                    # Some problems disappeared - credit the fixes
-                    learner = Learner(
-                        store=CONFIG.learn.store,
-                        alpha=CONFIG.learn.alpha,
-                        beta=CONFIG.learn.beta,
-                        min_support=CONFIG.learn.min_support,
-                    )
-                    learner.autolabel_success(
-                        tenant=CONFIG.tenant,
-                        prev_run=prev,
-                        next_run=response,
-                        fixes_map=response["fixes"],
-                    )
-        except Exception:
-            # Never fail the request due to learning errors
-            pass
-
-        return response
-    finally:
-        await drv.dispose()
+            # Check for disappeared problems (success detection)
+            key = (
+                f"{CONFIG.tenant}:{base_url if not CONFIG.learn.privacy.hash_targets else 'hashed'}"
+            )
+            prev = _LAST_RUNS.get(key)
+            _LAST_RUNS[key] = response
+
+            if prev and set(prev["problems"]) - set(response["problems"]):
+                # Some problems disappeared - credit the fixes
+                learner = Learner(
+                    store=CONFIG.learn.store,
+                    alpha=CONFIG.learn.alpha,
+                    beta=CONFIG.learn.beta,
+                    min_support=CONFIG.learn.min_support,
+                )
+                learner.autolabel_success(
+                    tenant=CONFIG.tenant,
+                    prev_run=prev,
+                    next_run=response,
+                    fixes_map=response["fixes"],
+                )
+    except Exception:
+        # Never fail the request due to learning errors
+        pass
+
+    return response
+
+
+@mcp.tool()
+def diag_cache_stats() -> dict[str, Any]:
+    """
+    Get bundle result cache counters.
+
+    Returns:
+        Entries, hits, misses, evictions, and hit ratio
+    """
+    return BUNDLE_CACHE.stats()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_json_codec.py
+
+Benchmark JSONL parse throughput on network.jsonl events: stdlib `json`
+against `mcp_devdiag.jsoncodec` (orjson when installed), per line as the
+readers do it, plus an end-to-end `get_network_summary` pass.
+
+Install orjson (`pip install mcp-devdiag[fastjson]`) to see the gain;
+without it both rows measure the stdlib.
+
+Usage:
+    python scripts/bench_json_codec.py --events 200000 --repeat 5
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from mcp_devdiag import jsoncodec, netcolumns, server
+
+
+def make_log(path: Path, events: int) -> None:
+    """Write `events` network events shaped like the capture middleware's."""
+    rng = random.Random(1)
+    with path.open("w") as f:
+        for i in range(events):
+            ev = {
+                "ts": 1714564800 + i * 0.05,
+                "method": rng.choice(["GET", "GET", "POST"]),
+                "url": f"/api/items/{rng.randint(1, 5000)}?page={rng.randint(1, 9)}",
+                "status": rng.choice([200] * 18 + [404, 500]),
+                "dur_ms": int(rng.expovariate(1 / 300)),
+            }
+            f.write(json.dumps(ev) + "\n")
+
+
+def best(fn, repeat: int) -> float:
+    """Median wall time of fn() in seconds."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    ap.add_argument("--events", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "network.jsonl"
+        make_log(log, args.events)
+        lines = log.read_bytes().splitlines()
+        mb = log.stat().st_size / 1024**2
+
+        print(f"{args.events} events, {mb:.1f} MB, codec backend: {jsoncodec.BACKEND}")
+        print(f"{'parser':>16}  {'ms':>8}  {'MB/s':>8}  {'lines/s':>10}")
+        for name, loads in (("json.loads", json.loads), ("jsoncodec.loads", jsoncodec.loads)):
+            secs = best(lambda: [loads(ln) for ln in lines], args.repeat)
+            print(f"{name:>16}  {secs * 1000:8.1f}  {mb / secs:8.1f}  {len(lines) / secs:10.0f}")
+
+        server.NETWORK_LOG = log
+        netcolumns._ENABLED = False
+        secs = best(lambda: server._summarize_network(0), args.repeat)
+        name = "summary (n=0)"
+        print(f"{name:>16}  {secs * 1000:8.1f}  {mb / secs:8.1f}  {len(lines) / secs:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
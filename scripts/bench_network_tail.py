@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_network_tail.py
+
+Benchmark the network heuristics in `analyzer.detect_problems` against
+network.jsonl files of growing size. Latency should stay flat because only
+the last `devdiag_network_window` events are read (pread-based reverse reads,
+`tail.iter_lines_reverse`).
+
+Files are created sparse: everything before the last ~1 MB of real JSONL
+events is a hole, so multi-GB sizes cost no disk and the benchmark shows
+that nothing before the window is touched.
+
+Usage:
+    python scripts/bench_network_tail.py --sizes 1M,100M,1G,5G --repeat 20
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from mcp_devdiag import analyzer
+
+UNITS = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def make_log(path: Path, size: int, tail_bytes: int = 1024**2) -> None:
+    """Create a sparse file of `size` bytes ending in ~tail_bytes of JSONL events."""
+    events = []
+    i = 0
+    while sum(len(e) for e in events) < min(tail_bytes, size):
+        ev = {"url": f"/api/items/{i}", "status": 500 if i % 50 == 0 else 200, "dur_ms": i % 2500}
+        events.append(json.dumps(ev) + "\n")
+        i += 1
+    body = "".join(events).encode("utf-8")[-min(tail_bytes, size) :]
+    body = body[body.find(b"\n") + 1 :]  # start on a line boundary
+    with path.open("wb") as f:
+        f.truncate(size - len(body))
+        f.seek(size - len(body))
+        f.write(body)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    ap.add_argument("--sizes", default="1M,100M,1G,5G")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--window", type=int, default=300)
+    args = ap.parse_args()
+
+    env = {"devdiag_network_window": args.window}
+    print(f"{'size':>8}  {'p50 ms':>8}  {'max ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "network.jsonl"
+        analyzer.NETWORK_LOG = log
+        for label in args.sizes.split(","):
+            make_log(log, parse_size(label))
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                analyzer.detect_problems(env, [], [])
+                timings.append((time.perf_counter() - t0) * 1000)
+            print(f"{label:>8}  {statistics.median(timings):8.2f}  {max(timings):8.2f}")
+            log.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Tests for log/network analyzer heuristics."""
+
+import json
+
+import pytest
+
+from mcp_devdiag import analyzer
+from mcp_devdiag.rules import LogRule, RuleSet, build_ruleset
+
+
+def _write_events(path, statuses):
+    path.write_text("".join(json.dumps({"url": "/x", "status": s}) + "\n" for s in statuses))
+
+
+def test_network_window_limits_events(tmp_path, monkeypatch):
+    """Test only the last devdiag_network_window events feed the 5xx heuristic."""
+    log = tmp_path / "network.jsonl"
+    monkeypatch.setattr(analyzer, "NETWORK_LOG", log)
+    # Three old 5xx followed by ten 200s
+    _write_events(log, [500, 500, 500] + [200] * 10)
+
+    codes = {p.code for p in analyzer.detect_problems({}, [], [])}
+    assert "MANY_5XX" in codes
+
+    codes = {p.code for p in analyzer.detect_problems({"devdiag_network_window": 10}, [], [])}
+    assert "MANY_5XX" not in codes
+
+
+def test_network_window_invalid_value_falls_back():
+    """Test a malformed window setting falls back to the default."""
+    assert analyzer.network_window({"devdiag_network_window": "lots"}) == 300
+    assert analyzer.network_window({}) == 300
+
+
+def test_log_rules_report_offsets():
+    """Test built-in log rules fire with the offsets of matching lines."""
+    fe = ["boot ok", "TypeError: Failed to fetch", "blocked by CORS policy"]
+    be = ["GET /a 200", "GET /b 503", "sqlalchemy: no such column users.x"]
+
+    problems = {p.code: p for p in analyzer.detect_problems({}, be, fe)}
+
+    assert problems["FAILED_TO_FETCH"].lines == [1]
+    assert problems["CORS_BLOCK"].lines == [2]
+    assert problems["BACKEND_HTTP_ERRORS"].lines == [1]
+    assert problems["DB_DRIFT"].lines == [2]
+
+
+def test_ruleset_extends_and_overrides_builtins():
+    """Test config rules add new checks and replace built-ins by id."""
+    rules = build_ruleset(
+        [
+            {"id": "REDIS_DOWN", "source": "backend", "pattern": r"6379.*refused"},
+            {"id": "DB_DRIFT", "source": "backend", "pattern": "alembic"},
+        ]
+    )
+    lines = ["connect 6379: connection refused", "no such column", "alembic head mismatch"]
+
+    assert rules.scan("backend", lines) == {"REDIS_DOWN": [0], "DB_DRIFT": [2]}
+    assert rules.scan("frontend", lines) == {}
+    assert [r.id for r in rules.rules][-1] == "REDIS_DOWN"
+
+
+def test_ruleset_rejects_bad_rules():
+    """Test malformed rule config raises ValueError."""
+    with pytest.raises(ValueError):
+        build_ruleset([{"id": "X", "pattern": "("}])
+    with pytest.raises(ValueError):
+        build_ruleset([{"id": "X", "pattern": "x", "severity": "boom"}])
+    with pytest.raises(ValueError):
+        build_ruleset([{"pattern": "x"}])
+    with pytest.raises(ValueError, match="severity"):
+        RuleSet([LogRule(id="X", source="backend", pattern="x", message="x", severity="critical")])
+
+
+def _status_paths(tmp_path, monkeypatch):
+    for name, fname in [
+        ("ENV_JSON", "env.json"),
+        ("FRONTEND_LOG", "frontend.log"),
+        ("BACKEND_LOG", "backend.log"),
+        ("NETWORK_LOG", "network.jsonl"),
+    ]:
+        monkeypatch.setattr(analyzer, name, tmp_path / fname)
+    cache = analyzer.StatusCache()
+    monkeypatch.setattr(analyzer, "STATUS_CACHE", cache)
+    return cache
+
+
+def test_status_reads_default_relative_logs(tmp_path, monkeypatch):
+    """Test the built-in sources find frontend/backend logs under the default relative LOG_DIR."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(analyzer, "STATUS_CACHE", analyzer.StatusCache())
+    monkeypatch.setattr(analyzer, "_SOURCES_CONFIG", [])
+    assert not analyzer.LOG_DIR.is_absolute()
+    analyzer.LOG_DIR.mkdir()
+    analyzer.FRONTEND_LOG.write_text("TypeError: Failed to fetch\n")
+    analyzer.BACKEND_LOG.write_text("GET /x 500\n")
+
+    codes = [p.code for p in analyzer.build_status().problems]
+    assert "FAILED_TO_FETCH" in codes and "BACKEND_HTTP_ERRORS" in codes
+
+
+def test_status_cache_hits_when_unchanged(tmp_path, monkeypatch):
+    """Test build_status is memoized until an input file changes."""
+    cache = _status_paths(tmp_path, monkeypatch)
+    (tmp_path / "env.json").write_text(json.dumps({"frontend_origin": "http://localhost:5173"}))
+    (tmp_path / "backend.log").write_text("GET /a 200\n")
+    (tmp_path / "frontend.log").write_text("boot ok\n")
+
+    first = analyzer.build_status()
+    second = analyzer.build_status()
+    assert first == second
+    assert cache.counters["hits"] == 1 and cache.counters["misses"] == 1
+
+    (tmp_path / "env.json").write_text(json.dumps({"frontend_origin": "http://127.0.0.1:5173"}))
+    assert analyzer.build_status().context.frontend_origin == "http://127.0.0.1:5173"
+    assert cache.counters["env_loads"] == 2
+    assert cache.counters["tail_full"] == 2  # logs were not re-read
+    assert cache.stats()["hit_rate"] == round(1 / 3, 3)
+
+
+def test_status_cache_incremental_tail(tmp_path, monkeypatch):
+    """Test appended log lines are read incrementally, rewrites re-tail."""
+    cache = _status_paths(tmp_path, monkeypatch)
+    be = tmp_path / "backend.log"
+    be.write_text("GET /a 200\n")
+    assert "BACKEND_HTTP_ERRORS" not in {p.code for p in analyzer.build_status().problems}
+
+    with be.open("a") as f:
+        f.write("GET /b 503\n")
+    problems = {p.code: p for p in analyzer.build_status().problems}
+    assert problems["BACKEND_HTTP_ERRORS"].lines == [1]
+    assert cache.counters["tail_incremental"] == 1
+    assert cache.tail(be) == ["GET /a 200", "GET /b 503"]
+
+    be.write_text("ok\n")
+    assert cache.tail(be) == ["ok"]
+    assert cache.counters["tail_full"] == 2  # frontend.log does not exist: never tailed
+
+
+def test_status_merges_configured_log_sources(tmp_path, monkeypatch):
+    """Test every configured source is tailed and gets its own rule problems."""
+    cache = _status_paths(tmp_path, monkeypatch)
+    monkeypatch.setattr(analyzer, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(
+        analyzer,
+        "_SOURCES_CONFIG",
+        [
+            {"name": "svc", "glob": "svc/*.log"},
+            {"name": "worker", "glob": "worker.jsonl", "format": "jsonl"},
+            {"name": "admin", "glob": "admin.log", "kind": "frontend"},
+        ],
+    )
+    monkeypatch.setattr(
+        analyzer,
+        "_RULES",
+        build_ruleset([{"id": "QUEUE_STUCK", "source": "worker", "pattern": r"^stuck \d+$"}]),
+    )
+    (tmp_path / "svc").mkdir()
+    for i in range(12):
+        extra = "GET /b 503\n" if i == 3 else ""
+        (tmp_path / "svc" / f"api{i}.log").write_text("GET /a 200\n" + extra)
+    (tmp_path / "svc" / "api3.log.1").write_text("rotated, not a separate file\n")
+    (tmp_path / "worker.jsonl").write_text(json.dumps({"event": "stuck", "jobs": 7}) + "\n")
+    (tmp_path / "admin.log").write_text("TypeError: Failed to fetch\n")
+    (tmp_path / "backend.log").write_text("GET /x 500\n")
+
+    problems = analyzer.build_status().problems
+    found = {(p.code, p.source) for p in problems}
+    assert ("BACKEND_HTTP_ERRORS", "backend") in found
+    assert ("BACKEND_HTTP_ERRORS", "svc:api3.log") in found
+    assert ("QUEUE_STUCK", "worker") in found
+    assert ("FAILED_TO_FETCH", "admin") in found
+    assert not any(p.source and p.source.startswith("svc:api0") for p in problems)
+    assert cache.counters["tail_full"] == 15
+
+    assert analyzer.build_status().problems == problems
+    assert cache.counters["hits"] == 1
+
+    scans = cache.counters["source_scans"]
+    (tmp_path / "svc" / "api12.log").write_text("GET /c 502\n")
+    assert ("BACKEND_HTTP_ERRORS", "svc:api12.log") in {
+        (p.code, p.source) for p in analyzer.build_status().problems
+    }
+    assert cache.counters["source_scans"] == scans + 1  # unchanged sources are not re-scanned
+
+
+def test_status_scans_each_matched_backend_file(tmp_path, monkeypatch):
+    """Test a backend glob matching several files rule-scans every file, not just the last."""
+    _status_paths(tmp_path, monkeypatch)
+    monkeypatch.setattr(analyzer, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(analyzer, "_SOURCES_CONFIG", [{"name": "backend", "glob": "be*.log"}])
+    (tmp_path / "be1.log").write_text("GET /x 500\n")
+    (tmp_path / "be2.log").write_text("GET /a 200\n" * (analyzer.RULE_SCAN_LINES + 10))
+
+    found = {(p.code, p.source) for p in analyzer.build_status().problems}
+    assert ("BACKEND_HTTP_ERRORS", "backend:be1.log") in found
+    assert not any(source == "backend:be2.log" for _, source in found)
@@ -0,0 +1,48 @@
+"""Tests for the JSON codec."""
+
+import json
+
+import pytest
+
+from mcp_devdiag import jsoncodec
+
+DOC = {"url": "/api/ü", "status": 503, "dur_ms": 12.5, "tags": ["a", None, True]}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(jsoncodec, "_ORJSON", None)
+    return request.param
+
+
+def test_loads_accepts_bytes_and_str():
+    """Test parsing JSONL lines as bytes or str, and that bad input raises ValueError."""
+    line = json.dumps(DOC).encode() + b"\n"
+    assert jsoncodec.loads(line) == DOC
+    assert jsoncodec.loads(line.decode()) == DOC
+    assert jsoncodec._json_loads(line) == DOC
+    for bad in (b"not json", b'{"a": 1'):
+        with pytest.raises(ValueError):
+            jsoncodec.loads(bad)
+
+
+def test_dumps_is_compact_utf8(backend):
+    """Test both backends emit the same compact, unescaped output."""
+    assert (
+        jsoncodec.dumpb(DOC) == json.dumps(DOC, separators=(",", ":"), ensure_ascii=False).encode()
+    )
+    assert jsoncodec.dumps(DOC, indent=True) == json.dumps(DOC, indent=2, ensure_ascii=False)
+
+
+def test_dumps_edge_values(backend):
+    """Test non-string keys, integers beyond 64 bits and `default` round-trip."""
+    assert json.loads(jsoncodec.dumps({1: "a"})) == {"1": "a"}
+    assert json.loads(jsoncodec.dumps({"n": 2**70})) == {"n": 2**70}
+    assert jsoncodec.dumps({"s": {1, 2}}, default=sorted) == '{"s":[1,2]}'
+    with pytest.raises(TypeError):
+        jsoncodec.dumps({"s": object()})
+    special = {"a": [float("nan"), None], "b": (float("inf"),)}
+    assert jsoncodec.dumps(special) == json.dumps(special, separators=(",", ":"))
@@ -0,0 +1,77 @@
+"""Tests for error signature bucketing."""
+
+import time
+
+from mcp_devdiag.logmine import DrainMiner, ErrorBuckets, tokenize
+
+
+def test_tokenize_masks_variables():
+    """Test timestamps, IDs and numbers are masked before clustering."""
+    line = "2024-05-01 12:00:00,123 ERROR user 42 failed from 10.0.0.7:5432 id=deadbeef99"
+    assert tokenize(line) == ["ERROR", "user", "<*>", "failed", "from", "<*>", "id=<*>"]
+
+
+def test_drain_merges_similar_lines():
+    """Test lines differing in variable tokens share one template."""
+    miner = DrainMiner()
+    now = time.time()
+    for name in ("alice", "bob", "carol"):
+        miner.add(f"ERROR login failed for {name} reason denied", now)
+    miner.add("ERROR database connection refused", now)
+
+    templates = sorted(c.template for c in miner.clusters.values())
+    assert templates == [
+        "ERROR database connection refused",
+        "ERROR login failed for <*> reason denied",
+    ]
+
+
+def test_drain_bounded_clusters():
+    """Test least recently seen clusters are evicted past max_clusters."""
+    miner = DrainMiner(max_clusters=5)
+    for i in range(20):
+        miner.add(f"ERROR {'x' * (i + 1)}", time.time())
+    assert len(miner.clusters) == 5
+    assert miner.evicted == 15
+
+
+def test_drain_bounded_leaf_clusters():
+    """Test a leaf keeps its most recently seen clusters up to max_leaf_clusters."""
+    miner = DrainMiner(depth=1, max_leaf_clusters=3)
+    now = time.time()
+    for word in ("alpha", "beta", "gamma"):
+        miner.add(f"ERROR {word} {word}", now)  # one leaf ("ERROR", 3 tokens), distinct clusters
+    miner.add("ERROR alpha alpha", now)  # alpha is now the newest
+    miner.add("ERROR delta delta", now)
+
+    templates = sorted(c.template.split()[1] for c in miner.clusters.values())
+    assert templates == ["alpha", "delta", "gamma"]
+    assert miner.evicted == 1
+    assert all(len(c.leaf) <= 3 for c in miner.clusters.values())
+
+
+def test_error_buckets_incremental(tmp_path):
+    """Test only new bytes are mined and counts honor the window."""
+    log = tmp_path / "backend.log"
+    log.write_text(
+        "INFO started\n"
+        "2020-01-01 00:00:00 ERROR cache miss for key 1\n"
+        "ERROR payment 17 declined\n"
+        "ERROR payment 18 declined\n"
+    )
+    eb = ErrorBuckets({"backend": log})
+
+    out = eb.buckets("15m")
+    assert [(b["template"], b["count"]) for b in out["buckets"]] == [
+        ("ERROR payment <*> declined", 2)
+    ]
+    assert out["lines_seen"] == 4
+
+    with log.open("a") as f:
+        f.write("ERROR payment 19 declined\n")
+    out = eb.buckets("15m")
+    assert out["buckets"][0]["count"] == 3
+    assert out["buckets"][0]["sources"] == ["backend"]
+    assert out["lines_seen"] == 5
+
+    assert len(eb.buckets("10000d")["buckets"]) == 2
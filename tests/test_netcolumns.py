@@ -0,0 +1,208 @@
+"""Tests for the columnar network.jsonl sidecar."""
+
+import json
+import random
+
+import pytest
+
+from mcp_devdiag import netcolumns, server
+from mcp_devdiag.netcolumns import NetworkColumns, parse_status_range
+from mcp_devdiag.paths import url_template
+
+
+def _write_events(path, n, seed=1, mode="w"):
+    rng = random.Random(seed)
+    with path.open(mode) as f:
+        f.write("not json\n\n")
+        for i in range(n):
+            url = f"/api/items/{rng.randint(1, 50)}" if i % 3 else f"/api/u{rng.randint(1, 9)}"
+            ev = {
+                "ts": 1714564800 + i,
+                "url": url,
+                "status": rng.choice([200] * 8 + [301, 404, 500, 503, 0]),
+            }
+            if i % 5:
+                ev["dur_ms"] = int(rng.expovariate(1 / 400))
+            f.write(json.dumps(ev) + "\n")
+
+
+@pytest.fixture(params=[False, True], ids=["array", "numpy"])
+def use_numpy(request):
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+@pytest.mark.parametrize("n", [0, 200])
+def test_summary_matches_json_path(tmp_path, monkeypatch, use_numpy, n):
+    """Test the columnar summary equals the line-by-line JSON summary."""
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 2000)
+    monkeypatch.setattr(server, "NETWORK_LOG", log)
+    monkeypatch.setattr(netcolumns, "_ENABLED", False)
+
+    expected = server._summarize_network(n)
+    assert NetworkColumns(log, use_numpy=use_numpy).summary(n) == expected
+
+
+def test_update_appends_incrementally_and_resets(tmp_path, use_numpy):
+    """Test only new lines are parsed; rotation rebuilds, stray rows are trimmed."""
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 100)
+    cols = NetworkColumns(log, use_numpy=use_numpy)
+    assert cols.update()["rows"] == 100
+    assert cols.update() == {"rows": 0, "bytes": 0, "reset": 0}
+
+    _write_events(log, 10, seed=2, mode="a")
+    assert cols.update()["rows"] == 10
+    assert len(cols.columns()["status"]) == 110
+    assert len(cols.columns(5)["dur"]) == 5
+
+    # Rows appended without a committed meta.json (crash mid-update) are dropped on load
+    with (cols.store_dir / "status.bin").open("ab") as f:
+        f.write(b"\0\0" * 3)
+    reopened = NetworkColumns(log, use_numpy=use_numpy)
+    assert len(reopened.columns()["status"]) == 110
+
+    log.unlink()
+    _write_events(log, 7, seed=3)
+    assert reopened.update()["reset"] == 1
+    assert len(reopened.columns()["url"]) == 7
+
+
+def test_empty_log(tmp_path, use_numpy):
+    """Test an empty or missing log summarizes to zeros."""
+    log = tmp_path / "network.jsonl"
+    summary = NetworkColumns(log, use_numpy=use_numpy).summary(0)
+    assert summary["total"] == 0 and summary["slow"] == [] and summary["top_fails"] == []
+    assert summary["latency"]["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_network_summary_uses_columns_when_enabled(tmp_path, monkeypatch):
+    """Test get_network_summary reads the sidecar when diag.network_columns is on."""
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 50)
+    monkeypatch.setattr(server, "NETWORK_LOG", log)
+    monkeypatch.setattr(netcolumns, "_ENABLED", True)
+
+    out = await server.get_network_summary(n=0)
+    assert out["total"] == 50
+    assert (tmp_path / "network.cols" / "meta.json").exists()
+
+
+def _expected(log, lo, hi, glob_prefix, min_dur, since):
+    events = []
+    for line in log.read_text().splitlines():
+        try:
+            ev = json.loads(line)
+        except ValueError:
+            continue
+        if not lo <= ev["status"] <= hi or ev.get("dur_ms", -1) < min_dur or ev["ts"] < since:
+            continue
+        if url_template(ev["url"]).startswith(glob_prefix):
+            events.append(ev)
+    return events[::-1]
+
+
+def test_query_pages_through_filtered_events(tmp_path, use_numpy):
+    """Test query() returns the same events as a full scan, newest first, across pages."""
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 3000)
+    cols = NetworkColumns(log, use_numpy=use_numpy)
+    since = 1714564800 + 1000
+    expected = _expected(log, 400, 599, "/api/items/", 1, since)
+
+    got, cursor, pages = [], None, 0
+    while True:
+        page = cols.query("400-599", "/api/items/*", 1, since, limit=7, cursor=cursor)
+        got.extend(page["events"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert got == expected
+    assert pages == len(expected) // 7 + 1
+
+    # Posting lists and time buckets bound the rows examined
+    first = cols.query("5xx", since=since, limit=5000)
+    assert first["events"] == _expected(log, 500, 599, "", -1, since)
+    assert len(first["events"]) <= first["scanned"] < 3000 // 6
+
+
+def test_query_cursor_and_range_errors(tmp_path, use_numpy):
+    """Test status range parsing and that cursors from a rotated log are rejected."""
+    assert parse_status_range("5xx") == (500, 599)
+    assert parse_status_range("404") == (404, 404)
+    assert parse_status_range("500 - 504") == (500, 504)
+    for bad in ("6xx", "abc", "504-500"):
+        with pytest.raises(ValueError):
+            parse_status_range(bad)
+
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 50)
+    cols = NetworkColumns(log, use_numpy=use_numpy)
+    cursor = cols.query(limit=1)["next_cursor"]
+    log.rename(tmp_path / "network.jsonl.1")
+    _write_events(log, 50)
+    with pytest.raises(ValueError):
+        cols.query(limit=1, cursor=cursor)
+
+
+def _pages(query, **filters):
+    got, cursor = [], None
+    while True:
+        page = query(limit=7, cursor=cursor, **filters)
+        got.extend(page["events"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return got
+
+
+def test_scan_query_matches_columns(tmp_path, use_numpy):
+    """Test the linear fallback returns the same pages of events as the columns."""
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 600)
+    filters = {"status_range": "4xx", "url_glob": "/api/items/*", "since": 1714564800 + 100}
+    expected = _pages(NetworkColumns(log, use_numpy=use_numpy).query, **filters)
+    assert expected == _expected(log, 400, 499, "/api/items/", -1, filters["since"])
+    assert _pages(lambda **kw: netcolumns.scan_query(log, **kw), **filters) == expected
+
+
+def test_query_retention_and_out_of_order_times(tmp_path, monkeypatch, use_numpy):
+    """Test capped URL/bucket metadata and late events keep query results exact."""
+    monkeypatch.setattr(netcolumns, "MAX_URLS", 4)
+    monkeypatch.setattr(netcolumns, "MAX_BUCKETS", 8)
+    log = tmp_path / "network.jsonl"
+    rng = random.Random(3)
+    with log.open("w") as f:
+        for i in range(2000):
+            ts = 1714564800 + i * 7 - rng.choice([0, 0, 0, 400])  # some arrive late
+            ev = {"ts": ts, "url": f"/api/r{i % 9}/x", "status": 500, "dur_ms": 5}
+            f.write(json.dumps(ev) + "\n")
+    cols = NetworkColumns(log, use_numpy=use_numpy)
+
+    since = 1714564800 + 9000
+    assert _pages(cols.query, url_glob="/api/r7/*", since=since) == _expected(
+        log, 500, 500, "/api/r7/", -1, since
+    )
+    meta = json.loads((cols.store_dir / "meta.json").read_text())
+    assert meta["urls"][-1] == netcolumns.OTHER_URL and len(meta["urls"]) == 5
+    assert len(meta["buckets"]) <= 8
+    assert cols.summary(0)["total"] == 2000
+
+
+@pytest.mark.asyncio
+async def test_query_network_tool(tmp_path, monkeypatch):
+    """Test the query_network tool filters the log and reports bad arguments."""
+    log = tmp_path / "network.jsonl"
+    _write_events(log, 200)
+    monkeypatch.setattr(server, "NETWORK_LOG", log)
+
+    for enabled in (False, True):
+        monkeypatch.setattr(netcolumns, "_ENABLED", enabled)
+        out = await server.query_network(status_range="404", limit=3)
+        assert out["ok"] and len(out["events"]) == 3 and out["next_cursor"]
+        assert all(ev["status"] == 404 for ev in out["events"])
+        assert (tmp_path / "network.cols").exists() == enabled
+    assert (await server.query_network(status_range="nope"))["ok"] is False
@@ -0,0 +1,108 @@
+"""Tests for persistent network rollups."""
+
+import json
+import time
+
+import pytest
+
+from mcp_devdiag import server
+from mcp_devdiag.netrollup import NetworkRollup
+
+
+def _append(path, events):
+    with path.open("a") as f:
+        f.write("".join(json.dumps(ev) + "\n" for ev in events))
+
+
+def test_rollup_incremental_and_windowed(tmp_path):
+    """Test update only parses new bytes and windows select minute rollups."""
+    log = tmp_path / "network.jsonl"
+    now = time.time()
+    old = [{"ts": now - 3 * 3600, "url": "/api/a", "status": 500, "dur_ms": 900}] * 4
+    recent = [{"ts": now - 60, "url": "/api/a?id=1", "status": 200, "dur_ms": 10}] * 6
+    _append(log, old + recent)
+
+    roll = NetworkRollup(log)
+    assert roll.update()["lines"] == 10
+    assert roll.update()["lines"] == 0
+
+    _append(log, [{"ts": now, "url": "/api/b", "status": 404, "dur_ms": 20}])
+    out = roll.summary("15m", now=now)
+    assert out["total"] == 7
+    assert out["buckets"]["2xx"] == 6
+    assert out["top_fails"] == [("/api/b", 1)]
+    assert out["latency_by_url"]["/api/a"]["count"] == 6
+
+    day = roll.summary("24h", now=now)
+    assert day["total"] == 11
+    assert day["buckets"]["5xx"] == 4
+    assert day["latency_by_url"]["/api/a"]["count"] == 10
+
+
+def test_rollup_persists_offset_and_handles_truncation(tmp_path):
+    """Test a fresh instance resumes from the sidecar and restarts on truncation."""
+    log = tmp_path / "network.jsonl"
+    _append(log, [{"url": "/x", "status": 200}] * 3)
+    NetworkRollup(log).update()
+
+    roll = NetworkRollup(log)
+    assert roll.update()["lines"] == 0
+
+    log.write_text(json.dumps({"url": "/y", "status": 502}) + "\n")
+    res = roll.update()
+    assert res["reset"] == 1 and res["lines"] == 1
+    assert roll.summary("1h")["total"] == 4
+
+
+def test_rollup_leaves_partial_line(tmp_path):
+    """Test a half-written last line is picked up once complete."""
+    log = tmp_path / "network.jsonl"
+    log.write_text('{"url": "/x", "status": 200}\n{"url": "/x", "sta')
+    roll = NetworkRollup(log)
+    assert roll.update()["lines"] == 1
+    with log.open("a") as f:
+        f.write('tus": 200}\n')
+    assert roll.update()["lines"] == 1
+
+
+@pytest.mark.asyncio
+async def test_network_summary_window(tmp_path, monkeypatch):
+    """Test get_network_summary answers window queries from the rollup."""
+    log = tmp_path / "network.jsonl"
+    monkeypatch.setattr(server, "NETWORK_ROLLUP", NetworkRollup(log))
+    _append(log, [{"url": "/x", "status": 503, "dur_ms": 5}] * 2)
+
+    out = await server.get_network_summary(window="15m")
+
+    assert out["window"] == "15m"
+    assert out["buckets"]["5xx"] == 2
+    assert "slow" not in out
+
+
+def test_rollup_journal_appends_changed_minutes_and_compacts(tmp_path):
+    """Test updates append only changed minutes; replay and compaction keep the totals."""
+    log = tmp_path / "network.jsonl"
+    now = time.time()
+    _append(log, [{"ts": now - 60 * i, "url": f"/api/{i}", "status": 200} for i in range(600)])
+    roll = NetworkRollup(log)
+    roll.update()
+    store = roll.store_path
+    size = store.stat().st_size
+
+    _append(log, [{"ts": now, "url": "/api/new", "status": 500, "dur_ms": 3}])
+    roll.update()
+    assert store.stat().st_size - size < 1024  # one minute rewritten, not 600
+
+    replayed = NetworkRollup(log)
+    assert replayed.update()["lines"] == 0
+    assert replayed.summary("24h", now=now)["total"] == 601
+
+    # A torn record from a crash is dropped on load
+    with store.open("ab") as f:
+        f.write(b'{"v": 3, "inode"')
+    assert NetworkRollup(log).summary("24h", now=now)["total"] == 601
+
+    short = NetworkRollup(log, retention_s=3600)
+    assert short.compact()["minutes"] == 61
+    assert len(store.read_bytes().splitlines()) == 1
+    assert NetworkRollup(log).summary("24h", now=now)["total"] == 62
@@ -0,0 +1,78 @@
+"""Tests for network.jsonl summaries."""
+
+import json
+
+import pytest
+
+from mcp_devdiag import server
+from mcp_devdiag.paths import PathNormalizer
+
+
+def _write(path, events):
+    path.write_text("".join(json.dumps(ev) + "\n" for ev in events))
+
+
+@pytest.mark.asyncio
+async def test_network_summary_latency_by_url(tmp_path, monkeypatch):
+    """Test summary reports per-URL latency percentiles and slowest requests."""
+    log = tmp_path / "network.jsonl"
+    monkeypatch.setattr(server, "NETWORK_LOG", log)
+    events = [{"url": "/api/a?x=1", "status": 200, "dur_ms": d} for d in range(1, 101)]
+    events += [{"url": "/api/b", "status": 503, "dur_ms": 1500 + i} for i in range(12)]
+    _write(log, events)
+
+    out = await server.get_network_summary(n=0)
+
+    assert out["total"] == 112
+    assert out["buckets"]["5xx"] == 12
+    assert out["top_fails"] == [("/api/b", 12)]
+    assert [s["dur_ms"] for s in out["slow"]] == list(range(1511, 1501, -1))
+    a = out["latency_by_url"]["/api/a"]
+    assert a["count"] == 100
+    assert 49 <= a["p50"] <= 51
+    assert 98 <= a["p99"] <= 100
+
+
+@pytest.mark.asyncio
+async def test_network_summary_last_n_window(tmp_path, monkeypatch):
+    """Test n limits the summary to the most recent events."""
+    log = tmp_path / "network.jsonl"
+    monkeypatch.setattr(server, "NETWORK_LOG", log)
+    _write(log, [{"url": "/x", "status": 500}] * 5 + [{"url": "/x", "status": 200}] * 3)
+
+    out = await server.get_network_summary(n=3)
+
+    assert out["total"] == 3
+    assert out["buckets"]["2xx"] == 3
+    assert out["latency"]["count"] == 0
+
+
+def test_path_normalizer_templates():
+    """Test configured patterns and ID heuristics collapse URLs to routes."""
+    norm = PathNormalizer([r"^/users/\d+", r"^/orgs/(?P<org>[^/]+)/"])
+
+    assert norm.template("/users/123/orders/456?x=1") == "/users/{id}/orders/{id}"
+    assert norm.template("/users/me") == "/users/me"
+    assert norm.template("/orgs/acme/repos") == "/orgs/{org}/repos"
+    assert (
+        norm.template("http://api:8000/items/3f2b8c1e-9a7d-4b2e-8c1f-0a1b2c3d4e5f#top")
+        == "http://api:8000/items/{uuid}"
+    )
+    assert norm.template("/blobs/deadbeefdeadbeefdeadbeef") == "/blobs/{hash}"
+    assert norm.template("/api/v1/health") == "/api/v1/health"
+    norm.template("/api/v1/health")
+    assert norm.cache_info().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_network_summary_groups_fails_by_template(tmp_path, monkeypatch):
+    """Test failures and slow requests on ID paths are grouped by route."""
+    log = tmp_path / "network.jsonl"
+    monkeypatch.setattr(server, "NETWORK_LOG", log)
+    _write(log, [{"url": f"/users/{i}", "status": 404, "dur_ms": 1200} for i in range(20)])
+
+    out = await server.get_network_summary(n=0)
+
+    assert out["top_fails"] == [("/users/{id}", 20)]
+    assert {s["url"] for s in out["slow"]} == {"/users/{id}"}
+    assert list(out["latency_by_url"]) == ["/users/{id}"]
@@ -1,6 +1,10 @@
 """Tests for diagnostic probes - HTTP-only and browser modes."""
 
+from collections import defaultdict
+
+import httpx
 import pytest
+from mcp_devdiag import limits
 from mcp_devdiag.probes.adapters import HttpDriver, get_driver
 from mcp_devdiag.probes import csp_headers, dom_overlays
 from mcp_devdiag.probes.fixes import get_fixes, get_all_fixes
@@ -9,9 +13,27 @@ from mcp_devdiag.probes.fixes import get_fixes, get_all_fixes
 class MockResponse:
     """Mock HTTP response for testing."""
 
-    def __init__(self, status_code=200, headers=None):
+    def __init__(self, status_code=200, headers=None, content=b""):
         self.status_code = status_code
         self.headers = headers or {}
+        self.content = content
+
+    async def aiter_bytes(self):
+        for i in range(0, len(self.content), 1024):
+            yield self.content[i : i + 1024]
+
+
+class MockStream:
+    """Mock streaming context returned by MockHttpClient.stream()."""
+
+    def __init__(self, pending):
+        self._pending = pending
+
+    async def __aenter__(self):
+        return await self._pending
+
+    async def __aexit__(self, *exc):
+        return False
 
 
 class MockHttpClient:
@@ -23,6 +45,12 @@ class MockHttpClient:
     async def get(self, url, **kwargs):
         return self._response
 
+    async def head(self, url, **kwargs):
+        return self._response
+
+    def stream(self, method, url, **kwargs):
+        return MockStream(self.get(url, **kwargs))
+
     async def aclose(self):
         pass
 
@@ -215,3 +243,542 @@ async def test_driver_factory_auto_degrades():
     # Should gracefully degrade to HTTP
     assert driver.name == "http"
     assert isinstance(driver, HttpDriver)
+
+
+class CountingHttpClient(MockHttpClient):
+    """Mock HTTP client that counts requests by method."""
+
+    def __init__(self, response):
+        super().__init__(response)
+        self.gets = 0
+        self.heads = 0
+
+    async def get(self, url, **kwargs):
+        self.gets += 1
+        return self._response
+
+    async def head(self, url, **kwargs):
+        self.heads += 1
+        return self._response
+
+
+@pytest.mark.asyncio
+async def test_bundle_navigates_once():
+    """Test bundle shares a single navigation across all probes."""
+    from mcp_devdiag.probes.bundle import run_bundle
+
+    mock_resp = MockResponse(
+        status_code=200,
+        headers={"content-security-policy": "frame-ancestors 'self'"},
+    )
+    client = CountingHttpClient(mock_resp)
+    driver = HttpDriver(client)
+
+    result = await run_bundle(driver, "https://example.com", {"diag": {}}, "full")
+
+    assert result["probes_run"] == 5
+    assert client.gets + client.heads == 1
+    assert result["evidence"]["csp_headers"]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_bundle_probe_timeout_is_partial(monkeypatch):
+    """Test a slow probe times out without failing the rest of the bundle."""
+    import asyncio
+    from mcp_devdiag.probes import bundle, handshake
+
+    async def slow_run(driver, url, cfg):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(handshake, "run", slow_run)
+
+    driver = HttpDriver(MockHttpClient(MockResponse(headers={"x-frame-options": "DENY"})))
+    cfg = {"diag": {"probe_timeouts": {"handshake": 0.05}, "csp": {"forbidden_xfo": ["DENY"]}}}
+
+    result = await bundle.run_bundle(driver, "https://example.com", cfg, "chat")
+
+    assert result["probe_status"]["handshake"]["status"] == "timed_out"
+    assert result["probe_status"]["csp_headers"]["status"] == "ok"
+    assert "handshake" not in result["evidence"]
+    assert "IFRAME_FRAME_ANCESTORS_BLOCKED" in result["problems"]
+    assert result["probes_run"] == 2
+
+
+@pytest.mark.asyncio
+async def test_bundle_probe_error_is_reported(monkeypatch):
+    """Test a raising probe is reported as an error in probe_status."""
+    from mcp_devdiag.probes import bundle, csp_inline
+
+    async def broken_run(driver, url, cfg):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(csp_inline, "run", broken_run)
+
+    driver = HttpDriver(MockHttpClient(MockResponse()))
+    result = await bundle.run_bundle(driver, "https://example.com", {"diag": {}}, "chat")
+
+    assert result["probe_status"]["csp_inline"] == {
+        "status": "error",
+        "error": "boom",
+        "ms": result["probe_status"]["csp_inline"]["ms"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_bundle_capture_failure_marks_probes(monkeypatch):
+    """Test a hanging or failing page capture is reported per probe instead of raising."""
+    import asyncio
+    from mcp_devdiag.probes import bundle, snapshot
+
+    async def hang(driver, url, body_bytes=None):
+        await asyncio.sleep(5)
+
+    async def fail(driver, url, body_bytes=None):
+        raise ConnectionError("refused")
+
+    driver = HttpDriver(MockHttpClient(MockResponse()))
+    cfg = {"diag": {"probe_timeout_s": 0.05}}
+
+    monkeypatch.setattr(snapshot, "capture", hang)
+    result = await bundle.run_bundle(driver, "https://example.com", cfg, "chat")
+    assert {s["status"] for s in result["probe_status"].values()} == {"timed_out"}
+    assert set(result["probe_status"]) == {"csp_headers", "handshake", "csp_inline"}
+    assert result["probes_run"] == 0
+
+    monkeypatch.setattr(snapshot, "capture", fail)
+    result = await bundle.run_bundle(driver, "https://example.com", cfg, "chat")
+    assert result["probe_status"]["handshake"]["status"] == "error"
+    assert "refused" in result["probe_status"]["handshake"]["error"]
+    assert "refused" in result["error"] and not bundle.bundle_ok(result)
+
+
+@pytest.mark.asyncio
+async def test_diag_status_plus_not_ok_when_capture_fails(monkeypatch):
+    """Test an unreachable target is reported as not ok even with no problems found."""
+    from mcp_devdiag import tools_diag
+    from mcp_devdiag.probes import snapshot
+
+    async def fake_get_driver(kind, *args, **kwargs):
+        return HttpDriver(MockHttpClient(MockResponse()))
+
+    async def refuse(driver, url, body_bytes=None):
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(tools_diag, "get_driver", fake_get_driver)
+    monkeypatch.setattr(snapshot, "capture", refuse)
+    monkeypatch.setattr(tools_diag.CONFIG, "allow_probes", ["GET https://*.example.com/*"])
+    monkeypatch.setattr(limits, "_buckets", defaultdict(lambda: limits.TokenBucket(0, 5)))
+
+    out = await tools_diag.diag_status_plus(
+        "https://down.example.com/", preset="chat", force_refresh=True
+    )
+    assert out["problems"] == [] and out["ok"] is False
+    assert "refused" in out["error"]
+
+
+@pytest.mark.asyncio
+async def test_http_pool_lease_reuses_client():
+    """Test pooled drivers share one client and dispose() does not close it."""
+    from mcp_devdiag.probes.adapters import HttpClientPool
+
+    pool = HttpClientPool(max_connections=10, http2=False)
+    first = HttpDriver(pool.lease(), release=pool.release)
+    second = HttpDriver(pool.lease(), release=pool.release)
+
+    assert first._client is second._client
+    assert pool.stats()["leased"] == 2
+
+    await first.dispose()
+    await second.dispose()
+
+    assert not first._client.is_closed
+    assert pool.stats() == {
+        "clients": 1,
+        "leased": 0,
+        "created": 1,
+        "leases_total": 2,
+        "http2": False,
+        "revalidated": 0,
+    }
+    await pool.aclose()
+    assert first._client.is_closed
+
+
+def test_http_pool_drops_clients_of_closed_loops():
+    """Test a new loop gets a fresh client and the dead loop's client is closed."""
+    import asyncio
+    from mcp_devdiag.probes.adapters import HttpClientPool
+
+    pool = HttpClientPool(http2=False)
+
+    async def lease():
+        client = pool.lease()
+        pool.release(client)
+        await asyncio.sleep(0)  # let stale-client closes run
+        return client
+
+    first = asyncio.run(lease())
+    second = asyncio.run(lease())
+
+    assert first is not second
+    assert first.is_closed and not second.is_closed
+    assert pool.stats()["clients"] == 1
+    asyncio.run(pool.aclose())
+
+
+class FakeContext:
+    """Fake Playwright BrowserContext."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    """Fake Playwright Browser."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def new_context(self):
+        return FakeContext()
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_and_recycles():
+    """Test browser pool keeps browsers warm and recycles after max_uses."""
+    from mcp_devdiag.probes.adapters_playwright import BrowserPool
+
+    class FakePool(BrowserPool):
+        async def _launch(self):
+            return FakeBrowser()
+
+    pool = FakePool(size=1, max_uses=2, max_rss_mb=None)
+
+    first = await pool.lease()
+    await pool.release(first)
+    second = await pool.lease()
+
+    assert first.entry is second.entry
+    assert first.context is not second.context
+    assert first.context.closed
+
+    await pool.release(second)
+
+    # Second use hit max_uses: browser closed once its context was released
+    assert second.entry.browser.closed
+    assert pool.stats() == {
+        "browsers": 0,
+        "active_contexts": 0,
+        "launched": 1,
+        "recycled": 1,
+        "leases_total": 2,
+    }
+
+
+def test_browser_pool_closes_browsers_of_previous_loop():
+    """Test moving the pool to a new loop closes the old loop's browsers."""
+    import asyncio
+    from mcp_devdiag.probes.adapters_playwright import BrowserPool
+
+    class FakePool(BrowserPool):
+        async def _launch(self):
+            return FakeBrowser()
+
+    pool = FakePool(size=1, max_rss_mb=None)
+
+    async def use():
+        lease = await pool.lease()
+        await pool.release(lease)
+        return lease.entry.browser
+
+    old = asyncio.run(use())
+    new = asyncio.run(use())
+    assert old.closed and not new.closed
+    assert pool.stats()["browsers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_playwright_driver_releases_lease_when_page_fails():
+    """Test a failing new_page() hands the leased context back to the pool."""
+    from mcp_devdiag.probes.adapters_playwright import BrowserPool, PlaywrightDriver
+
+    class BrokenContext(FakeContext):
+        async def new_page(self):
+            raise RuntimeError("page crashed")
+
+    class BrokenBrowser(FakeBrowser):
+        async def new_context(self):
+            return BrokenContext()
+
+    class FakePool(BrowserPool):
+        async def _launch(self):
+            return BrokenBrowser()
+
+    pool = FakePool(size=1, max_rss_mb=None)
+    driver = PlaywrightDriver(pool=pool)
+    with pytest.raises(RuntimeError, match="page crashed"):
+        await driver.goto("https://example.com")
+    assert pool.stats()["active_contexts"] == 0
+    assert driver._lease is None
+
+
+@pytest.mark.asyncio
+async def test_diag_bundle_many_rollup(monkeypatch):
+    """Test batch bundle tool aggregates per-target results into a summary."""
+    from mcp_devdiag import tools_diag
+
+    headers = {
+        "https://a.example.com/": {"x-frame-options": "DENY"},
+        "https://b.example.com/": {"content-security-policy": "frame-ancestors 'self'"},
+    }
+
+    class UrlClient(MockHttpClient):
+        async def get(self, url, **kwargs):
+            return MockResponse(headers=headers[url])
+
+        head = get
+
+    async def fake_get_driver(kind, *args, **kwargs):
+        return HttpDriver(UrlClient(None))
+
+    monkeypatch.setattr(tools_diag, "get_driver", fake_get_driver)
+    monkeypatch.setattr(tools_diag.CONFIG, "allow_probes", ["GET https://*.example.com/*"])
+    monkeypatch.setattr(limits, "_buckets", defaultdict(lambda: limits.TokenBucket(0.5, 5)))
+
+    out = await tools_diag.diag_bundle_many(
+        list(headers) + ["https://10.0.0.1/"], preset="chat", concurrency=2
+    )
+
+    by_url = {r["url"]: r for r in out["results"]}
+    assert by_url["https://b.example.com/"]["ok"] is True
+    assert by_url["https://a.example.com/"]["problems"] == ["IFRAME_FRAME_ANCESTORS_BLOCKED"]
+    assert "private range" in by_url["https://10.0.0.1/"]["error"]
+    assert out["summary"]["targets"] == 3
+    assert out["summary"]["ok"] == 1
+    assert out["summary"]["errors"] == 1
+    assert out["summary"]["problem_counts"] == {"IFRAME_FRAME_ANCESTORS_BLOCKED": 1}
+
+
+@pytest.mark.asyncio
+async def test_diag_bundle_many_caps_and_rate_limits(monkeypatch):
+    """Test oversized batches are refused and a batch costs one rate-limit token."""
+    from mcp_devdiag import tools_diag
+
+    from mcp_devdiag.probes import snapshot
+
+    async def fake_get_driver(kind, *args, **kwargs):
+        return HttpDriver(MockHttpClient(MockResponse(headers={})))
+
+    capture = snapshot.capture
+
+    async def flaky_capture(driver, url, body_bytes=None):
+        if "h7." in url:
+            raise ConnectionError("connection refused")
+        return await capture(driver, url, body_bytes=body_bytes)
+
+    monkeypatch.setattr(tools_diag, "get_driver", fake_get_driver)
+    monkeypatch.setattr(snapshot, "capture", flaky_capture)
+    monkeypatch.setattr(tools_diag.CONFIG, "allow_probes", ["GET https://*.example.com/*"])
+    monkeypatch.setattr(tools_diag, "BUNDLE_MANY", {**tools_diag.BUNDLE_MANY, "max_urls": 8})
+    monkeypatch.setattr(limits, "_buckets", defaultdict(lambda: limits.TokenBucket(0, 5)))
+
+    urls = [f"https://h{i}.example.com/" for i in range(9)]
+    with pytest.raises(ValueError, match="max_urls"):
+        await tools_diag.diag_bundle_many(urls, preset="chat")
+
+    out = await tools_diag.diag_bundle_many(urls[:8], preset="chat", concurrency=10_000)
+    assert not any(r.get("error") == "Rate limit exceeded" for r in out["results"])
+    assert limits._buckets[f"{tools_diag.CONFIG.tenant}:diag_bundle_many"].tokens == 4
+    down = out["results"][7]
+    assert down["ok"] is False and "refused" in down["error"]
+    assert out["summary"]["errors"] == 1 and out["summary"]["targets"] == 8
+
+
+@pytest.mark.asyncio
+async def test_bundle_cache_hits_and_coalesces():
+    """Test bundle cache serves repeats and coalesces concurrent identical runs."""
+    import asyncio
+    from mcp_devdiag.probes.cache import BundleCache, bundle_key
+
+    cache = BundleCache(ttl_s=60, max_entries=2)
+    runs = 0
+
+    async def run():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return {"problems": []}
+
+    key = bundle_key("https://example.com", "chat", None, {"csp": {}})
+    outs = await asyncio.gather(*(cache.get_or_run(key, run) for _ in range(5)))
+
+    assert runs == 1
+    assert [hit for _, hit, _ in outs].count(False) == 1
+
+    _, hit, _ = await cache.get_or_run(key, run)
+    assert hit is True
+    _, hit, _ = await cache.get_or_run(key, run, force_refresh=True)
+    assert hit is False
+    assert runs == 2
+
+    # Config changes produce a different key
+    assert key != bundle_key("https://example.com", "chat", None, {"csp": {"x": 1}})
+
+    # LRU eviction beyond max_entries
+    cache.put("b", {})
+    cache.put("c", {})
+    assert cache.get(key) is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 5
+
+
+@pytest.mark.asyncio
+async def test_bundle_cache_skips_degraded_results():
+    """Test results with timed-out probes are not cached, or only for degraded_ttl_s."""
+    import asyncio
+    from mcp_devdiag.probes.cache import BundleCache
+
+    degraded = {"problems": [], "probe_status": {"handshake": {"status": "timed_out"}}}
+    runs = 0
+
+    async def run():
+        nonlocal runs
+        runs += 1
+        return degraded
+
+    cache = BundleCache(ttl_s=60)
+    await cache.get_or_run("k", run)
+    _, hit, _ = await cache.get_or_run("k", run)
+    assert hit is False and runs == 2
+
+    short = BundleCache(ttl_s=60, degraded_ttl_s=0.05)
+    short.put("k", degraded)
+    short.put("ok", {"probe_status": {"handshake": {"status": "ok"}}})
+    assert short.get("k") is not None
+    await asyncio.sleep(0.1)
+    assert short.get("k") is None
+    assert short.get("ok") is not None
+
+
+@pytest.mark.asyncio
+async def test_http_driver_headers_only_and_revalidation():
+    """Test header-only fetch uses HEAD and replays cached headers on 304."""
+    from mcp_devdiag.probes.adapters import ValidatorCache
+
+    class ConditionalClient(CountingHttpClient):
+        async def head(self, url, **kwargs):
+            self.heads += 1
+            self.last_headers = kwargs.get("headers") or {}
+            if self.last_headers.get("If-None-Match") == '"v1"':
+                return MockResponse(status_code=304, headers={"etag": '"v1"'})
+            return MockResponse(
+                headers={"etag": '"v1"', "content-security-policy": "frame-ancestors 'self'"}
+            )
+
+    client = ConditionalClient(None)
+    validators = ValidatorCache()
+    cfg = {"must_include": [{"directive": "frame-ancestors", "any_of": ["'self'"]}]}
+
+    first = await csp_headers.run(HttpDriver(client, validators=validators), "https://e.com", cfg)
+    second = await csp_headers.run(HttpDriver(client, validators=validators), "https://e.com", cfg)
+
+    assert client.gets == 0
+    assert client.heads == 2
+    assert client.last_headers == {"If-None-Match": '"v1"'}
+    assert validators.revalidated == 1
+    assert first["problems"] == second["problems"] == []
+    assert second["evidence"]["status"] == 200
+
+
+def test_validator_cache_bounded_by_bytes():
+    """Test cached bodies are evicted by total size and oversized ones skipped."""
+    from mcp_devdiag.probes.adapters import FetchedResponse, ValidatorCache
+
+    def fetched(size):
+        return FetchedResponse(200, httpx.Headers({"etag": '"v1"'}), b"x" * size)
+
+    validators = ValidatorCache(max_bytes=100)
+    for url in ("a", "b", "c"):
+        validators.resolve((url, 0), fetched(40))
+    validators.resolve(("big", 0), fetched(101))
+    validators.resolve(("c", 0), fetched(10))
+
+    assert validators.validators(("a", 0)) == {}
+    assert validators.validators(("big", 0)) == {}
+    assert validators.validators(("b", 0)) == {"If-None-Match": '"v1"'}
+    assert validators._bytes == 50
+
+
+@pytest.mark.asyncio
+async def test_http_driver_body_cap_truncates():
+    """Test streamed body stops at max_body_bytes and records truncation."""
+    client = MockHttpClient(MockResponse(content=b"x" * 10_000))
+    driver = HttpDriver(client, max_body_bytes=4096)
+
+    await driver.goto("https://example.com", max_body_bytes=100_000)
+    resp = await driver.get_response()
+    assert len(resp.content) == 4096
+    assert resp.truncated is True
+
+    await driver.goto("https://example.com", max_body_bytes=20_000)
+    resp = await driver.get_response()
+    assert len(resp.content) == 4096
+
+    small = HttpDriver(MockHttpClient(MockResponse(content=b"ok")))
+    await small.goto("https://example.com")
+    resp = await small.get_response()
+    assert resp.content == b"ok"
+    assert resp.truncated is False
+
+
+@pytest.mark.asyncio
+async def test_csp_inline_http_scans_html():
+    """Test csp_inline flags inline scripts blocked by CSP in HTTP mode."""
+    from mcp_devdiag.probes import csp_inline
+
+    html = (
+        b"<html><head><script>boot()</script>"
+        b'<script type="application/ld+json">{}</script>'
+        b'<script src="/app.js"></script></head></html>'
+    )
+    blocked = MockResponse(headers={"content-security-policy": "script-src 'self'"}, content=html)
+    allowed = MockResponse(
+        headers={"content-security-policy": "script-src 'self' 'unsafe-inline'"}, content=html
+    )
+
+    result = await csp_inline.run(HttpDriver(MockHttpClient(blocked)), "https://e.com", {})
+    assert result["problems"] == ["CSP_INLINE_BLOCKED"]
+    assert result["severity"] == "warn"
+    assert result["evidence"]["inline_scripts"] == 1
+    assert result["evidence"]["body_truncated"] is False
+
+    result = await csp_inline.run(HttpDriver(MockHttpClient(allowed)), "https://e.com", {})
+    assert result["problems"] == []
+
+
+@pytest.mark.parametrize(
+    "html,csp,blocked",
+    [
+        ('<script type="text/template"><b></b></script>', "script-src 'self'", 0),
+        ("<script type='module'>go()</script>", "script-src 'self'", 1),
+        ('<script nonce="abc">go()</script>', "script-src 'nonce-abc'", 0),
+        ('<script nonce="abcd">go()</script>', "script-src 'nonce-abc'", 1),
+        ('<script data-nonce="abc">go()</script>', "script-src 'nonce-abc'", 1),
+        ("<script>go()</script>", "script-src 'unsafe-inline' 'nonce-x'", 1),
+        ("<script>go()</script>", "script-src 'unsafe-inline' 'strict-dynamic'", 1),
+        ("<script>go()</script>", "script-src 'self'; script-src-elem 'unsafe-inline'", 0),
+        ("<script>go()</script>", "default-src 'self'", 1),
+        ("<script>go()</script>", "script-src 'sha256-abc='", 0),
+    ],
+)
+def test_scan_inline_scripts_policy(html, csp, blocked):
+    """Test executable types, exact nonces and the script directive fallback order."""
+    from mcp_devdiag.probes.csp_inline import scan_inline_scripts
+
+    assert scan_inline_scripts(html, csp)["blocked_inline_scripts"] == blocked
@@ -0,0 +1,65 @@
+"""Tests for log search."""
+
+import pytest
+
+from mcp_devdiag import server
+from mcp_devdiag.search import search_file
+from mcp_devdiag.timeparse import to_epoch
+
+
+def _write_log(path, n=300):
+    with path.open("w") as f:
+        for i in range(n):
+            level = "ERROR" if i % 10 == 0 else "INFO"
+            f.write(f"2024-05-01T12:{i // 60:02d}:{i % 60:02d}Z {level} request {i}\n")
+
+
+def test_search_forward_reverse_and_limit(tmp_path):
+    """Test matches are (offset, line) pairs in order with early stop at limit."""
+    log = tmp_path / "backend.log"
+    _write_log(log)
+    data = log.read_bytes()
+
+    res = search_file(log, r"ERROR request \d+", limit=3, chunk_bytes=512)
+    assert [line.split()[-1] for _, line in res.matches] == ["0", "10", "20"]
+    assert res.truncated
+    offset, line = res.matches[1]
+    assert data[offset:].startswith(line.encode())
+
+    res = search_file(log, "error", limit=2, reverse=True, ignore_case=True, chunk_bytes=512)
+    assert [line.split()[-1] for _, line in res.matches] == ["290", "280"]
+
+    assert len(search_file(log, "ERROR", limit=1000, chunk_bytes=512).matches) == 30
+
+
+def test_search_since_uses_timestamps(tmp_path):
+    """Test since skips to the first line at/after the time."""
+    log = tmp_path / "backend.log"
+    _write_log(log)
+
+    res = search_file(log, "ERROR", limit=2, since=to_epoch("2024-05-01T12:04:05Z"))
+    assert [line.split()[-1] for _, line in res.matches] == ["250", "260"]
+
+
+def test_search_parallel_matches_serial(tmp_path):
+    """Test the process pool path returns the same matches as a serial scan."""
+    log = tmp_path / "backend.log"
+    _write_log(log, n=3000)
+
+    serial = search_file(log, "ERROR", limit=50, reverse=True, parallel=False, chunk_bytes=4096)
+    pooled = search_file(log, "ERROR", limit=50, reverse=True, parallel=True, chunk_bytes=4096)
+    assert pooled.matches == serial.matches
+
+
+@pytest.mark.asyncio
+async def test_search_logs_tool(tmp_path, monkeypatch):
+    """Test the tool validates the log name and pattern."""
+    log = tmp_path / "backend.log"
+    _write_log(log, n=20)
+    monkeypatch.setattr(server, "BACKEND_LOG", log)
+
+    out = await server.search_logs("request 1[0-9]", file="backend", limit=5)
+    assert out["ok"] and len(out["matches"]) == 5
+
+    assert not (await server.search_logs("x", file="/etc/passwd"))["ok"]
+    assert not (await server.search_logs("(", file="backend"))["ok"]
@@ -0,0 +1,155 @@
+"""Tests for rotated and gzip log segments."""
+
+import gzip
+import random
+from collections import OrderedDict
+
+import pytest
+
+from mcp_devdiag import segments, server
+from mcp_devdiag.search import search_rotated
+from mcp_devdiag.segments import GzipIndex, LogSegment, iter_rotated_lines_reverse, list_segments
+from mcp_devdiag.tail import read_since, tail_lines
+from mcp_devdiag.timeparse import to_epoch
+
+
+def _lines(start, n):
+    stamps = (f"2024-05-01T12:{i // 60:02d}:{i % 60:02d}Z" for i in range(start, start + n))
+    return [f"{ts} INFO request {i}" for i, ts in enumerate(stamps, start)]
+
+
+def _rotated_logs(tmp_path):
+    """backend.log.2.gz (0-99), backend.log.1 (100-149), backend.log (150-159)."""
+    log = tmp_path / "backend.log"
+    archived = ("\n".join(_lines(0, 100)) + "\n").encode()
+    (tmp_path / "backend.log.2.gz").write_bytes(gzip.compress(archived))
+    (tmp_path / "backend.log.1").write_text("\n".join(_lines(100, 50)) + "\n")
+    log.write_text("\n".join(_lines(150, 10)) + "\n")
+    return log
+
+
+def test_list_segments_order(tmp_path):
+    """Test segments are live first, then numbered, then dateext, skipping unrelated files."""
+    log = _rotated_logs(tmp_path)
+    (tmp_path / "backend.log-20240430.gz").write_bytes(gzip.compress(b"x\n"))
+    (tmp_path / "backend.log-20240429").write_text("y\n")
+    (tmp_path / "backend.log.10").write_text("z\n")
+    (tmp_path / "backend.log.tsidx.json").write_text("{}")
+
+    names = [seg.name for seg in list_segments(log)]
+    assert names == [
+        "backend.log",
+        "backend.log.1",
+        "backend.log.2.gz",
+        "backend.log.10",
+        "backend.log-20240430.gz",
+        "backend.log-20240429",
+    ]
+    assert [seg.compressed for seg in list_segments(log)][:3] == [False, False, True]
+
+
+def test_gzip_index_random_reads(tmp_path):
+    """Test seeks resume from checkpoints, across gzip members and trailing padding."""
+    rng = random.Random(7)
+    raw = "".join(f"line {i} {'x' * rng.randint(0, 80)}\n" for i in range(40_000)).encode()
+    gz = tmp_path / "big.log.1.gz"
+    gz.write_bytes(gzip.compress(raw[:100_000]) + gzip.compress(raw[100_000:]) + b"\0" * 8)
+
+    index = GzipIndex(gz, span=64 * 1024)
+    assert index.size == len(raw)
+    assert len(index.checkpoints) > 10
+    for _ in range(50):
+        offset, size = rng.randrange(len(raw)), rng.randrange(200_000)
+        assert index.read(offset, size) == raw[offset : offset + size]
+
+
+def test_tail_and_follow_reach_into_rotations(tmp_path):
+    """Test tails continue into older generations when the live file is short."""
+    log = _rotated_logs(tmp_path)
+
+    assert tail_lines(log, n=5) == _lines(155, 5)
+    assert tail_lines(log, n=70, rotated=True) == _lines(90, 70)
+    assert [ln.decode() for ln in iter_rotated_lines_reverse(log)] == _lines(0, 160)[::-1]
+
+    first = read_since(log, None, n=20)
+    assert first.lines == _lines(140, 20)
+
+
+def test_search_rotated(tmp_path):
+    """Test search covers all segments in order and prunes by time window."""
+    log = _rotated_logs(tmp_path)
+
+    res = search_rotated(log, r"request (?:5|105|155)$", limit=10)
+    assert [(name, line.split()[-1]) for name, _, line in res.matches] == [
+        ("backend.log.2.gz", "5"),
+        ("backend.log.1", "105"),
+        ("backend.log", "155"),
+    ]
+    name, offset, line = res.matches[0]
+    assert gzip.decompress((tmp_path / name).read_bytes())[offset:].startswith(line.encode())
+
+    res = search_rotated(log, "request", limit=3, reverse=True)
+    assert [line.split()[-1] for _, _, line in res.matches] == ["159", "158", "157"]
+    assert res.truncated
+
+    res = search_rotated(log, "request", limit=100, since=to_epoch("2024-05-01T12:02:25Z"))
+    assert [line.split()[-1] for _, _, line in res.matches][:2] == ["145", "146"]
+    assert "backend.log.2.gz" not in {name for name, _, _ in res.matches}
+
+    res = search_rotated(log, "request", limit=100, until=to_epoch("2024-05-01T12:00:03Z"))
+    assert [line.split()[-1] for _, _, line in res.matches] == ["0", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_search_logs_rotated_flag(tmp_path, monkeypatch):
+    """Test search_logs only looks at rotated segments when asked."""
+    monkeypatch.setattr(server, "BACKEND_LOG", _rotated_logs(tmp_path))
+
+    live = await server.search_logs("request 42$")
+    assert live["ok"] and live["matches"] == []
+    rotated = await server.search_logs("request 42$", rotated=True)
+    assert rotated["matches"][0][0] == "backend.log.2.gz"
+
+
+def test_reverse_lines_of_gzip_are_capped_and_unindexed(tmp_path, monkeypatch):
+    """Test reverse reads keep only the archive's tail and build no seek index."""
+    gz = tmp_path / "backend.log.1.gz"
+    gz.write_bytes(gzip.compress(("\n".join(_lines(0, 3000)) + "\n").encode()))
+    monkeypatch.setattr(segments, "_GZ_INDEXES", OrderedDict())
+
+    lines = [ln.decode() for ln in LogSegment(gz, 1, True).iter_lines_reverse(max_bytes=4096)]
+    assert lines == _lines(3000 - len(lines), len(lines))[::-1]
+    assert 4096 // 40 < len(lines) <= 4096 // 36
+    assert not segments._GZ_INDEXES
+
+
+def test_gzip_index_cache_is_bounded_by_checkpoints(tmp_path, monkeypatch):
+    """Test cached seek indexes are evicted by total checkpoint count."""
+    monkeypatch.setattr(segments, "_GZ_INDEXES", OrderedDict())
+    monkeypatch.setattr(segments, "GZIP_INDEX_CHECKPOINTS", 2)
+    raw = ("\n".join(_lines(0, 1000)) + "\n").encode()
+    for i in range(4):
+        (tmp_path / f"a{i}.gz").write_bytes(gzip.compress(raw))
+        segments.get_gzip_index(tmp_path / f"a{i}.gz")
+
+    assert list(segments._GZ_INDEXES) == [tmp_path / "a2.gz", tmp_path / "a3.gz"]
+
+
+def test_gzip_tail_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    """Test reverse reads inflate an archive once until it is replaced."""
+    monkeypatch.setattr(segments, "_GZ_TAILS", OrderedDict())
+    inflated = []
+    gzip_blocks = segments._gzip_blocks
+    monkeypatch.setattr(
+        segments, "_gzip_blocks", lambda path: inflated.append(path) or gzip_blocks(path)
+    )
+    gz = tmp_path / "backend.log.1.gz"
+    gz.write_bytes(gzip.compress(("\n".join(_lines(0, 100)) + "\n").encode()))
+    seg = LogSegment(gz, 1, True)
+
+    first = next(seg.iter_lines_reverse()).decode()
+    assert first == next(seg.iter_lines_reverse()).decode() == _lines(99, 1)[0]
+    assert len(inflated) == 1
+    gz.write_bytes(gzip.compress(("\n".join(_lines(0, 101)) + "\n").encode()))
+    assert next(seg.iter_lines_reverse()).decode() == _lines(100, 1)[0]
+    assert len(inflated) == 2
@@ -0,0 +1,45 @@
+"""Tests for the streaming latency sketch."""
+
+import random
+
+import pytest
+
+from mcp_devdiag.sketch import LatencySketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    """Test quantile estimates stay within the configured relative error."""
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(5, 1) for _ in range(20_000))
+    sk = LatencySketch(rel_accuracy=0.01)
+    for v in values:
+        sk.add(v)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sk.quantile(q) == pytest.approx(exact, rel=0.02)
+
+
+def test_sketch_merge_matches_single_sketch():
+    """Test merged shards give the same answer as one sketch over all values."""
+    whole, left, right = LatencySketch(), LatencySketch(), LatencySketch()
+    for v in range(1, 1001):
+        whole.add(v)
+        (left if v % 2 else right).add(v)
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert left.summary() == whole.summary()
+
+
+def test_sketch_roundtrip_and_bounds():
+    """Test serialization roundtrip, zero values, and bucket cap."""
+    sk = LatencySketch(max_buckets=16)
+    sk.add(0)
+    for v in range(1, 5000):
+        sk.add(v)
+
+    assert len(sk.buckets) <= 16
+    assert sk.quantile(0.0) == 0.0
+    assert LatencySketch.from_dict(sk.to_dict()).summary() == sk.summary()
+    assert LatencySketch().quantile(0.5) is None
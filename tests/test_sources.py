@@ -0,0 +1,58 @@
+"""Tests for configurable log sources."""
+
+import json
+
+import pytest
+
+from mcp_devdiag.rules import LogRule
+from mcp_devdiag.sources import LogSource, merge_sources
+
+
+def test_log_source_validation():
+    """Test config mappings are validated."""
+    src = LogSource.from_dict({"name": "api", "glob": "api/*.log", "format": "jsonl"})
+    assert (src.kind, src.format) == ("backend", "jsonl")
+    with pytest.raises(ValueError, match="missing 'glob'"):
+        LogSource.from_dict({"name": "api"})
+    with pytest.raises(ValueError, match="kind"):
+        LogSource.from_dict({"name": "api", "glob": "x", "kind": "db"})
+    with pytest.raises(ValueError, match="name"):
+        LogSource.from_dict({"name": "a b", "glob": "x"})
+
+
+def test_merge_sources_overrides_by_name():
+    """Test configured sources extend the defaults and replace same-named ones."""
+    defaults = [LogSource("frontend", "fe.log", "frontend"), LogSource("backend", "be.log")]
+    extra = [{"name": "backend", "glob": "api/*.log"}, {"name": "w", "glob": "w.log"}]
+    merged = merge_sources(defaults, extra)
+    assert [(s.name, s.glob) for s in merged] == [
+        ("frontend", "fe.log"),
+        ("backend", "api/*.log"),
+        ("w", "w.log"),
+    ]
+
+
+def test_paths_skip_sidecars_and_rotations(tmp_path):
+    """Test globs only match live log files."""
+    for name in ["a.log", "b.log", "a.log.1", "a.log.2.gz", "a.log.tsidx.json"]:
+        (tmp_path / name).write_text("x\n")
+    assert [p.name for p in LogSource("s", "*").paths(tmp_path)] == ["a.log", "b.log"]
+    assert LogSource("s", str(tmp_path / "b.log")).paths(tmp_path) == [tmp_path / "b.log"]
+
+
+def test_jsonl_rule_lines_flatten_values():
+    """Test JSON lines are matched on their values; other lines pass through."""
+    src = LogSource("w", "w.jsonl", format="jsonl")
+    line = json.dumps({"level": "error", "status": 503, "msg": 'say "hi"', "ctx": {"a": 1}})
+    assert src.rule_lines([line, "plain text", "[1, 2]"]) == [
+        'error 503 say "hi"',
+        "plain text",
+        "[1, 2]",
+    ]
+
+
+def test_rule_source_may_name_a_log_source():
+    """Test rules accept a log source name but not arbitrary strings."""
+    assert LogRule.from_dict({"id": "X", "source": "billing", "pattern": "x"}).source == "billing"
+    with pytest.raises(ValueError, match="source"):
+        LogRule.from_dict({"id": "X", "source": "not valid!", "pattern": "x"})
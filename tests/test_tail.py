@@ -0,0 +1,188 @@
+"""Tests for reverse line iteration and tailing."""
+
+import asyncio
+
+import pytest
+
+from mcp_devdiag.tail import iter_lines_reverse, tail_lines
+
+
+def test_iter_lines_reverse_order_and_newlines(tmp_path):
+    """Test lines come back newest-first with CRLF and trailing newline handled."""
+    log = tmp_path / "app.log"
+    log.write_bytes(b"one\r\ntwo\n\nthree\n")
+
+    assert list(iter_lines_reverse(log)) == [b"three", b"", b"two", b"one"]
+
+
+def test_iter_lines_reverse_no_trailing_newline(tmp_path):
+    """Test a final line without newline is still yielded."""
+    log = tmp_path / "app.log"
+    log.write_bytes(b"a\nb")
+
+    assert list(iter_lines_reverse(log)) == [b"b", b"a"]
+
+
+def test_iter_lines_reverse_missing_and_empty(tmp_path):
+    """Test missing and empty files yield nothing."""
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+
+    assert list(iter_lines_reverse(tmp_path / "missing.log")) == []
+    assert list(iter_lines_reverse(empty)) == []
+
+
+def test_iter_lines_reverse_survives_truncation(tmp_path):
+    """Test a file truncated mid-iteration (copytruncate) ends iteration without crashing."""
+    log = tmp_path / "app.log"
+    log.write_bytes(b"".join(b"line %d\n" % i for i in range(1000)))
+
+    lines = iter_lines_reverse(log, chunk_bytes=64)
+    assert next(lines) == b"line 999"
+    assert list(iter_lines_reverse(log, chunk_bytes=7)) == list(iter_lines_reverse(log))
+    with log.open("r+b") as f:
+        f.truncate(0)
+    assert len(list(lines)) < 10
+
+
+def test_tail_lines_long_lines(tmp_path):
+    """Test tail returns last N lines when lines exceed any block size."""
+    log = tmp_path / "app.log"
+    long_line = "x" * 200_000
+    log.write_text("\n".join([long_line, "mid", long_line, "last"]) + "\n")
+
+    assert tail_lines(log, n=2) == [long_line, "last"]
+    assert tail_lines(log, n=10) == [long_line, "mid", long_line, "last"]
+
+
+def test_tail_lines_decodes_invalid_utf8(tmp_path):
+    """Test invalid UTF-8 bytes are replaced instead of raising."""
+    log = tmp_path / "app.log"
+    log.write_bytes(b"ok\n\xff\xfe bad\n")
+
+    assert tail_lines(log, n=1) == ["�� bad"]
+
+
+def test_follow_returns_only_new_lines(tmp_path):
+    """Test cursor-based reads return appended lines once."""
+    from mcp_devdiag.tail import follow
+
+    log = tmp_path / "backend.log"
+    log.write_text("a\nb\n")
+
+    first = follow(log, None, n=10)
+    assert first.lines == ["a", "b"]
+
+    assert follow(log, first.cursor).lines == []
+
+    with log.open("a") as f:
+        f.write("c\npartial")
+    second = follow(log, first.cursor)
+    assert second.lines == ["c"]
+
+    with log.open("a") as f:
+        f.write(" line\n")
+    third = follow(log, second.cursor)
+    assert third.lines == ["partial line"]
+    assert third.reset is False
+
+
+def test_follow_pages_backlog_by_n(tmp_path):
+    """Test cursor reads return at most n lines and resume after the last one."""
+    from mcp_devdiag.tail import follow
+
+    log = tmp_path / "backend.log"
+    log.write_text("a\n")
+    cursor = follow(log, None).cursor
+    with log.open("a") as f:
+        f.write("".join(f"line {i}\r\n" for i in range(5)))
+
+    pages = []
+    for _ in range(3):
+        res = follow(log, cursor, n=2)
+        pages.append(res.lines)
+        cursor = res.cursor
+    assert pages == [["line 0", "line 1"], ["line 2", "line 3"], ["line 4"]]
+    assert follow(log, cursor, n=2).lines == []
+
+
+def test_follow_handles_truncation_and_rotation(tmp_path):
+    """Test truncated or replaced files restart from the top with reset set."""
+    from mcp_devdiag.tail import follow
+
+    log = tmp_path / "backend.log"
+    log.write_text("old line one\nold line two\n")
+    cursor = follow(log, None).cursor
+
+    log.write_text("new\n")
+    truncated = follow(log, cursor)
+    assert truncated.lines == ["new"]
+    assert truncated.reset is True
+
+    rotated = tmp_path / "backend.log.1"
+    log.rename(rotated)
+    log.write_text("fresh\n")
+    after = follow(log, truncated.cursor)
+    assert after.lines == ["fresh"]
+    assert after.reset is True
+
+
+def test_follow_long_poll_times_out(tmp_path):
+    """Test wait_ms waits for new lines and returns empty on timeout."""
+    import time
+
+    from mcp_devdiag.tail import follow
+
+    log = tmp_path / "backend.log"
+    log.write_text("a\n")
+    cursor = follow(log, None).cursor
+
+    t0 = time.monotonic()
+    res = follow(log, cursor, wait_ms=150)
+    assert res.lines == []
+    assert time.monotonic() - t0 >= 0.14
+
+
+def test_decode_cursor_rejects_garbage():
+    """Test malformed cursors raise ValueError."""
+    from mcp_devdiag.tail import decode_cursor, encode_cursor
+
+    assert decode_cursor(encode_cursor(42, 1000)) == (42, 1000)
+    with pytest.raises(ValueError, match="Invalid log cursor"):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_follow_async_long_poll_does_not_block_loop(tmp_path):
+    """Test a waiting follow_async lets other coroutines run and sees appends."""
+    from mcp_devdiag.tail import follow_async
+
+    log = tmp_path / "app.log"
+    log.write_text("a\n")
+    cursor = (await follow_async(log, None)).cursor
+
+    async def append_later():
+        await asyncio.sleep(0.05)
+        with log.open("a") as f:
+            f.write("b\n")
+        return "appended"
+
+    res, other = await asyncio.gather(follow_async(log, cursor, wait_ms=2000), append_later())
+    assert other == "appended"
+    assert res.lines == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_follow_async_cancellable(tmp_path):
+    """Test cancelling a long-poll returns promptly."""
+    from mcp_devdiag.tail import follow_async
+
+    log = tmp_path / "app.log"
+    log.write_text("a\n")
+    cursor = (await follow_async(log, None)).cursor
+
+    task = asyncio.create_task(follow_async(log, cursor, wait_ms=10_000))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, timeout=1)
@@ -0,0 +1,140 @@
+"""Tests for timestamp detection and time-window log queries."""
+
+import mmap
+import os
+import time
+
+from datetime import datetime, timezone
+
+import pytest
+
+from mcp_devdiag import server
+from mcp_devdiag.tail import decode_cursor
+from mcp_devdiag.timeindex import TimeIndex, detect_format, read_window
+from mcp_devdiag.timeparse import parse_since, to_epoch
+
+T0 = to_epoch("2024-05-01T12:00:00Z")
+
+
+def _write_log(path, n=5000):
+    with path.open("w") as f:
+        for i in range(n):
+            stamp = datetime.fromtimestamp(T0 + i, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            f.write(f"{stamp} INFO request {i}\n")
+            if i % 7 == 0:
+                f.write("  continuation line without timestamp\n")
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    """Local time zone with a DST change on 2024-03-10."""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_parse_since_time_of_day_window(new_york):
+    """Test a time-of-day until resolves after since, and days with a DST change."""
+    now = datetime(2024, 5, 1, 14, 3, 30).timestamp()
+    since = parse_since("14:02", now)
+    assert parse_since("14:05", now, after=since) - since == 180
+    assert parse_since("13:00", now, after=since) - since == 23 * 3600 - 120
+
+    now = datetime(2024, 3, 10, 12, 0).timestamp()  # clocks went forward at 02:00
+    assert datetime.fromtimestamp(parse_since("13:00", now)) == datetime(2024, 3, 9, 13, 0)
+
+
+@pytest.mark.parametrize(
+    "line,name",
+    [
+        (b"2024-05-01 12:00:00,123 ERROR boom", "iso"),
+        (b'{"url": "/x", "ts": 1714564800123, "status": 200}', "json"),
+        (b'127.0.0.1 - - [01/May/2024:12:00:00 +0000] "GET / HTTP/1.1" 200', "clf"),
+        (b"May  1 12:00:00 host app[1]: started", "syslog"),
+        (b"1714564800.5 worker ready", "epoch"),
+    ],
+)
+def test_detect_format(line, name):
+    """Test common log timestamp formats are recognized."""
+    fmt = detect_format([line, b"no timestamp here"])
+    assert fmt.name == name
+    assert fmt.time(line) is not None
+
+
+def _range(idx, path, since, until):
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return idx.range(mm, os.fstat(f.fileno()).st_ino, since, until)
+
+
+def test_time_index_binary_search_and_persistence(tmp_path):
+    """Test window bounds take O(log n) probes and repeat queries reuse the index."""
+    log = tmp_path / "backend.log"
+    _write_log(log)
+    data = log.read_bytes()
+
+    idx = TimeIndex(log)
+    start, end = _range(idx, log, T0 + 120, T0 + 125)
+    window = data[start:end].decode().splitlines()
+    assert window[0].endswith("request 120") and window[-1].endswith("request 124")
+    assert idx.probes < 60
+    assert (tmp_path / "backend.log.tsidx.json").exists()
+
+    again = TimeIndex(log)
+    assert _range(again, log, T0 + 120, T0 + 125) == (start, end)
+    assert again.probes <= 2
+
+
+def test_time_index_discards_points_after_rotation(tmp_path):
+    """Test a replaced file does not reuse stale offsets."""
+    log = tmp_path / "backend.log"
+    _write_log(log)
+    idx = TimeIndex(log)
+    _range(idx, log, T0 + 600, None)
+
+    log.unlink()
+    _write_log(log, n=100)
+    start, _ = _range(idx, log, T0 + 50, None)
+    assert log.read_bytes()[start:].startswith(b"2024-05-01T12:00:50Z")
+
+
+def test_time_index_skips_long_unstamped_block(tmp_path):
+    """Test an unstamped block longer than a probe does not end the search early."""
+    log = tmp_path / "backend.log"
+    with log.open("w") as f:
+        for i in range(1000):
+            stamp = datetime.fromtimestamp(T0 + i, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            f.write(f"{stamp} INFO request {i}\n")
+            if i == 500:
+                f.write("  at frame without timestamp\n" * 8000)  # ~3 probes worth
+    data = log.read_bytes()
+
+    idx = TimeIndex(log)
+    for since, first in ((T0 + 600, "request 600"), (T0 + 501, "request 501")):
+        start, end = _range(idx, log, since, since + 2)
+        window = data[start:end].decode().splitlines()
+        assert len(window) == 2 and window[0].endswith(first)
+
+
+def test_read_window_pages_with_cursor(tmp_path):
+    """Test read_window returns n lines per page inside the window."""
+    log = tmp_path / "backend.log"
+    _write_log(log, n=300)
+
+    first = read_window(log, since=T0 + 10, until=T0 + 13, n=2)
+    assert [line.split()[-1] for line in first.lines] == ["10", "11"]
+    rest = read_window(log, since=T0 + 10, until=T0 + 13, n=10, cursor=first.cursor)
+    assert [line.split()[-1] for line in rest.lines] == ["12"]
+    assert decode_cursor(rest.cursor)[1] > decode_cursor(first.cursor)[1]
+
+
+@pytest.mark.asyncio
+async def test_log_tools_accept_since_until(tmp_path, monkeypatch):
+    """Test get_backend_logs selects lines by time window."""
+    log = tmp_path / "backend.log"
+    _write_log(log, n=300)
+    monkeypatch.setattr(server, "BACKEND_LOG", log)
+
+    res = await server.get_backend_logs(since="2024-05-01T12:02:00Z", until="2024-05-01T12:02:02Z")
+    assert [line.split()[-1] for line in res.lines if "request" in line] == ["120", "121"]